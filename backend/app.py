@@ -1,182 +1,339 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import sqlite3
 import datetime
 import hashlib
-import uuid
 import requests
 import os
+import json
+import base64
 from dotenv import load_dotenv
+from db import get_db, pool_stats
+import codec
+import outbox
+import tickets
+import search
+import hashtags
+import ledger
+import export
+import batch
+import counters
+import profiling
+import streams
+import timeline
+import projection
+import compression
+from cache import feed_cache
+from conditional import conditional_get, install_version_triggers
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+profiling.install(app)
+compression.install(app)
+
+# Secondary indexes backing the hot route queries (see check_query_plans.py)
+INDEXES = {
+    'idx_posts_created_at_id': 'posts (created_at, id)',
+    'idx_posts_user_id': 'posts (user_id, id)',
+    'idx_transactions_from_created': 'transactions (from_wallet, created_at)',
+    'idx_transactions_to_created': 'transactions (to_wallet, created_at)',
+    'idx_transactions_created_at': 'transactions (created_at)',
+    'idx_nft_tickets_active_event_date': 'nft_tickets (is_active, event_date)',
+    'idx_feedback_created_at': 'feedback (created_at)',
+    'idx_savings_pools_active_created': 'savings_pools (is_active, created_at)',
+    'idx_voting_polls_created_at': 'voting_polls (created_at)',
+    'idx_social_outbox_due': 'social_outbox (status, next_attempt_at)',
+    'idx_social_outbox_post': 'social_outbox (post_id)',
+    'idx_poll_votes_voter': 'poll_votes (voter_wallet)',
+    'idx_pool_participants_wallet': 'pool_participants (wallet)',
+    'idx_ticket_reservations_event': 'ticket_reservations (event_id, status, expires_at)',
+    'idx_ticket_reservations_due': 'ticket_reservations (status, expires_at)',
+}
 
 # Database initialization
 def init_db():
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
-    
-    # Users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            wallet_address TEXT UNIQUE NOT NULL,
-            username TEXT UNIQUE,
-            email TEXT,
-            avatar_url TEXT,
-            bio TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            is_verified BOOLEAN DEFAULT FALSE,
-            social_tokens TEXT  -- JSON string for social media tokens
-        )
-    ''')
-    
-    # Posts table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS posts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            content TEXT NOT NULL,
-            media_urls TEXT,  -- JSON array of media URLs
-            post_type TEXT DEFAULT 'text',  -- text, image, video, nft
-            blockchain_hash TEXT,
-            cross_platform_status TEXT,  -- JSON of platform posting status
-            likes_count INTEGER DEFAULT 0,
-            shares_count INTEGER DEFAULT 0,
-            comments_count INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    ''')
-    
-    # Transactions table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS transactions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            from_wallet TEXT NOT NULL,
-            to_wallet TEXT NOT NULL,
-            amount REAL NOT NULL,
-            transaction_hash TEXT UNIQUE,
-            transaction_type TEXT,  -- tip, payment, purchase, savings
-            related_post_id INTEGER,
-            gas_fee REAL,
-            status TEXT DEFAULT 'pending',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (related_post_id) REFERENCES posts (id)
-        )
-    ''')
-    
-    # NFT Tickets table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS nft_tickets (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            event_name TEXT NOT NULL,
-            event_date TIMESTAMP,
-            venue TEXT,
-            price REAL,
-            total_supply INTEGER,
-            remaining_supply INTEGER,
-            creator_wallet TEXT,
-            nft_contract_address TEXT,
-            metadata_uri TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    # Feedback table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feedback (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            content TEXT NOT NULL,
-            category TEXT,
-            is_anonymous BOOLEAN DEFAULT TRUE,
-            user_wallet TEXT,
-            verification_hash TEXT,
-            upvotes INTEGER DEFAULT 0,
-            downvotes INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+        # Users table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                wallet_address TEXT UNIQUE NOT NULL,
+                username TEXT UNIQUE,
+                email TEXT,
+                avatar_url TEXT,
+                bio TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                is_verified BOOLEAN DEFAULT FALSE,
+                social_tokens TEXT  -- JSON string for social media tokens
+            )
+        ''')
+    
+        # Posts table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS posts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                content TEXT NOT NULL,
+                media_urls TEXT,  -- JSON array of media URLs
+                post_type TEXT DEFAULT 'text',  -- text, image, video, nft
+                blockchain_hash TEXT,
+                cross_platform_status TEXT,  -- JSON of platform posting status
+                likes_count INTEGER DEFAULT 0,
+                shares_count INTEGER DEFAULT 0,
+                comments_count INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+    
+        # Transactions table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                from_wallet TEXT NOT NULL,
+                to_wallet TEXT NOT NULL,
+                amount REAL NOT NULL,
+                transaction_hash TEXT UNIQUE,
+                transaction_type TEXT,  -- tip, payment, purchase, savings
+                related_post_id INTEGER,
+                gas_fee REAL,
+                status TEXT DEFAULT 'pending',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (related_post_id) REFERENCES posts (id)
+            )
+        ''')
+    
+        # NFT Tickets table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS nft_tickets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_name TEXT NOT NULL,
+                event_date TIMESTAMP,
+                venue TEXT,
+                price REAL,
+                total_supply INTEGER,
+                remaining_supply INTEGER,
+                creator_wallet TEXT,
+                nft_contract_address TEXT,
+                metadata_uri TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                is_active BOOLEAN DEFAULT TRUE
+            )
+        ''')
+    
+        # get_nft_tickets filters on is_active, which older databases lack
+        cursor.execute('PRAGMA table_info(nft_tickets)')
+        if 'is_active' not in [column[1] for column in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE nft_tickets ADD COLUMN is_active BOOLEAN DEFAULT TRUE')
+    
+        # Feedback table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS feedback (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content TEXT NOT NULL,
+                category TEXT,
+                is_anonymous BOOLEAN DEFAULT TRUE,
+                user_wallet TEXT,
+                verification_hash TEXT,
+                upvotes INTEGER DEFAULT 0,
+                downvotes INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    
+        # Savings Pools table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS savings_pools (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                pool_name TEXT NOT NULL,
+                description TEXT,
+                target_amount REAL,
+                current_amount REAL DEFAULT 0,
+                creator_wallet TEXT,
+                participants TEXT,  -- JSON array of participant wallets
+                end_date TIMESTAMP,
+                pool_type TEXT,  -- goal_based, time_based, rotating
+                smart_contract_address TEXT,
+                is_active BOOLEAN DEFAULT TRUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    
+        # Voting Polls table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS voting_polls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT,
+                options TEXT,  -- JSON array of voting options
+                creator_wallet TEXT,
+                eligible_voters TEXT,  -- JSON array or criteria
+                votes TEXT,  -- JSON object of wallet -> vote
+                start_date TIMESTAMP,
+                end_date TIMESTAMP,
+                is_blockchain_verified BOOLEAN DEFAULT FALSE,
+                smart_contract_address TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    
+        # One row per ballot; replaces the voting_polls.votes blob
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS poll_votes (
+                poll_id INTEGER NOT NULL,
+                voter_wallet TEXT NOT NULL,
+                option TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (poll_id, voter_wallet),
+                FOREIGN KEY (poll_id) REFERENCES voting_polls (id)
+            ) WITHOUT ROWID
+        ''')
+    
+        # Running vote count per poll option, maintained alongside poll_votes
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS poll_tallies (
+                poll_id INTEGER NOT NULL,
+                option TEXT NOT NULL,
+                votes INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (poll_id, option),
+                FOREIGN KEY (poll_id) REFERENCES voting_polls (id)
+            ) WITHOUT ROWID
+        ''')
+    
+        # Pool membership and per-member contributions; replaces savings_pools.participants
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pool_participants (
+                pool_id INTEGER NOT NULL,
+                wallet TEXT NOT NULL,
+                total_contributed REAL NOT NULL DEFAULT 0,
+                contributions INTEGER NOT NULL DEFAULT 0,
+                joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (pool_id, wallet),
+                FOREIGN KEY (pool_id) REFERENCES savings_pools (id)
+            ) WITHOUT ROWID
+        ''')
+    
+        # Short-lived ticket holds taken by tickets.reserve()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ticket_reservations (
+                id TEXT PRIMARY KEY,
+                event_id INTEGER NOT NULL,
+                buyer_wallet TEXT NOT NULL,
+                status TEXT DEFAULT 'held',  -- held, completed, expired, released
+                expires_at REAL NOT NULL,  -- unix time the hold lapses
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (event_id) REFERENCES nft_tickets (id)
+            )
+        ''')
+    
+        # Social publishing outbox, drained by outbox.py workers
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS social_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                post_id INTEGER NOT NULL,
+                platform TEXT NOT NULL,
+                content TEXT,
+                media_urls TEXT,  -- JSON array of media URLs
+                status TEXT DEFAULT 'pending',  -- pending, in_progress, published, failed
+                attempts INTEGER DEFAULT 0,
+                next_attempt_at REAL,  -- unix time the row is due
+                claimed_at REAL,
+                last_error TEXT,
+                result TEXT,  -- JSON of the platform response
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (post_id) REFERENCES posts (id)
+            )
+        ''')
+    
+        # Change counters behind the list endpoints' ETags
+        install_version_triggers(cursor)
+    
+        # Full-text indexes over posts and feedback
+        search.install(cursor)
+    
+        # Hashtag index and trending counters
+        hashtags.install(cursor)
+    
+        # Follower graph and materialized home timelines
+        timeline.install(cursor)
+    
+        # Per-wallet transaction totals
+        ledger.install(cursor)
+    
+        # Indexes
+        for index_name, definition in INDEXES.items():
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON {definition}')
     
-    # Savings Pools table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS savings_pools (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            pool_name TEXT NOT NULL,
-            description TEXT,
-            target_amount REAL,
-            current_amount REAL DEFAULT 0,
-            creator_wallet TEXT,
-            participants TEXT,  -- JSON array of participant wallets
-            end_date TIMESTAMP,
-            pool_type TEXT,  -- goal_based, time_based, rotating
-            smart_contract_address TEXT,
-            is_active BOOLEAN DEFAULT TRUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+        conn.commit()
+        cursor.execute('PRAGMA optimize')
     
-    # Voting Polls table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS voting_polls (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            description TEXT,
-            options TEXT,  -- JSON array of voting options
-            creator_wallet TEXT,
-            eligible_voters TEXT,  -- JSON array or criteria
-            votes TEXT,  -- JSON object of wallet -> vote
-            start_date TIMESTAMP,
-            end_date TIMESTAMP,
-            is_blockchain_verified BOOLEAN DEFAULT FALSE,
-            smart_contract_address TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        # Rewrite rows stored with str() before JSON columns went through codec
+        codec.migrate_legacy_rows(conn)
+        migrate_poll_votes(conn)
+        migrate_pool_participants(conn)
+
+def migrate_pool_participants(conn):
+    """Move legacy savings_pools.participants lists into pool_participants"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, participants FROM savings_pools WHERE participants IS NOT NULL AND participants != ''")
+    pools = cursor.fetchall()
+    if not pools:
+        return
+    
+    for pool_id, participants in pools:
+        cursor.executemany('''
+            INSERT OR IGNORE INTO pool_participants (pool_id, wallet)
+            VALUES (?, ?)
+        ''', [(pool_id, wallet) for wallet in codec.decode(participants, []) if wallet])
+    
+    # Contributions made before the table existed are in transactions
+    pool_ids = [pool[0] for pool in pools]
+    placeholders = ','.join('?' * len(pool_ids))
+    cursor.execute(f'''
+        UPDATE pool_participants
+        SET (total_contributed, contributions) = (
+            SELECT COALESCE(SUM(t.amount), 0), COUNT(t.id) FROM transactions t
+            WHERE t.related_post_id = pool_participants.pool_id
+              AND t.from_wallet = pool_participants.wallet
+              AND t.transaction_type = 'pool_contribution'
         )
-    ''')
+        WHERE pool_id IN ({placeholders})
+    ''', pool_ids)
+    cursor.execute(f'UPDATE savings_pools SET participants = NULL WHERE id IN ({placeholders})', pool_ids)
+    conn.commit()
+
+def migrate_poll_votes(conn):
+    """Move ballots from legacy voting_polls.votes blobs into poll_votes/poll_tallies"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, votes FROM voting_polls WHERE votes IS NOT NULL AND votes != ''")
+    polls = cursor.fetchall()
+    if not polls:
+        return
     
+    for poll_id, votes in polls:
+        ballots = codec.decode(votes, {})
+        cursor.executemany('''
+            INSERT OR IGNORE INTO poll_votes (poll_id, voter_wallet, option)
+            VALUES (?, ?, ?)
+        ''', [(poll_id, wallet, option) for wallet, option in ballots.items()])
+    
+    poll_ids = [poll[0] for poll in polls]
+    placeholders = ','.join('?' * len(poll_ids))
+    cursor.execute(f'DELETE FROM poll_tallies WHERE poll_id IN ({placeholders})', poll_ids)
+    cursor.execute(f'''
+        INSERT INTO poll_tallies (poll_id, option, votes)
+        SELECT poll_id, option, COUNT(*) FROM poll_votes
+        WHERE poll_id IN ({placeholders})
+        GROUP BY poll_id, option
+    ''', poll_ids)
+    cursor.execute(f'UPDATE voting_polls SET votes = NULL WHERE id IN ({placeholders})', poll_ids)
     conn.commit()
-    conn.close()
-
-# Social Media Integration Functions
-def post_to_twitter(content, media_urls=None):
-    """Post content to Twitter (placeholder for API integration)"""
-    # Would integrate with Twitter API v2
-    return {"status": "success", "platform": "twitter", "post_id": f"tw_{uuid.uuid4()}"}
-
-def post_to_instagram(content, media_urls=None):
-    """Post content to Instagram (placeholder for API integration)"""
-    # Would integrate with Instagram Basic Display API
-    return {"status": "success", "platform": "instagram", "post_id": f"ig_{uuid.uuid4()}"}
-
-def post_to_facebook(content, media_urls=None):
-    """Post content to Facebook (placeholder for API integration)"""
-    # Would integrate with Facebook Graph API
-    return {"status": "success", "platform": "facebook", "post_id": f"fb_{uuid.uuid4()}"}
-
-def post_to_youtube(content, media_urls=None):
-    """Post content to YouTube (placeholder for API integration)"""
-    # Would integrate with YouTube Data API for community posts
-    return {"status": "success", "platform": "youtube", "post_id": f"yt_{uuid.uuid4()}"}
-
-def cross_platform_post(content, media_urls=None, platforms=None):
-    """Post to multiple social media platforms"""
-    if platforms is None:
-        platforms = ['twitter', 'instagram', 'facebook', 'youtube']
-    
-    results = {}
-    
-    if 'twitter' in platforms:
-        results['twitter'] = post_to_twitter(content, media_urls)
-    if 'instagram' in platforms:
-        results['instagram'] = post_to_instagram(content, media_urls)
-    if 'facebook' in platforms:
-        results['facebook'] = post_to_facebook(content, media_urls)
-    if 'youtube' in platforms:
-        results['youtube'] = post_to_youtube(content, media_urls)
-    
-    return results
 
 # API Routes
 
@@ -187,29 +344,82 @@ def register_user():
     username = data.get('username')
     email = data.get('email')
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    try:
-        cursor.execute('''
-            INSERT INTO users (wallet_address, username, email)
-            VALUES (?, ?, ?)
-        ''', (wallet_address, username, email))
-        conn.commit()
-        user_id = cursor.lastrowid
+        try:
+            cursor.execute('''
+                INSERT INTO users (wallet_address, username, email)
+                VALUES (?, ?, ?)
+            ''', (wallet_address, username, email))
+            conn.commit()
+            user_id = cursor.lastrowid
         
-        return jsonify({
-            'success': True,
-            'user_id': user_id,
-            'message': 'User registered successfully'
-        })
-    except sqlite3.IntegrityError as e:
-        return jsonify({
-            'success': False,
-            'message': 'User already exists'
-        }), 400
-    finally:
-        conn.close()
+            return jsonify({
+                'success': True,
+                'user_id': user_id,
+                'message': 'User registered successfully'
+            })
+        except sqlite3.IntegrityError as e:
+            return jsonify({
+                'success': False,
+                'message': 'User already exists'
+            }), 400
+
+def follow_request(data):
+    """(follower_id, followee_id) for a follow/unfollow body, or an error response"""
+    follower_wallet = data.get('follower_wallet')
+    followee_wallet = data.get('followee_wallet')
+    if not follower_wallet or not followee_wallet:
+        return None, (jsonify({'success': False, 'message': 'follower_wallet and followee_wallet are required'}), 400)
+    if follower_wallet == followee_wallet:
+        return None, (jsonify({'success': False, 'message': 'Users cannot follow themselves'}), 400)
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT wallet_address, id FROM users WHERE wallet_address IN (?, ?)',
+                       (follower_wallet, followee_wallet))
+        user_ids = dict(cursor.fetchall())
+    
+    if len(user_ids) < 2:
+        return None, (jsonify({'success': False, 'message': 'User not found'}), 404)
+    return (user_ids[follower_wallet], user_ids[followee_wallet]), None
+
+@app.route('/api/users/follow', methods=['POST'])
+def follow_user():
+    """Follow an account; its recent posts are copied into the follower's timeline"""
+    ids, error = follow_request(request.get_json() or {})
+    if error:
+        return error
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        created = timeline.follow(cursor, *ids)
+        conn.commit()
+    
+    return jsonify({
+        'success': True,
+        'following': True,
+        'message': 'User followed' if created else 'Already following'
+    })
+
+@app.route('/api/users/unfollow', methods=['POST'])
+def unfollow_user():
+    """Unfollow an account and drop its posts from the follower's timeline"""
+    ids, error = follow_request(request.get_json() or {})
+    if error:
+        return error
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        removed = timeline.unfollow(cursor, *ids)
+        conn.commit()
+    
+    return jsonify({
+        'success': True,
+        'following': False,
+        'message': 'User unfollowed' if removed else 'Not following'
+    })
 
 @app.route('/api/posts/create', methods=['POST'])
 def create_post():
@@ -221,154 +431,394 @@ def create_post():
     cross_post = data.get('cross_post', True)
     platforms = data.get('platforms', ['twitter', 'instagram', 'facebook', 'youtube'])
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    # Get user ID
-    cursor.execute('SELECT id FROM users WHERE wallet_address = ?', (user_wallet,))
-    user = cursor.fetchone()
+        # Get user ID
+        cursor.execute('SELECT id FROM users WHERE wallet_address = ?', (user_wallet,))
+        user = cursor.fetchone()
     
-    if not user:
-        return jsonify({'success': False, 'message': 'User not found'}), 404
+        if not user:
+            return jsonify({'success': False, 'message': 'User not found'}), 404
     
-    user_id = user[0]
+        user_id = user[0]
     
-    # Cross-platform posting
-    cross_platform_status = {}
-    if cross_post:
-        cross_platform_status = cross_platform_post(content, media_urls, platforms)
+        # Cross-platform posting is queued and published by the outbox workers
+        cross_platform_status = outbox.queued_status(platforms) if cross_post else {}
     
-    # Create post in database
-    cursor.execute('''
-        INSERT INTO posts (user_id, content, media_urls, post_type, cross_platform_status)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (user_id, content, str(media_urls), post_type, str(cross_platform_status)))
+        # Create post in database
+        cursor.execute('''
+            INSERT INTO posts (user_id, content, media_urls, post_type, cross_platform_status)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (user_id, content, codec.encode(media_urls), post_type, codec.encode(cross_platform_status)))
+        post_id = cursor.lastrowid
+        tags = hashtags.record(cursor, post_id, content)
+        timeline.fan_out(cursor, post_id)
     
-    conn.commit()
-    post_id = cursor.lastrowid
-    conn.close()
+        if cross_post:
+            outbox.enqueue(cursor, post_id, platforms, content, media_urls)
+    
+        # Held across the commit so concurrent posts reach live streams in id order
+        with streams.posts.ordered():
+            conn.commit()
+            publish_new_post(cursor, post_id)
+    
+    feed_cache.invalidate()
+    if cross_post:
+        outbox.notify()
     
     return jsonify({
         'success': True,
         'post_id': post_id,
+        'hashtags': tags,
         'cross_platform_status': cross_platform_status,
+        'status_url': f'/api/posts/{post_id}/publish-status',
         'message': 'Post created successfully'
     })
 
+def encode_feed_cursor(created_at, post_id):
+    """Opaque keyset cursor for the post after (created_at, id)"""
+    raw = json.dumps([created_at, post_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_feed_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        created_at, post_id = json.loads(raw)
+        return str(created_at), int(post_id)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+def post_row_to_dict(post):
+    return {
+        'id': post[0],
+        'content': post[2],
+        'media_urls': codec.decode(post[3], []),
+        'post_type': post[4],
+        'blockchain_hash': post[5],
+        'cross_platform_status': codec.decode(post[6], {}),
+        'likes_count': post[7],
+        'shares_count': post[8],
+        'comments_count': post[9],
+        'created_at': post[10],
+        'username': post[11],
+        'avatar_url': post[12],
+        'wallet_address': post[13]
+    }
+
+# Post fields the feed endpoints can project with ?fields=
+POST_FIELDS = projection.Projection({
+    'id': 'p.id',
+    'content': 'p.content',
+    'media_urls': ('p.media_urls', lambda value: codec.decode(value, [])),
+    'post_type': 'p.post_type',
+    'blockchain_hash': 'p.blockchain_hash',
+    'cross_platform_status': ('p.cross_platform_status', lambda value: codec.decode(value, {})),
+    'likes_count': 'p.likes_count',
+    'shares_count': 'p.shares_count',
+    'comments_count': 'p.comments_count',
+    'created_at': 'p.created_at',
+    'username': 'u.username',
+    'avatar_url': 'u.avatar_url',
+    'wallet_address': 'u.wallet_address',
+})
+
+def fetch_posts_page(cursor, limit, offset=0, after=None, fields=None):
+    """Newest-first page of posts, by keyset (after) or by offset.
+
+    Ordering is (created_at, id) DESC so the idx_posts_created_at_id index
+    serves both modes; with ``after`` set, the page starts with an index seek
+    and costs the same however deep it is. Only POST_FIELDS ``fields`` (all by
+    default) are selected, leading each row. Returns (rows, has_more, next_cursor).
+    """
+    names = POST_FIELDS.names(fields or list(POST_FIELDS.columns), ('created_at', 'id'))
+    columns = POST_FIELDS.select(names)
+    if after is not None:
+        cursor.execute(f'''
+            SELECT {columns}
+            FROM posts p
+            JOIN users u ON p.user_id = u.id
+            WHERE (p.created_at, p.id) < (?, ?)
+            ORDER BY p.created_at DESC, p.id DESC
+            LIMIT ?
+        ''', (after[0], after[1], limit + 1))
+    else:
+        cursor.execute(f'''
+            SELECT {columns}
+            FROM posts p
+            JOIN users u ON p.user_id = u.id
+            ORDER BY p.created_at DESC, p.id DESC
+            LIMIT ? OFFSET ?
+        ''', (limit + 1, offset))
+    
+    rows = cursor.fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = encode_feed_cursor(rows[-1][names.index('created_at')], rows[-1][names.index('id')])
+    return rows, has_more, next_cursor
+
+def fetch_posts_since(cursor, after_id, limit):
+    """Posts with id > after_id, oldest first, as (event_id, event, data) stream events"""
+    cursor.execute('''
+        SELECT p.*, u.username, u.avatar_url, u.wallet_address
+        FROM posts p
+        JOIN users u ON p.user_id = u.id
+        WHERE p.id > ?
+        ORDER BY p.id
+        LIMIT ?
+    ''', (after_id, limit))
+    return [(post[0], 'post', post_row_to_dict(post)) for post in cursor.fetchall()]
+
+def publish_new_post(cursor, post_id):
+    """Push a committed post to live stream subscribers"""
+    for event_id, event, data in fetch_posts_since(cursor, post_id - 1, 1):
+        streams.posts.publish(event_id, event, data)
+
+def load_posts_since(after_id, limit):
+    with get_db() as conn:
+        return fetch_posts_since(conn.cursor(), after_id, limit)
+
 @app.route('/api/posts/feed', methods=['GET'])
+@conditional_get('posts', 'users')
 def get_feed():
-    page = int(request.args.get('page', 1))
-    limit = int(request.args.get('limit', 20))
+    page = max(1, request.args.get('page', 1, type=int))
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
     offset = (page - 1) * limit
+    cursor_token = request.args.get('cursor')
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    try:
+        after = decode_feed_cursor(cursor_token) if cursor_token else None
+        fields = POST_FIELDS.parse(request.args.get('fields'))
+        compact = projection.parse_format(request.args.get('format'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    def load_page():
+        with get_db() as conn:
+            cursor = conn.cursor()
+            posts, has_more, next_cursor = fetch_posts_page(cursor, limit, offset, after, fields)
+    
+        return {
+            'success': True,
+            'posts': POST_FIELDS.records(posts, fields),
+            'page': page,
+            'has_more': has_more,
+            'next_cursor': next_cursor
+        }
+    
+    page_data = feed_cache.get_or_compute(('feed', page, limit, cursor_token, tuple(fields)), load_page)
+    posts = counters.buffer.overlay('posts', page_data['posts'])
+    return jsonify(dict(page_data, posts=projection.encode(posts, fields, compact)))
+
+@app.route('/api/posts/stream', methods=['GET'])
+def stream_posts():
+    """Server-Sent Events stream of new posts, resumable with Last-Event-ID"""
+    try:
+        last_event_id = streams.parse_last_event_id(request.headers.get('Last-Event-ID'),
+                                                    request.args.get('last_event_id'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
-    cursor.execute('''
-        SELECT p.*, u.username, u.avatar_url, u.wallet_address
-        FROM posts p
-        JOIN users u ON p.user_id = u.id
-        ORDER BY p.created_at DESC
-        LIMIT ? OFFSET ?
-    ''', (limit, offset))
-    
-    posts = cursor.fetchall()
-    conn.close()
-    
-    posts_list = []
-    for post in posts:
-        posts_list.append({
-            'id': post[0],
-            'content': post[2],
-            'media_urls': eval(post[3]) if post[3] else [],
-            'post_type': post[4],
-            'blockchain_hash': post[5],
-            'cross_platform_status': eval(post[6]) if post[6] else {},
-            'likes_count': post[7],
-            'shares_count': post[8],
-            'comments_count': post[9],
-            'created_at': post[10],
-            'username': post[11],
-            'avatar_url': post[12],
-            'wallet_address': post[13]
-        })
+    return Response(streams.posts.stream(last_event_id, load_posts_since), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/posts/timeline', methods=['GET'])
+def get_timeline():
+    """A user's home timeline (own posts and followed accounts), paged by ?before=<post id>"""
+    wallet = request.args.get('wallet')
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    before = request.args.get('before', type=int)
+    
+    if not wallet:
+        return jsonify({'success': False, 'message': 'wallet is required'}), 400
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM users WHERE wallet_address = ?', (wallet,))
+        user = cursor.fetchone()
+    
+        if not user:
+            return jsonify({'success': False, 'message': 'User not found'}), 404
+    
+        rows, next_before = timeline.page(cursor, user[0], limit, before)
     
     return jsonify({
         'success': True,
-        'posts': posts_list,
-        'page': page
+        'posts': counters.buffer.overlay('posts', [post_row_to_dict(row) for row in rows]),
+        'has_more': next_before is not None,
+        'next_before': next_before
     })
 
 @app.route('/api/posts', methods=['GET'])
+@conditional_get('posts', 'users')
 def get_posts():
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = max(1, min(request.args.get('per_page', 10, type=int), 100))
     offset = (page - 1) * per_page
+    cursor_token = request.args.get('cursor')
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    try:
+        after = decode_feed_cursor(cursor_token) if cursor_token else None
+        fields = POST_FIELDS.parse(request.args.get('fields'))
+        compact = projection.parse_format(request.args.get('format'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    def load_page():
+        with get_db() as conn:
+            cursor = conn.cursor()
+            posts, has_more, next_cursor = fetch_posts_page(cursor, per_page, offset, after, fields)
+            page_data = {
+                'success': True,
+                'posts': POST_FIELDS.records(posts, fields),
+                'page': page,
+                'has_more': has_more,
+                'next_cursor': next_cursor
+            }
+    
+            # Page numbers only mean something in offset mode. The count walks the
+            # whole index, so it is skipped for cursors and cached with the page;
+            # it joins users like the page query so the totals agree with the pages
+            if after is None:
+                cursor.execute('''
+                    SELECT COUNT(*)
+                    FROM posts p
+                    JOIN users u ON p.user_id = u.id
+                ''')
+                total = cursor.fetchone()[0]
+                page_data.update(total=total, total_pages=max(1, -(-total // per_page)))
+    
+        return page_data
+    
+    page_data = feed_cache.get_or_compute(('posts', page, per_page, cursor_token, tuple(fields)), load_page)
+    posts = counters.buffer.overlay('posts', page_data['posts'])
+    return jsonify(dict(page_data, posts=projection.encode(posts, fields, compact)))
+
+def bump_post_counter(post_id, column):
+    """Buffer a like/share and return the post's counts including pending deltas"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, likes_count, shares_count FROM posts WHERE id = ?', (post_id,))
+        post = cursor.fetchone()
     
-    cursor.execute('''
-        SELECT p.*, u.username, u.avatar_url, u.wallet_address
-        FROM posts p
-        JOIN users u ON p.user_id = u.id
-        ORDER BY p.created_at DESC
-        LIMIT ? OFFSET ?
-    ''', (per_page, offset))
-    
-    posts = cursor.fetchall()
-    conn.close()
-    
-    posts_list = []
-    for post in posts:
-        posts_list.append({
-            'id': post[0],
-            'content': post[2],
-            'media_urls': eval(post[3]) if post[3] else [],
-            'post_type': post[4],
-            'blockchain_hash': post[5],
-            'cross_platform_status': eval(post[6]) if post[6] else {},
-            'likes_count': post[7],
-            'shares_count': post[8],
-            'comments_count': post[9],
-            'created_at': post[10],
-            'username': post[11],
-            'avatar_url': post[12],
-            'wallet_address': post[13]
-        })
+    if not post:
+        return jsonify({'success': False, 'message': 'Post not found'}), 404
+    
+    counters.buffer.increment('posts', column, post_id)
+    counts = counters.buffer.overlay('posts', [{'id': post[0], 'likes_count': post[1], 'shares_count': post[2]}])[0]
+    return jsonify({
+        'success': True,
+        'post_id': post_id,
+        'likes_count': counts['likes_count'],
+        'shares_count': counts['shares_count']
+    })
+
+@app.route('/api/posts/<int:post_id>/like', methods=['POST'])
+def like_post(post_id):
+    return bump_post_counter(post_id, 'likes_count')
+
+@app.route('/api/posts/<int:post_id>/share', methods=['POST'])
+def share_post(post_id):
+    return bump_post_counter(post_id, 'shares_count')
+
+@app.route('/api/hashtags/<tag>/posts', methods=['GET'])
+@conditional_get('posts', 'users')
+def get_hashtag_posts(tag):
+    """Newest posts carrying a hashtag, paged by ?before=<post id>"""
+    tag = hashtags.normalize(tag)
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    before = request.args.get('before', type=int)
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        rows, next_before = hashtags.posts_for_tag(cursor, tag, limit, before)
+    
+    return jsonify({
+        'success': True,
+        'tag': tag,
+        'posts': counters.buffer.overlay('posts', [post_row_to_dict(row) for row in rows]),
+        'has_more': next_before is not None,
+        'next_before': next_before
+    })
+
+@app.route('/api/hashtags/trending', methods=['GET'])
+def get_trending_hashtags():
+    """Top hashtags by recent, decayed use"""
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        trending = hashtags.trending(cursor, limit)
+    
+    return jsonify({
+        'success': True,
+        'window_hours': round(hashtags.TRENDING_WINDOW_BUCKETS * hashtags.BUCKET_SECONDS / 3600, 2),
+        'half_life_hours': round(hashtags.TRENDING_HALF_LIFE / 3600, 2),
+        'trending': trending
+    })
+
+@app.route('/api/search', methods=['GET'])
+@conditional_get('posts', 'users', 'feedback')
+def search_content():
+    """Ranked full-text search over posts or feedback"""
+    query = request.args.get('q', '')
+    search_type = request.args.get('type', 'posts')
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    cursor_token = request.args.get('cursor')
+    
+    if search_type not in ('posts', 'feedback'):
+        return jsonify({'success': False, 'message': 'type must be posts or feedback'}), 400
+    
+    match_query = search.build_match_query(query)
+    if match_query is None:
+        return jsonify({'success': False, 'message': 'Search query is required'}), 400
+    
+    try:
+        after = search.decode_cursor(cursor_token) if cursor_token else None
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        if search_type == 'posts':
+            results, next_cursor = search.search_posts(cursor, match_query, limit, after)
+        else:
+            results, next_cursor = search.search_feedback(cursor, match_query, limit, after)
     
     return jsonify({
         'success': True,
-        'posts': posts_list,
-        'page': page,
-        'total_pages': 1,  # You can calculate this based on total count if needed
-        'has_more': len(posts_list) == per_page
+        'query': query,
+        'type': search_type,
+        'results': results,
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor
     })
 
 @app.route('/api/transactions/record', methods=['POST'])
 def record_transaction():
     data = request.get_json()
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute('''
-        INSERT INTO transactions (from_wallet, to_wallet, amount, transaction_hash, transaction_type, related_post_id, gas_fee, status)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        data.get('from_wallet'),
-        data.get('to_wallet'),
-        data.get('amount'),
-        data.get('transaction_hash'),
-        data.get('transaction_type'),
-        data.get('related_post_id'),
-        data.get('gas_fee'),
-        data.get('status', 'confirmed')
-    ))
+        cursor.execute('''
+            INSERT INTO transactions (from_wallet, to_wallet, amount, transaction_hash, transaction_type, related_post_id, gas_fee, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            data.get('from_wallet'),
+            data.get('to_wallet'),
+            data.get('amount'),
+            data.get('transaction_hash'),
+            data.get('transaction_type'),
+            data.get('related_post_id'),
+            data.get('gas_fee'),
+            data.get('status', 'confirmed')
+        ))
     
-    conn.commit()
-    transaction_id = cursor.lastrowid
-    conn.close()
+        conn.commit()
+        transaction_id = cursor.lastrowid
     
     return jsonify({
         'success': True,
@@ -376,31 +826,53 @@ def record_transaction():
         'message': 'Transaction recorded successfully'
     })
 
+def batch_response(run, items):
+    """Run a batch writer and summarise its per-item results"""
+    try:
+        with get_db() as conn:
+            results = run(conn, items)
+    except batch.BatchError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    succeeded = sum(1 for result in results if result['success'])
+    return jsonify({
+        'success': True,
+        'processed': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results
+    })
+
+@app.route('/api/transactions/batch', methods=['POST'])
+def record_transactions_batch():
+    """Record many transactions in one database transaction"""
+    data = request.get_json() or {}
+    return batch_response(batch.record_transactions, data.get('transactions'))
+
 @app.route('/api/nft-tickets/create', methods=['POST'])
 def create_nft_ticket():
     data = request.get_json()
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute('''
-        INSERT INTO nft_tickets (event_name, event_date, venue, price, total_supply, remaining_supply, creator_wallet, nft_contract_address, metadata_uri)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        data.get('event_name'),
-        data.get('event_date'),
-        data.get('venue'),
-        data.get('price'),
-        data.get('total_supply'),
-        data.get('total_supply'),  # remaining_supply starts as total_supply
-        data.get('creator_wallet'),
-        data.get('nft_contract_address'),
-        data.get('metadata_uri')
-    ))
+        cursor.execute('''
+            INSERT INTO nft_tickets (event_name, event_date, venue, price, total_supply, remaining_supply, creator_wallet, nft_contract_address, metadata_uri)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            data.get('event_name'),
+            data.get('event_date'),
+            data.get('venue'),
+            data.get('price'),
+            data.get('total_supply'),
+            data.get('total_supply'),  # remaining_supply starts as total_supply
+            data.get('creator_wallet'),
+            data.get('nft_contract_address'),
+            data.get('metadata_uri')
+        ))
     
-    conn.commit()
-    ticket_id = cursor.lastrowid
-    conn.close()
+        conn.commit()
+        ticket_id = cursor.lastrowid
     
     return jsonify({
         'success': True,
@@ -412,26 +884,25 @@ def create_nft_ticket():
 def submit_feedback():
     data = request.get_json()
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    # Generate verification hash for anonymous feedback
-    verification_hash = hashlib.sha256(f"{data.get('content')}{datetime.datetime.now()}".encode()).hexdigest()
+        # Generate verification hash for anonymous feedback
+        verification_hash = hashlib.sha256(f"{data.get('content')}{datetime.datetime.now()}".encode()).hexdigest()
     
-    cursor.execute('''
-        INSERT INTO feedback (content, category, is_anonymous, user_wallet, verification_hash)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (
-        data.get('content'),
-        data.get('category'),
-        data.get('is_anonymous', True),
-        data.get('user_wallet') if not data.get('is_anonymous', True) else None,
-        verification_hash
-    ))
+        cursor.execute('''
+            INSERT INTO feedback (content, category, is_anonymous, user_wallet, verification_hash)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (
+            data.get('content'),
+            data.get('category'),
+            data.get('is_anonymous', True),
+            data.get('user_wallet') if not data.get('is_anonymous', True) else None,
+            verification_hash
+        ))
     
-    conn.commit()
-    feedback_id = cursor.lastrowid
-    conn.close()
+        conn.commit()
+        feedback_id = cursor.lastrowid
     
     return jsonify({
         'success': True,
@@ -444,26 +915,31 @@ def submit_feedback():
 def create_savings_pool():
     data = request.get_json()
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute('''
-        INSERT INTO savings_pools (pool_name, description, target_amount, creator_wallet, participants, end_date, pool_type, smart_contract_address)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        data.get('pool_name'),
-        data.get('description'),
-        data.get('target_amount'),
-        data.get('creator_wallet'),
-        str([data.get('creator_wallet')]),  # Creator is first participant
-        data.get('end_date'),
-        data.get('pool_type'),
-        data.get('smart_contract_address')
-    ))
+        cursor.execute('''
+            INSERT INTO savings_pools (pool_name, description, target_amount, creator_wallet, end_date, pool_type, smart_contract_address)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            data.get('pool_name'),
+            data.get('description'),
+            data.get('target_amount'),
+            data.get('creator_wallet'),
+            data.get('end_date'),
+            data.get('pool_type'),
+            data.get('smart_contract_address')
+        ))
+        pool_id = cursor.lastrowid
     
-    conn.commit()
-    pool_id = cursor.lastrowid
-    conn.close()
+        # Creator is first participant
+        if data.get('creator_wallet'):
+            cursor.execute('''
+                INSERT INTO pool_participants (pool_id, wallet)
+                VALUES (?, ?)
+            ''', (pool_id, data.get('creator_wallet')))
+    
+        conn.commit()
     
     return jsonify({
         'success': True,
@@ -475,27 +951,26 @@ def create_savings_pool():
 def create_voting_poll():
     data = request.get_json()
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute('''
-        INSERT INTO voting_polls (title, description, options, creator_wallet, eligible_voters, start_date, end_date, is_blockchain_verified, smart_contract_address)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        data.get('title'),
-        data.get('description'),
-        str(data.get('options')),
-        data.get('creator_wallet'),
-        str(data.get('eligible_voters', [])),
-        data.get('start_date'),
-        data.get('end_date'),
-        data.get('is_blockchain_verified', False),
-        data.get('smart_contract_address')
-    ))
+        cursor.execute('''
+            INSERT INTO voting_polls (title, description, options, creator_wallet, eligible_voters, start_date, end_date, is_blockchain_verified, smart_contract_address)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            data.get('title'),
+            data.get('description'),
+            codec.encode(data.get('options')),
+            data.get('creator_wallet'),
+            codec.encode(data.get('eligible_voters', [])),
+            data.get('start_date'),
+            data.get('end_date'),
+            data.get('is_blockchain_verified', False),
+            data.get('smart_contract_address')
+        ))
     
-    conn.commit()
-    poll_id = cursor.lastrowid
-    conn.close()
+        conn.commit()
+        poll_id = cursor.lastrowid
     
     return jsonify({
         'success': True,
@@ -503,66 +978,152 @@ def create_voting_poll():
         'message': 'Voting poll created successfully'
     })
 
+def fetch_poll_tallies(cursor, poll_ids):
+    """{poll_id: {option: votes}} from poll_tallies; individual ballots are never loaded"""
+    tallies = {}
+    if poll_ids:
+        cursor.execute(f'''
+            SELECT poll_id, option, votes FROM poll_tallies
+            WHERE poll_id IN ({','.join('?' * len(poll_ids))}) AND votes > 0
+        ''', list(poll_ids))
+        for poll_id, option, votes in cursor.fetchall():
+            tallies.setdefault(poll_id, {})[option] = votes
+    return tallies
+
+def load_poll_results(conn, poll_ids):
+    """Live-result snapshots for the poll stream channels"""
+    tallies = fetch_poll_tallies(conn.cursor(), poll_ids)
+    return {
+        poll_id: {
+            'poll_id': poll_id,
+            'tallies': tallies.get(poll_id, {}),
+            'total_votes': sum(tallies.get(poll_id, {}).values())
+        }
+        for poll_id in poll_ids
+    }
+
+# Subscribers of /api/voting/<poll_id>/stream, pushed coalesced tallies
+poll_results = streams.SnapshotChannels('tally', load_poll_results)
+
+def apply_poll_vote(cursor, poll_id, user_wallet, vote_option):
+    """Upsert one ballot and adjust the option tallies; caller owns the transaction.
+
+    Returns the wallet's previous option (None for a first vote).
+    """
+    cursor.execute('SELECT option FROM poll_votes WHERE poll_id = ? AND voter_wallet = ?', (poll_id, user_wallet))
+    previous = cursor.fetchone()
+    previous_option = previous[0] if previous else None
+    if previous_option == vote_option:
+        return previous_option
+    
+    cursor.execute('''
+        INSERT INTO poll_votes (poll_id, voter_wallet, option)
+        VALUES (?, ?, ?)
+        ON CONFLICT (poll_id, voter_wallet)
+        DO UPDATE SET option = excluded.option, updated_at = CURRENT_TIMESTAMP
+    ''', (poll_id, user_wallet, vote_option))
+    
+    if previous_option is not None:
+        cursor.execute('''
+            UPDATE poll_tallies SET votes = votes - 1
+            WHERE poll_id = ? AND option = ?
+        ''', (poll_id, previous_option))
+    cursor.execute('''
+        INSERT INTO poll_tallies (poll_id, option, votes)
+        VALUES (?, ?, 1)
+        ON CONFLICT (poll_id, option) DO UPDATE SET votes = votes + 1
+    ''', (poll_id, vote_option))
+    return previous_option
+
 @app.route('/api/voting/<int:poll_id>/vote', methods=['POST'])
 def vote_on_poll(poll_id):
     data = request.get_json()
     user_wallet = data.get('user_wallet')
     vote_option = data.get('vote_option')
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    if not user_wallet or vote_option is None:
+        return jsonify({'success': False, 'message': 'user_wallet and vote_option are required'}), 400
+    vote_option = str(vote_option)
     
-    # Get current votes
-    cursor.execute('SELECT votes FROM voting_polls WHERE id = ?', (poll_id,))
-    poll = cursor.fetchone()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        # Take the write lock up front so the read of the previous ballot
+        # and the tally updates can't interleave with another vote
+        cursor.execute('BEGIN IMMEDIATE')
     
-    if not poll:
-        return jsonify({'success': False, 'message': 'Poll not found'}), 404
+        cursor.execute('SELECT options FROM voting_polls WHERE id = ?', (poll_id,))
+        poll = cursor.fetchone()
     
-    current_votes = eval(poll[0]) if poll[0] else {}
-    current_votes[user_wallet] = vote_option
+        if not poll:
+            return jsonify({'success': False, 'message': 'Poll not found'}), 404
     
-    # Update votes
-    cursor.execute('UPDATE voting_polls SET votes = ? WHERE id = ?', (str(current_votes), poll_id))
-    conn.commit()
-    conn.close()
+        options = [str(option) for option in codec.decode(poll[0], None) or []]
+        if options and vote_option not in options:
+            return jsonify({'success': False, 'message': 'Invalid vote option'}), 400
     
+        apply_poll_vote(cursor, poll_id, user_wallet, vote_option)
+        conn.commit()
+    
+    poll_results.changed(poll_id)
     return jsonify({
         'success': True,
         'message': 'Vote recorded successfully'
     })
 
+@app.route('/api/voting/votes/batch', methods=['POST'])
+def vote_on_polls_batch():
+    """Record many ballots, across any number of polls, in one database transaction"""
+    data = request.get_json() or {}
+    votes = data.get('votes')
+    response = batch_response(batch.apply_poll_votes, votes)
+    if isinstance(votes, list):
+        # A rejected or unchanged ballot at most costs its watchers one extra push
+        poll_results.changed(*{vote['poll_id'] for vote in votes
+                               if isinstance(vote, dict) and isinstance(vote.get('poll_id'), int)})
+    return response
+
+@app.route('/api/voting/<int:poll_id>/stream', methods=['GET'])
+def stream_poll_results(poll_id):
+    """Server-Sent Events stream of a poll's tallies, pushed at most STREAM_SNAPSHOT_RATE times a second"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT 1 FROM voting_polls WHERE id = ?', (poll_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Poll not found'}), 404
+    
+    return Response(poll_results.stream(poll_id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# Feedback fields /api/feedback/list can project with ?fields=
+FEEDBACK_FIELDS = projection.Projection({
+    name: name for name in ('id', 'content', 'category', 'is_anonymous', 'user_wallet', 'verification_hash',
+                            'upvotes', 'downvotes', 'created_at')
+})
+
 @app.route('/api/feedback/list', methods=['GET'])
+@conditional_get('feedback')
 def get_feedback():
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    try:
+        fields = FEEDBACK_FIELDS.parse(request.args.get('fields'))
+        compact = projection.parse_format(request.args.get('format'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
-    cursor.execute('''
-        SELECT * FROM feedback
-        ORDER BY created_at DESC
-        LIMIT 50
-    ''')
-    
-    feedback_list = cursor.fetchall()
-    conn.close()
-    
-    feedback_data = []
-    for feedback in feedback_list:
-        feedback_data.append({
-            'id': feedback[0],
-            'content': feedback[1],
-            'category': feedback[2],
-            'is_anonymous': feedback[3],
-            'user_wallet': feedback[4],
-            'verification_hash': feedback[5],
-            'upvotes': feedback[6],
-            'downvotes': feedback[7],
-            'created_at': feedback[8]
-        })
+    with get_db() as conn:
+        cursor = conn.cursor()
+    
+        cursor.execute(f'''
+            SELECT {FEEDBACK_FIELDS.select(fields)} FROM feedback
+            ORDER BY created_at DESC
+            LIMIT 50
+        ''')
+    
+        feedback_list = cursor.fetchall()
     
+    feedback_data = counters.buffer.overlay('feedback', FEEDBACK_FIELDS.records(feedback_list, fields))
     return jsonify({
         'success': True,
-        'feedback': feedback_data
+        'feedback': projection.encode(feedback_data, fields, compact)
     })
 
 @app.route('/api/feedback/<int:feedback_id>/vote', methods=['POST'])
@@ -570,55 +1131,65 @@ def vote_feedback(feedback_id):
     data = request.get_json()
     vote_type = data.get('vote_type')
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    # The flush drops deltas for missing rows, so check before buffering
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT 1 FROM feedback WHERE id = ?', (feedback_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Feedback not found'}), 404
     
+    # Buffered and flushed in batches by the counter service
     if vote_type == 'upvote':
-        cursor.execute('UPDATE feedback SET upvotes = upvotes + 1 WHERE id = ?', (feedback_id,))
+        counters.buffer.increment('feedback', 'upvotes', feedback_id)
     elif vote_type == 'downvote':
-        cursor.execute('UPDATE feedback SET downvotes = downvotes + 1 WHERE id = ?', (feedback_id,))
-    
-    conn.commit()
-    conn.close()
+        counters.buffer.increment('feedback', 'downvotes', feedback_id)
     
     return jsonify({
         'success': True,
         'message': 'Vote recorded successfully'
     })
 
+@app.route('/api/feedback/votes/batch', methods=['POST'])
+def vote_feedback_batch():
+    """Apply many feedback votes in one database transaction"""
+    data = request.get_json() or {}
+    return batch_response(batch.apply_feedback_votes, data.get('votes'))
+
+# Ticket fields /api/nft-tickets/list can project with ?fields=
+TICKET_FIELDS = projection.Projection({
+    name: name for name in ('id', 'event_name', 'event_date', 'venue', 'price', 'total_supply', 'remaining_supply',
+                            'creator_wallet', 'nft_contract_address', 'metadata_uri', 'created_at')
+})
+
 @app.route('/api/nft-tickets/list', methods=['GET'])
 def get_nft_tickets():
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    # Lapsed holds go back to supply first, so the listing and its ETag both count them
+    with get_db() as conn:
+        tickets.expire_lapsed(conn)
+    return list_nft_tickets()
+
+@conditional_get('nft_tickets')
+def list_nft_tickets():
+    try:
+        fields = TICKET_FIELDS.parse(request.args.get('fields'))
+        compact = projection.parse_format(request.args.get('format'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
-    cursor.execute('''
-        SELECT * FROM nft_tickets
-        WHERE is_active = TRUE
-        ORDER BY event_date ASC
-    ''')
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    tickets = cursor.fetchall()
-    conn.close()
+        cursor.execute(f'''
+            SELECT {TICKET_FIELDS.select(fields)} FROM nft_tickets
+            WHERE is_active = TRUE
+            ORDER BY event_date ASC
+        ''')
     
-    tickets_list = []
-    for ticket in tickets:
-        tickets_list.append({
-            'id': ticket[0],
-            'event_name': ticket[1],
-            'event_date': ticket[2],
-            'venue': ticket[3],
-            'price': ticket[4],
-            'total_supply': ticket[5],
-            'remaining_supply': ticket[6],
-            'creator_wallet': ticket[7],
-            'nft_contract_address': ticket[8],
-            'metadata_uri': ticket[9],
-            'created_at': ticket[10]
-        })
+        tickets = cursor.fetchall()
     
     return jsonify({
         'success': True,
-        'tickets': tickets_list
+        'tickets': projection.encode(TICKET_FIELDS.records(tickets, fields), fields, compact)
     })
 
 @app.route('/api/transactions/payment', methods=['POST'])
@@ -631,25 +1202,24 @@ def process_payment():
     platforms = data.get('platforms', [])
     content = data.get('content')
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    # Record payment transaction
-    cursor.execute('''
-        INSERT INTO transactions (from_wallet, to_wallet, amount, transaction_hash, transaction_type, status)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (
-        wallet_address,
-        '0x742d35Cc6b3c8D21C04A7b7D7A4DA1E5CF1A9D2E',  # Your receiving address
-        amount,
-        transaction_hash,
-        'social_posting_payment',
-        'confirmed'
-    ))
+        # Record payment transaction
+        cursor.execute('''
+            INSERT INTO transactions (from_wallet, to_wallet, amount, transaction_hash, transaction_type, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            wallet_address,
+            '0x742d35Cc6b3c8D21C04A7b7D7A4DA1E5CF1A9D2E',  # Your receiving address
+            amount,
+            transaction_hash,
+            'social_posting_payment',
+            'confirmed'
+        ))
     
-    conn.commit()
-    transaction_id = cursor.lastrowid
-    conn.close()
+        conn.commit()
+        transaction_id = cursor.lastrowid
     
     return jsonify({
         'success': True,
@@ -681,102 +1251,61 @@ def post_to_social_platform():
             'error': 'Invalid platform'
         }), 400
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    try:
-        # Simulate posting to social media platform
-        if platform == 'twitter':
-            result = post_to_twitter_api(content, wallet_address)
-        elif platform == 'facebook':
-            result = post_to_facebook_api(content, wallet_address)
-        elif platform == 'instagram':
-            result = post_to_instagram_api(content, wallet_address)
-        elif platform == 'linkedin':
-            result = post_to_linkedin_api(content, wallet_address)
-        elif platform == 'youtube':
-            result = post_to_youtube_api(content, wallet_address)
+        try:
+            # Record the post; publishing happens in the outbox workers
+            cursor.execute('''
+                INSERT INTO posts (user_id, content, post_type, cross_platform_status)
+                SELECT id, ?, 'cross_platform', ?
+                FROM users WHERE wallet_address = ?
+            ''', (content, codec.encode(outbox.queued_status([platform])), wallet_address))
         
-        # Record the post
-        cursor.execute('''
-            INSERT INTO posts (user_id, content, post_type, cross_platform_status)
-            SELECT id, ?, 'cross_platform', ?
-            FROM users WHERE wallet_address = ?
-        ''', (content, str({platform: result}), wallet_address))
+            if cursor.rowcount == 0:
+                return jsonify({
+                    'success': False,
+                    'error': 'User not found'
+                }), 404
         
-        conn.commit()
-        post_id = cursor.lastrowid
-        conn.close()
+            post_id = cursor.lastrowid
+            hashtags.record(cursor, post_id, content)
+            timeline.fan_out(cursor, post_id)
+            outbox.enqueue(cursor, post_id, [platform], content)
+            with streams.posts.ordered():
+                conn.commit()
+                publish_new_post(cursor, post_id)
         
-        return jsonify({
-            'success': True,
-            'platform': platform,
-            'post_id': result.get('post_id'),
-            'url': result.get('url'),
-            'message': f'Successfully posted to {platform}'
-        })
-        
-    except Exception as e:
-        conn.close()
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-def post_to_twitter_api(content, wallet_address):
-    """Post to Twitter (simulated)"""
-    # In real implementation, use Twitter API v2
-    post_id = f"tw_{uuid.uuid4().hex[:8]}"
-    return {
-        'post_id': post_id,
-        'url': f"https://twitter.com/user/status/{post_id}",
-        'platform': 'twitter',
-        'timestamp': datetime.datetime.now().isoformat()
-    }
-
-def post_to_facebook_api(content, wallet_address):
-    """Post to Facebook (simulated)"""
-    # In real implementation, use Facebook Graph API
-    post_id = f"fb_{uuid.uuid4().hex[:8]}"
-    return {
-        'post_id': post_id,
-        'url': f"https://facebook.com/posts/{post_id}",
-        'platform': 'facebook',
-        'timestamp': datetime.datetime.now().isoformat()
-    }
-
-def post_to_instagram_api(content, wallet_address):
-    """Post to Instagram (simulated)"""
-    # In real implementation, use Instagram Basic Display API
-    post_id = f"ig_{uuid.uuid4().hex[:8]}"
-    return {
-        'post_id': post_id,
-        'url': f"https://instagram.com/p/{post_id}",
-        'platform': 'instagram',
-        'timestamp': datetime.datetime.now().isoformat()
-    }
-
-def post_to_linkedin_api(content, wallet_address):
-    """Post to LinkedIn (simulated)"""
-    # In real implementation, use LinkedIn API
-    post_id = f"li_{uuid.uuid4().hex[:8]}"
-    return {
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+    
+    feed_cache.invalidate()
+    outbox.notify()
+    
+    return jsonify({
+        'success': True,
+        'platform': platform,
         'post_id': post_id,
-        'url': f"https://linkedin.com/posts/{post_id}",
-        'platform': 'linkedin',
-        'timestamp': datetime.datetime.now().isoformat()
-    }
+        'status': 'queued',
+        'status_url': f'/api/posts/{post_id}/publish-status',
+        'message': f'Post queued for {platform}'
+    })
 
-def post_to_youtube_api(content, wallet_address):
-    """Post to YouTube Community (simulated)"""
-    # In real implementation, use YouTube Data API
-    post_id = f"yt_{uuid.uuid4().hex[:8]}"
-    return {
+@app.route('/api/posts/<int:post_id>/publish-status', methods=['GET'])
+def get_publish_status(post_id):
+    """Per-platform publishing progress for a post"""
+    platforms_status = outbox.post_status(post_id)
+    if not platforms_status:
+        return jsonify({'success': False, 'message': 'No publishing jobs for this post'}), 404
+    
+    return jsonify({
+        'success': True,
         'post_id': post_id,
-        'url': f"https://youtube.com/post/{post_id}",
-        'platform': 'youtube',
-        'timestamp': datetime.datetime.now().isoformat()
-    }
+        'platforms': platforms_status
+    })
 
 @app.route('/api/user/authenticate', methods=['POST'])
 def authenticate_user():
@@ -791,17 +1320,19 @@ def authenticate_user():
     stored_password = os.getenv('USER_PASSWORD', 'darshan@987')
     
     if email == stored_email and password == stored_password:
-        conn = sqlite3.connect('social_dapp.db')
-        cursor = conn.cursor()
+        with get_db() as conn:
+            cursor = conn.cursor()
         
-        # Update or create user record
-        cursor.execute('''
-            INSERT OR REPLACE INTO users (wallet_address, username, email, is_verified)
-            VALUES (?, ?, ?, ?)
-        ''', (wallet_address, f"User_{wallet_address[-6:]}", email, True))
+            # Update or create user record
+            cursor.execute('''
+                INSERT OR REPLACE INTO users (wallet_address, username, email, is_verified)
+                VALUES (?, ?, ?, ?)
+            ''', (wallet_address, f"User_{wallet_address[-6:]}", email, True))
         
-        conn.commit()
-        conn.close()
+            conn.commit()
+        
+        # Feed rows embed usernames
+        feed_cache.invalidate()
         
         return jsonify({
             'success': True,
@@ -823,18 +1354,25 @@ def get_transaction_history():
     """Get transaction history for a wallet"""
     wallet = request.args.get('wallet')
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT * FROM transactions 
-        WHERE from_wallet = ? OR to_wallet = ?
-        ORDER BY created_at DESC
-        LIMIT 50
-    ''', (wallet, wallet))
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    transactions = cursor.fetchall()
-    conn.close()
+        # UNION of two index seeks rather than an OR, which forces a table scan
+        cursor.execute('''
+            SELECT * FROM (
+                SELECT * FROM transactions WHERE from_wallet = ?
+                ORDER BY created_at DESC LIMIT 50
+            )
+            UNION
+            SELECT * FROM (
+                SELECT * FROM transactions WHERE to_wallet = ?
+                ORDER BY created_at DESC LIMIT 50
+            )
+            ORDER BY created_at DESC
+            LIMIT 50
+        ''', (wallet, wallet))
+    
+        transactions = cursor.fetchall()
     
     transaction_list = []
     for tx in transactions:
@@ -856,39 +1394,140 @@ def get_transaction_history():
         'transactions': transaction_list
     })
 
-@app.route('/api/nft-tickets/purchase', methods=['POST'])
-def purchase_nft_ticket():
+@app.route('/api/transactions/summary', methods=['GET'])
+def get_transaction_summary():
+    """Sent/received totals for a wallet by transaction type"""
+    wallet = request.args.get('wallet')
+    if not wallet:
+        return jsonify({'success': False, 'message': 'wallet is required'}), 400
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        summary = ledger.summary(cursor, wallet)
+    
+    return jsonify({
+        'success': True,
+        **summary
+    })
+
+def export_response(name, fmt, rows):
+    """Stream an export generator as an attachment"""
+    return Response(rows, mimetype=export.FORMATS[fmt], headers={
+        'Content-Disposition': f'attachment; filename="{name}.{fmt}"',
+        'Cache-Control': 'no-store'
+    })
+
+@app.route('/api/export/transactions', methods=['GET'])
+def export_transactions():
+    """Stream transactions as NDJSON or CSV; resume with ?after=<last id received>"""
+    fmt = request.args.get('format', 'ndjson')
+    direction = request.args.get('direction', 'all')
+    
+    if fmt not in export.FORMATS:
+        return jsonify({'success': False, 'message': 'format must be ndjson or csv'}), 400
+    if direction not in ('all', 'sent', 'received'):
+        return jsonify({'success': False, 'message': 'direction must be all, sent or received'}), 400
+    
+    try:
+        rows = export.export_transactions(
+            fmt,
+            wallet=request.args.get('wallet'),
+            direction=direction,
+            tx_type=request.args.get('type'),
+            since=export.parse_timestamp(request.args.get('since'), 'since'),
+            until=export.parse_timestamp(request.args.get('until'), 'until'),
+            after=request.args.get('after', type=int)
+        )
+    except export.ExportError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return export_response('transactions', fmt, rows)
+
+@app.route('/api/export/posts', methods=['GET'])
+def export_posts():
+    """Stream posts as NDJSON or CSV; resume with ?after=<last id received>"""
+    fmt = request.args.get('format', 'ndjson')
+    
+    if fmt not in export.FORMATS:
+        return jsonify({'success': False, 'message': 'format must be ndjson or csv'}), 400
+    
+    try:
+        rows = export.export_posts(
+            fmt,
+            since=export.parse_timestamp(request.args.get('since'), 'since'),
+            until=export.parse_timestamp(request.args.get('until'), 'until'),
+            after=request.args.get('after', type=int)
+        )
+    except export.ExportError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return export_response('posts', fmt, rows)
+
+@app.route('/api/nft-tickets/reserve', methods=['POST'])
+def reserve_nft_ticket():
+    """Hold one ticket for a buyer while they complete payment"""
     data = request.get_json()
+    event_id = data.get('event_id')
+    buyer_wallet = data.get('buyer_wallet')
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    if not event_id or not buyer_wallet:
+        return jsonify({'success': False, 'message': 'event_id and buyer_wallet are required'}), 400
     
-    # Update remaining supply
-    cursor.execute('''
-        UPDATE nft_tickets 
-        SET remaining_supply = remaining_supply - 1 
-        WHERE id = ? AND remaining_supply > 0
-    ''', (data.get('event_id'),))
+    try:
+        with get_db() as conn:
+            reservation_id, expires_at = tickets.reserve(conn, event_id, buyer_wallet)
+    except tickets.PurchaseError as e:
+        return jsonify({'success': False, 'message': str(e)}), e.status
     
-    # Record transaction
-    cursor.execute('''
-        INSERT INTO transactions (from_wallet, to_wallet, amount, transaction_hash, transaction_type, related_post_id, status)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        data.get('buyer_wallet'),
-        'platform_wallet',  # Platform or event creator wallet
-        data.get('amount_paid'),
-        data.get('transaction_hash'),
-        'nft_purchase',
-        data.get('event_id'),
-        'confirmed'
-    ))
+    return jsonify({
+        'success': True,
+        'reservation_id': reservation_id,
+        'expires_at': expires_at,
+        'message': 'Ticket reserved'
+    })
+
+@app.route('/api/nft-tickets/reservations/<reservation_id>/release', methods=['POST'])
+def release_nft_ticket_reservation(reservation_id):
+    data = request.get_json()
     
-    conn.commit()
-    conn.close()
+    try:
+        with get_db() as conn:
+            tickets.release_reservation(conn, reservation_id, data.get('buyer_wallet'))
+    except tickets.PurchaseError as e:
+        return jsonify({'success': False, 'message': str(e)}), e.status
+    
+    return jsonify({
+        'success': True,
+        'message': 'Reservation released'
+    })
+
+@app.route('/api/nft-tickets/purchase', methods=['POST'])
+def purchase_nft_ticket():
+    data = request.get_json()
+    event_id = data.get('event_id')
+    buyer_wallet = data.get('buyer_wallet')
+    
+    if not event_id or not buyer_wallet:
+        return jsonify({'success': False, 'message': 'event_id and buyer_wallet are required'}), 400
+    
+    try:
+        with get_db() as conn:
+            transaction_id = tickets.purchase(
+                conn,
+                event_id,
+                buyer_wallet,
+                data.get('amount_paid'),
+                data.get('transaction_hash'),
+                data.get('reservation_id')
+            )
+    except tickets.PurchaseError as e:
+        return jsonify({'success': False, 'message': str(e)}), e.status
+    except sqlite3.IntegrityError:
+        return jsonify({'success': False, 'message': 'Transaction already recorded'}), 409
     
     return jsonify({
         'success': True,
+        'transaction_id': transaction_id,
         'message': 'Ticket purchased successfully'
     })
 
@@ -896,18 +1535,17 @@ def purchase_nft_ticket():
 def get_my_tickets():
     wallet = request.args.get('wallet')
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute('''
-        SELECT nt.* FROM nft_tickets nt
-        JOIN transactions t ON nt.id = t.related_post_id
-        WHERE t.from_wallet = ? AND t.transaction_type = 'nft_purchase'
-        ORDER BY nt.event_date ASC
-    ''', (wallet,))
+        cursor.execute('''
+            SELECT nt.* FROM nft_tickets nt
+            JOIN transactions t ON nt.id = t.related_post_id
+            WHERE t.from_wallet = ? AND t.transaction_type = 'nft_purchase'
+            ORDER BY nt.event_date ASC
+        ''', (wallet,))
     
-    tickets = cursor.fetchall()
-    conn.close()
+        tickets = cursor.fetchall()
     
     tickets_list = []
     for ticket in tickets:
@@ -931,18 +1569,24 @@ def get_my_tickets():
     })
 
 @app.route('/api/savings-pools/list', methods=['GET'])
+@conditional_get('savings_pools', 'pool_participants')
 def get_savings_pools():
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    wallet = request.args.get('wallet')
     
-    cursor.execute('''
-        SELECT * FROM savings_pools
-        WHERE is_active = TRUE
-        ORDER BY created_at DESC
-    ''')
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    pools = cursor.fetchall()
-    conn.close()
+        # Membership is aggregated per pool; the participant lists never leave SQLite
+        cursor.execute('''
+            SELECT sp.*,
+                (SELECT COUNT(*) FROM pool_participants pp WHERE pp.pool_id = sp.id),
+                EXISTS (SELECT 1 FROM pool_participants pp WHERE pp.pool_id = sp.id AND pp.wallet = ?)
+            FROM savings_pools sp
+            WHERE sp.is_active = TRUE
+            ORDER BY sp.created_at DESC
+        ''', (wallet,))
+    
+        pools = cursor.fetchall()
     
     pools_list = []
     for pool in pools:
@@ -953,7 +1597,8 @@ def get_savings_pools():
             'target_amount': pool[3],
             'current_amount': pool[4],
             'creator_wallet': pool[5],
-            'participants': pool[6],
+            'participant_count': pool[12],
+            'is_participant': bool(pool[13]),
             'end_date': pool[7],
             'pool_type': pool[8],
             'smart_contract_address': pool[9],
@@ -973,29 +1618,33 @@ def join_savings_pool():
     participant_wallet = data.get('participant_wallet')
     contribution_amount = data.get('contribution_amount')
     
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    if not participant_wallet or not batch.is_amount(contribution_amount) or contribution_amount < 0:
+        return jsonify({
+            'success': False,
+            'message': 'participant_wallet and a non-negative contribution_amount are required'
+        }), 400
     
-    # Get current pool data
-    cursor.execute('SELECT participants, current_amount FROM savings_pools WHERE id = ?', (pool_id,))
-    pool_data = cursor.fetchone()
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    if pool_data:
-        current_participants = eval(pool_data[0]) if pool_data[0] else []
-        current_amount = pool_data[1] or 0
-        
-        if participant_wallet not in current_participants:
-            current_participants.append(participant_wallet)
-        
-        new_amount = current_amount + contribution_amount
-        
-        # Update pool
+        # Atomic increment: the first write takes the lock, so no read-modify-write race
         cursor.execute('''
-            UPDATE savings_pools 
-            SET participants = ?, current_amount = ?
-            WHERE id = ?
-        ''', (str(current_participants), new_amount, pool_id))
-        
+            UPDATE savings_pools
+            SET current_amount = COALESCE(current_amount, 0) + ?
+            WHERE id = ? AND is_active = TRUE
+        ''', (contribution_amount, pool_id))
+    
+        if cursor.rowcount == 0:
+            return jsonify({'success': False, 'message': 'Pool not found'}), 404
+    
+        cursor.execute('''
+            INSERT INTO pool_participants (pool_id, wallet, total_contributed, contributions)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT (pool_id, wallet) DO UPDATE SET
+                total_contributed = total_contributed + excluded.total_contributed,
+                contributions = contributions + 1
+        ''', (pool_id, participant_wallet, contribution_amount))
+    
         # Record transaction
         cursor.execute('''
             INSERT INTO transactions (from_wallet, to_wallet, amount, transaction_hash, transaction_type, related_post_id, status)
@@ -1009,10 +1658,8 @@ def join_savings_pool():
             pool_id,
             'confirmed'
         ))
-        
-        conn.commit()
     
-    conn.close()
+        conn.commit()
     
     return jsonify({
         'success': True,
@@ -1020,20 +1667,30 @@ def join_savings_pool():
     })
 
 @app.route('/api/voting/list', methods=['GET'])
+@conditional_get('voting_polls', 'poll_tallies')
 def get_voting_polls():
-    conn = sqlite3.connect('social_dapp.db')
-    cursor = conn.cursor()
+    wallet = request.args.get('wallet')
     
-    cursor.execute('''
-        SELECT * FROM voting_polls
-        ORDER BY created_at DESC
-    ''')
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    polls = cursor.fetchall()
-    conn.close()
+        cursor.execute('''
+            SELECT * FROM voting_polls
+            ORDER BY created_at DESC
+        ''')
+    
+        polls = cursor.fetchall()
+    
+        tallies = fetch_poll_tallies(cursor, [poll[0] for poll in polls])
+    
+        user_votes = {}
+        if wallet:
+            cursor.execute('SELECT poll_id, option FROM poll_votes WHERE voter_wallet = ?', (wallet,))
+            user_votes = dict(cursor.fetchall())
     
     polls_list = []
     for poll in polls:
+        poll_tallies = tallies.get(poll[0], {})
         polls_list.append({
             'id': poll[0],
             'title': poll[1],
@@ -1041,7 +1698,9 @@ def get_voting_polls():
             'options': poll[3],
             'creator_wallet': poll[4],
             'eligible_voters': poll[5],
-            'votes': poll[6],
+            'tallies': poll_tallies,
+            'total_votes': sum(poll_tallies.values()),
+            'user_vote': user_votes.get(poll[0]),
             'start_date': poll[7],
             'end_date': poll[8],
             'is_blockchain_verified': poll[9],
@@ -1054,6 +1713,62 @@ def get_voting_polls():
         'polls': polls_list
     })
 
+@app.route('/api/system/db-pool', methods=['GET'])
+def get_db_pool_stats():
+    """Connection pool statistics for monitoring"""
+    return jsonify({
+        'success': True,
+        'pool': pool_stats()
+    })
+
+@app.route('/api/system/ticket-gate', methods=['GET'])
+def get_ticket_gate_stats():
+    """Ticket purchase admission and load-shedding counters"""
+    return jsonify({
+        'success': True,
+        'gate': tickets.gate.stats()
+    })
+
+@app.route('/api/system/cache', methods=['GET'])
+def get_cache_stats():
+    """Feed cache hit/miss/eviction counters"""
+    return jsonify({
+        'success': True,
+        'feed': feed_cache.stats()
+    })
+
+@app.route('/api/system/counters', methods=['GET'])
+def get_counter_stats():
+    """Write-coalescing counter buffer backlog and flush stats"""
+    return jsonify({
+        'success': True,
+        'counters': counters.buffer.stats()
+    })
+
+@app.route('/api/system/streams', methods=['GET'])
+def get_stream_stats():
+    """Live stream subscribers, publishes and slow-consumer evictions"""
+    return jsonify({
+        'success': True,
+        'posts': streams.posts.stats(),
+        'polls': poll_results.stats()
+    })
+
+@app.route('/api/system/outbox', methods=['GET'])
+def get_outbox_metrics():
+    """Publishing queue depth and drain rate"""
+    return jsonify({
+        'success': True,
+        'outbox': outbox.metrics()
+    })
+
+@app.route('/api/system/metrics', methods=['GET'])
+def get_request_metrics():
+    """Per-route request timing histograms in Prometheus text format"""
+    return Response(profiling.metrics.render(), content_type=profiling.CONTENT_TYPE)
+
 if __name__ == '__main__':
     init_db()
+    outbox.start_workers()
+    counters.buffer.start()
     app.run(debug=True, port=5000)
\ No newline at end of file
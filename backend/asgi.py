@@ -0,0 +1,340 @@
+"""ASGI entry point: the same /api routes served from an asyncio event loop.
+
+Production launch (from backend/):
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4 --no-access-log
+
+Each uvicorn worker is a separate process with its own connection pool and
+thread pools; SQLite's WAL journal lets them share the database file. The
+lifespan protocol runs init_db and starts the outbox workers and counter
+flusher on startup, and flushes pending counters on shutdown.
+
+Requests are served two ways:
+
+- Routes registered here with ``@app.route`` are coroutines on the event
+  loop. They reach SQLite only through ``db.run_async``, so they never block
+  the loop, and a long-lived response costs a task rather than a thread. No
+  route publishes to platforms; the outbox workers do, off the loop.
+- Every other request is handed to the Flask app on a bounded pool of
+  ASGI_THREADS threads. Once ASGI_MAX_PENDING requests are waiting for or
+  running on it, new ones get 503 with Retry-After instead of queueing without
+  bound. Bodies with a Content-Length are produced in one hop; streamed bodies
+  (exports) are pulled a chunk at a time and stop when the client disconnects.
+
+``benchmarks/asgi_vs_wsgi.py`` compares throughput with the threaded WSGI
+server used by ``python app.py``.
+"""
+import asyncio
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map, Rule
+
+import app as backend
+import codec
+import counters
+import db
+import outbox
+import streams
+
+THREADS = int(os.getenv('ASGI_THREADS', 32))  # threads running Flask requests
+MAX_PENDING = int(os.getenv('ASGI_MAX_PENDING', 256))  # Flask requests admitted before shedding with 503
+
+_DONE = object()
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': client[0],
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+async def read_body(receive):
+    """Whole request body, or None if the client went away first"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def send_json(send, payload, status=200, headers=()):
+    body = codec.encode(payload).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'access-control-allow-origin', b'*'),
+            *headers,
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_event_stream(receive, send, chunks):
+    """Send an SSE response from an async iterator of byte chunks until it ends or the client leaves"""
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+            (b'access-control-allow-origin', b'*'),
+        ],
+    })
+
+    async def pump():
+        async for chunk in chunks:
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    pumping = asyncio.ensure_future(pump())
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await asyncio.wait({pumping, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        pumping.cancel()
+        disconnected.cancel()
+        await asyncio.gather(pumping, disconnected, return_exceptions=True)
+        await chunks.aclose()
+
+
+def query_param(scope, name):
+    return parse_qs(scope.get('query_string', b'').decode('latin-1')).get(name, [None])[0]
+
+
+def header(scope, name):
+    for key, value in scope.get('headers', ()):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+class ASGIApp:
+    """ASGI application: native async routes first, the Flask app for the rest"""
+
+    def __init__(self, wsgi_app, threads=THREADS, max_pending=MAX_PENDING):
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi-wsgi')
+        self.url_map = Map()
+        # Only touched from the event loop thread
+        self.pending = 0
+        self.peak_pending = 0
+        self.wsgi_requests = 0
+        self.native_requests = 0
+        self.rejected = 0
+
+    def route(self, rule, methods=('GET',)):
+        """Register ``async def handler(scope, receive, send, **url_args)`` for a Flask-style rule"""
+        def register(handler):
+            self.url_map.add(Rule(rule, endpoint=handler, methods=list(methods)))
+            return handler
+        return register
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        try:
+            handler, url_args = self.url_map.bind('localhost').match(scope['path'], method=scope['method'])
+        except HTTPException:
+            # Unmatched here (404, 405 or a slash redirect): let Flask answer
+            await self.call_wsgi(scope, receive, send)
+            return
+        self.native_requests += 1
+        await handler(scope, receive, send, **url_args)
+
+    async def call_wsgi(self, scope, receive, send):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            await send_json(send, {'success': False, 'message': 'Server busy, retry shortly'}, 503,
+                            [(b'retry-after', b'1')])
+            return
+        body = await read_body(receive)
+        if body is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        self.wsgi_requests += 1
+        try:
+            status, headers, chunks, iterable = await loop.run_in_executor(
+                self.executor, self._run_wsgi, build_environ(scope, body)
+            )
+        finally:
+            self.pending -= 1
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        if iterable is None:
+            await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+            return
+        await self._stream(loop, receive, send, chunks, iterable)
+
+    def _run_wsgi(self, environ):
+        """Call the WSGI app in a pool thread; drains the body unless it is streamed"""
+        response = {}
+        chunks = []
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+            return chunks.append
+
+        iterable = self.wsgi_app(environ, start_response)
+        iterator = iter(iterable)
+        if 'status' not in response:
+            # start_response may be deferred to the first chunk
+            chunks.append(next(iterator, b''))
+        if any(name == b'content-length' for name, _ in response['headers']):
+            try:
+                chunks.extend(iterator)
+            finally:
+                if hasattr(iterable, 'close'):
+                    iterable.close()
+            return response['status'], response['headers'], chunks, None
+        return response['status'], response['headers'], chunks, (iterable, iterator)
+
+    async def _stream(self, loop, receive, send, chunks, iterable):
+        iterable, iterator = iterable
+        disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            for chunk in chunks:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            while not disconnected.done():
+                chunk = await loop.run_in_executor(self.executor, next, iterator, _DONE)
+                if chunk is _DONE:
+                    await send({'type': 'http.response.body', 'body': b''})
+                    break
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            disconnected.cancel()
+            if hasattr(iterable, 'close'):
+                await loop.run_in_executor(self.executor, iterable.close)
+
+    async def lifespan(self, receive, send):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await loop.run_in_executor(self.executor, self.startup)
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await loop.run_in_executor(self.executor, counters.buffer.flush)
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def startup(self):
+        backend.init_db()
+        outbox.start_workers()
+        counters.buffer.start()
+
+    def stats(self):
+        return {
+            'threads': self.threads,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'peak_pending': self.peak_pending,
+            'wsgi_requests': self.wsgi_requests,
+            'native_requests': self.native_requests,
+            'rejected': self.rejected,
+        }
+
+
+app = ASGIApp(backend.app)
+
+
+@app.route('/api/system/asgi')
+async def get_asgi_stats(scope, receive, send):
+    """Thread pool admission counters for the ASGI server"""
+    await send_json(send, {'success': True, 'asgi': app.stats(), 'pool': db.pool_stats()})
+
+
+@app.route('/api/system/health')
+async def get_health(scope, receive, send):
+    """Liveness probe answered on the event loop, so it never queues behind Flask requests"""
+    started = time.perf_counter()
+    await db.run_async(lambda conn: conn.execute('SELECT 1').fetchone())
+    await send_json(send, {'success': True, 'status': 'ok',
+                           'db_ms': round((time.perf_counter() - started) * 1000, 3)})
+
+
+@app.route('/api/posts/stream')
+async def stream_posts(scope, receive, send):
+    """New posts as Server-Sent Events; each idle subscriber is one suspended task"""
+    try:
+        last_event_id = streams.parse_last_event_id(header(scope, b'last-event-id'),
+                                                    query_param(scope, 'last_event_id'))
+    except ValueError as e:
+        await send_json(send, {'success': False, 'message': str(e)}, 400)
+        return
+
+    async def load_since(after_id, limit):
+        return await db.run_async(lambda conn: backend.fetch_posts_since(conn.cursor(), after_id, limit))
+
+    await send_event_stream(receive, send, streams.posts.stream_async(last_event_id, load_since))
+
+
+@app.route('/api/voting/<int:poll_id>/stream')
+async def stream_poll_results(scope, receive, send, poll_id):
+    """Coalesced live tallies for one poll as Server-Sent Events"""
+    exists = await db.run_async(lambda conn: conn.execute('SELECT 1 FROM voting_polls WHERE id = ?',
+                                                          (poll_id,)).fetchone())
+    if not exists:
+        await send_json(send, {'success': False, 'message': 'Poll not found'}, 404)
+        return
+    await send_event_stream(receive, send, backend.poll_results.stream_async(poll_id))
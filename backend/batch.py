@@ -0,0 +1,223 @@
+"""Batch writes for transactions, poll votes and feedback votes.
+
+Each function validates a list of items, writes every valid one with
+executemany inside a single ``BEGIN IMMEDIATE`` transaction and returns one
+result per item, in order: ``{'index', 'success', ...}`` on success or
+``{'index', 'success': False, 'message'}`` for an item that was rejected.
+Rejected items never abort the rest of the batch.
+"""
+import collections
+import os
+
+import codec
+
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 5000))
+# Rows per IN (...) lookup, well under SQLite's bound-parameter limit
+LOOKUP_CHUNK = 500
+
+
+class BatchError(ValueError):
+    """The batch as a whole is unusable (not a list, too large)"""
+
+
+def check_items(items):
+    if not isinstance(items, list) or not items:
+        raise BatchError('Expected a non-empty list of items')
+    if len(items) > BATCH_MAX_ITEMS:
+        raise BatchError(f'At most {BATCH_MAX_ITEMS} items per batch')
+
+
+def _rejected(index, message):
+    return {'index': index, 'success': False, 'message': message}
+
+
+def _chunks(values, size=LOOKUP_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _existing(cursor, sql, values):
+    """Run ``sql`` (with a single {placeholders} slot) over ``values`` in chunks"""
+    found = []
+    for chunk in _chunks(values):
+        cursor.execute(sql.format(placeholders=','.join('?' * len(chunk))), chunk)
+        found.extend(cursor.fetchall())
+    return found
+
+
+def is_amount(value):
+    """True for an int or float amount; bools, strings and None are rejected"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def record_transactions(conn, items):
+    """Insert transactions; per-item results carry the new transaction_id"""
+    check_items(items)
+    results = [None] * len(items)
+    valid = []
+    seen_hashes = set()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = _rejected(index, 'Item must be an object')
+        elif not item.get('from_wallet') or not item.get('to_wallet'):
+            results[index] = _rejected(index, 'from_wallet and to_wallet are required')
+        elif not is_amount(item.get('amount')):
+            results[index] = _rejected(index, 'amount must be a number')
+        elif item.get('transaction_hash') and item['transaction_hash'] in seen_hashes:
+            results[index] = _rejected(index, 'Duplicate transaction_hash in batch')
+        else:
+            if item.get('transaction_hash'):
+                seen_hashes.add(item['transaction_hash'])
+            valid.append(index)
+
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        recorded = {row[0] for row in _existing(
+            cursor, 'SELECT transaction_hash FROM transactions WHERE transaction_hash IN ({placeholders})',
+            seen_hashes
+        )}
+        rows = []
+        for index in valid:
+            if items[index].get('transaction_hash') in recorded:
+                results[index] = _rejected(index, 'transaction_hash already recorded')
+            else:
+                rows.append(index)
+
+        cursor.executemany('''
+            INSERT INTO transactions (from_wallet, to_wallet, amount, transaction_hash, transaction_type, related_post_id, gas_fee, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(
+            items[index]['from_wallet'],
+            items[index]['to_wallet'],
+            items[index]['amount'],
+            items[index].get('transaction_hash'),
+            items[index].get('transaction_type'),
+            items[index].get('related_post_id'),
+            items[index].get('gas_fee'),
+            items[index].get('status', 'confirmed')
+        ) for index in rows])
+
+        if rows:
+            # AUTOINCREMENT ids are handed out consecutively while we hold the write lock
+            last_id = cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+            for offset, index in enumerate(rows):
+                results[index] = {'index': index, 'success': True,
+                                  'transaction_id': last_id - len(rows) + 1 + offset}
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return results
+
+
+def apply_poll_votes(conn, items):
+    """Record ballots across polls; a later ballot in the batch replaces an earlier one"""
+    check_items(items)
+    results = [None] * len(items)
+    candidates = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = _rejected(index, 'Item must be an object')
+        elif not isinstance(item.get('poll_id'), int) or not item.get('user_wallet') or item.get('vote_option') is None:
+            results[index] = _rejected(index, 'poll_id, user_wallet and vote_option are required')
+        else:
+            candidates.append(index)
+
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        poll_options = {
+            poll_id: [str(option) for option in codec.decode(options, None) or []]
+            for poll_id, options in _existing(
+                cursor, 'SELECT id, options FROM voting_polls WHERE id IN ({placeholders})',
+                {items[index]['poll_id'] for index in candidates}
+            )
+        }
+
+        # Final ballot per (poll, wallet), in batch order
+        ballots = {}
+        for index in candidates:
+            item = items[index]
+            poll_id, option = item['poll_id'], str(item['vote_option'])
+            if poll_id not in poll_options:
+                results[index] = _rejected(index, 'Poll not found')
+            elif poll_options[poll_id] and option not in poll_options[poll_id]:
+                results[index] = _rejected(index, 'Invalid vote option')
+            else:
+                ballots[(poll_id, item['user_wallet'])] = option
+                results[index] = {'index': index, 'success': True}
+
+        previous = {}
+        for chunk in _chunks(ballots):
+            cursor.execute(f'''
+                SELECT v.poll_id, v.voter_wallet, v.option
+                FROM (VALUES {', '.join('(?, ?)' for _ in chunk)}) AS k
+                JOIN poll_votes v ON v.poll_id = k.column1 AND v.voter_wallet = k.column2
+            ''', [value for key in chunk for value in key])
+            previous.update({(poll_id, wallet): option for poll_id, wallet, option in cursor.fetchall()})
+
+        changed = [(key, option) for key, option in ballots.items() if previous.get(key) != option]
+        deltas = collections.Counter()
+        for (poll_id, wallet), option in changed:
+            deltas[(poll_id, option)] += 1
+            if (poll_id, wallet) in previous:
+                deltas[(poll_id, previous[(poll_id, wallet)])] -= 1
+
+        cursor.executemany('''
+            INSERT INTO poll_votes (poll_id, voter_wallet, option)
+            VALUES (?, ?, ?)
+            ON CONFLICT (poll_id, voter_wallet)
+            DO UPDATE SET option = excluded.option, updated_at = CURRENT_TIMESTAMP
+        ''', [(poll_id, wallet, option) for (poll_id, wallet), option in changed])
+        cursor.executemany('''
+            INSERT INTO poll_tallies (poll_id, option, votes)
+            VALUES (?, ?, ?)
+            ON CONFLICT (poll_id, option) DO UPDATE SET votes = votes + excluded.votes
+        ''', [(poll_id, option, delta) for (poll_id, option), delta in deltas.items() if delta])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return results
+
+
+def apply_feedback_votes(conn, items):
+    """Apply up/down votes, one UPDATE per distinct feedback id"""
+    check_items(items)
+    results = [None] * len(items)
+    candidates = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('feedback_id'), int):
+            results[index] = _rejected(index, 'feedback_id is required')
+        elif item.get('vote_type') not in ('upvote', 'downvote'):
+            results[index] = _rejected(index, 'vote_type must be upvote or downvote')
+        else:
+            candidates.append(index)
+
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        existing = {row[0] for row in _existing(
+            cursor, 'SELECT id FROM feedback WHERE id IN ({placeholders})',
+            {items[index]['feedback_id'] for index in candidates}
+        )}
+        counts = collections.defaultdict(lambda: [0, 0])
+        for index in candidates:
+            feedback_id = items[index]['feedback_id']
+            if feedback_id not in existing:
+                results[index] = _rejected(index, 'Feedback not found')
+                continue
+            counts[feedback_id][0 if items[index]['vote_type'] == 'upvote' else 1] += 1
+            results[index] = {'index': index, 'success': True}
+
+        cursor.executemany('''
+            UPDATE feedback SET upvotes = upvotes + ?, downvotes = downvotes + ?
+            WHERE id = ?
+        ''', [(up, down, feedback_id) for feedback_id, (up, down) in counts.items()])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return results
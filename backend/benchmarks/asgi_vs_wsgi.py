@@ -0,0 +1,143 @@
+"""Concurrent-request throughput: the threaded WSGI server vs the ASGI app.
+
+Seeds a scratch database with generate_data.py, then serves it with each
+server in turn (``app.run(threaded=True)`` as in ``python app.py``, and
+``uvicorn asgi:app``), both as a single process. For every concurrency level
+that many clients issue GETs over a read mix (feed, posts, history, summary,
+polls, search, trending) until the request budget is spent; requests/s,
+latency percentiles and errors are printed per server and level.
+
+    python benchmarks/asgi_vs_wsgi.py [concurrency,...] [requests_per_level]
+
+The servers run in subprocesses so they do not share the client's GIL.
+uvicorn must be installed for the ASGI side.
+"""
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+LEVELS = [int(level) for level in sys.argv[1].split(',')] if len(sys.argv) > 1 else [1, 16, 64, 256]
+REQUESTS = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+DATA = {'users': 5000, 'posts': 50000, 'transactions': 50000, 'tickets': 100, 'pools': 100, 'polls': 200,
+        'feedback': 1000}
+WORDS = ['web3', 'wallet', 'governance', 'hackathon', 'rollup', 'community']
+
+WSGI_SERVER = '''
+import logging, sys
+import app
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+app.init_db()
+app.app.run(port=int(sys.argv[1]), threaded=True)
+'''
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def read_mix(rng):
+    wallet = f'0x{rng.randrange(DATA["users"]):040x}'
+    return rng.choice([
+        f'/api/posts/feed?page={rng.randint(1, 5)}&limit=20',
+        f'/api/posts?page={rng.randint(1, 5)}&per_page=10',
+        f'/api/transactions/history?wallet={wallet}',
+        f'/api/transactions/summary?wallet={wallet}',
+        '/api/voting/list',
+        f'/api/search?q={rng.choice(WORDS)}',
+        '/api/hashtags/trending',
+    ])
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode())
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response[9:12])
+
+
+async def drive(port, concurrency, total, seed):
+    rng = random.Random(seed)
+    paths = [read_mix(rng) for _ in range(total)]
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        while paths:
+            path = paths.pop()
+            started = time.perf_counter()
+            try:
+                status = await fetch(port, path)
+            except OSError:
+                status = None
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def wait_until_ready(process, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'server exited with {process.returncode}')
+        try:
+            if asyncio.run(fetch(port, '/api/posts/feed?limit=1')) == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit('server did not start')
+
+
+def serve(kind, port, env):
+    if kind == 'wsgi':
+        command = [sys.executable, '-c', WSGI_SERVER, str(port)]
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(port),
+                   '--log-level', 'warning', '--no-access-log']
+    return subprocess.Popen(command, cwd=BACKEND, env=env, stdout=subprocess.DEVNULL)
+
+
+def main():
+    database = os.path.join(tempfile.mkdtemp(), 'asgi_vs_wsgi.db')
+    subprocess.run([sys.executable, 'generate_data.py', '--database', database, '--end', '2026-01-01',
+                    *[arg for table, count in DATA.items() for arg in (f'--{table}', str(count))]],
+                   cwd=BACKEND, check=True, stdout=subprocess.DEVNULL)
+    env = dict(os.environ, DATABASE_PATH=database, OUTBOX_WORKERS='0')
+
+    print(f'{REQUESTS} requests per concurrency level, one server process each')
+    print(f'{"server":6s} {"clients":>8s} {"req/s":>9s} {"p50 ms":>8s} {"p99 ms":>8s} {"errors":>7s}')
+    for kind in ('wsgi', 'asgi'):
+        port = free_port()
+        process = serve(kind, port, env)
+        try:
+            wait_until_ready(process, port)
+            for concurrency in LEVELS:
+                elapsed, latencies, errors = asyncio.run(drive(port, concurrency, REQUESTS, seed=concurrency))
+                latencies.sort()
+                p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+                print(f'{kind:6s} {concurrency:8d} {len(latencies) / elapsed:9,.0f} '
+                      f'{statistics.median(latencies) * 1000:8.2f} {p99 * 1000:8.2f} {errors:7d}', flush=True)
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
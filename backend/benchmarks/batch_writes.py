@@ -0,0 +1,88 @@
+"""Write throughput of the batch endpoints vs their single-item routes.
+
+Replays the same items through each single-item route (one HTTP call and one
+commit per item) and through its batch route, and prints rows/second.
+
+    python benchmarks/batch_writes.py [items] [batch_size]
+"""
+import os
+import sys
+import tempfile
+import time
+
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'batch_writes.db')
+os.environ['OUTBOX_WORKERS'] = '0'
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app as backend  # noqa: E402
+
+ITEMS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+BATCH_SIZE = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+
+def transactions(prefix):
+    return [{'from_wallet': f'0xfrom{i % 50}', 'to_wallet': f'0xto{i % 70}', 'amount': 0.001 * i,
+             'transaction_hash': f'{prefix}{i}', 'transaction_type': 'tip'} for i in range(ITEMS)]
+
+
+def poll_votes(poll_id):
+    return [{'poll_id': poll_id, 'user_wallet': f'0xvoter{i}', 'vote_option': 'abc'[i % 3]} for i in range(ITEMS)]
+
+
+def feedback_votes():
+    return [{'feedback_id': 1 + i % 20, 'vote_type': 'upvote' if i % 4 else 'downvote'} for i in range(ITEMS)]
+
+
+def run_single(client, kind, items):
+    for item in items:
+        if kind == 'transactions':
+            response = client.post('/api/transactions/record', json=item)
+        elif kind == 'poll votes':
+            response = client.post(f'/api/voting/{item["poll_id"]}/vote', json=item)
+        else:
+            response = client.post(f'/api/feedback/{item["feedback_id"]}/vote', json=item)
+        assert response.status_code == 200, response.data
+
+
+def run_batch(client, kind, items):
+    path, key = {
+        'transactions': ('/api/transactions/batch', 'transactions'),
+        'poll votes': ('/api/voting/votes/batch', 'votes'),
+        'feedback votes': ('/api/feedback/votes/batch', 'votes'),
+    }[kind]
+    for start in range(0, len(items), BATCH_SIZE):
+        response = client.post(path, json={key: items[start:start + BATCH_SIZE]})
+        body = response.get_json()
+        assert response.status_code == 200 and body['failed'] == 0, body
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def main():
+    backend.init_db()
+    client = backend.app.test_client()
+    for poll in range(2):
+        client.post('/api/voting/create', json={'title': f'Poll {poll}', 'options': ['a', 'b', 'c'],
+                                                'creator_wallet': '0xbench'})
+    for i in range(20):
+        client.post('/api/feedback/submit', json={'content': f'Feedback {i}', 'category': 'general'})
+
+    cases = [
+        ('transactions', transactions('single-'), transactions('batch-')),
+        ('poll votes', poll_votes(1), poll_votes(2)),
+        ('feedback votes', feedback_votes(), feedback_votes()),
+    ]
+    print(f'{ITEMS} items per run, batches of {BATCH_SIZE}')
+    print(f'{"kind":16s} {"single rows/s":>14s} {"batch rows/s":>13s} {"speedup":>8s}')
+    for kind, single_items, batch_items in cases:
+        single = timed(run_single, client, kind, single_items)
+        batched = timed(run_batch, client, kind, batch_items)
+        print(f'{kind:16s} {ITEMS / single:14,.0f} {ITEMS / batched:13,.0f} {single / batched:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Per-row decode cost of the posts JSON columns: eval() vs codec.decode().
+
+Builds a throwaway 100k-post table (repr-encoded, as the old create_post wrote
+it), times the feed row mapping with eval(), runs the one-shot migration and
+times the same mapping through codec.decode().
+
+    python benchmarks/codec_decode.py [rows]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import codec  # noqa: E402
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+
+def build(conn):
+    conn.execute('''
+        CREATE TABLE posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            media_urls TEXT,
+            cross_platform_status TEXT
+        )
+    ''')
+    for table in ('voting_polls', 'savings_pools'):
+        conn.execute(f'CREATE TABLE {table} (id INTEGER PRIMARY KEY, options, eligible_voters, votes, participants)')
+    media = ['https://example.com/nft1.jpg', 'https://example.com/nft2.jpg']
+    status = {p: {'status': 'success', 'platform': p, 'post_id': f'{p}_0123456789'}
+              for p in ('twitter', 'instagram', 'facebook', 'youtube')}
+    conn.executemany(
+        'INSERT INTO posts (media_urls, cross_platform_status) VALUES (?, ?)',
+        ((str(media if i % 3 == 0 else []), str(status)) for i in range(ROWS))
+    )
+    conn.commit()
+
+
+def timed(conn, decode):
+    rows = conn.execute('SELECT media_urls, cross_platform_status FROM posts').fetchall()
+    started = time.perf_counter()
+    for media_urls, status in rows:
+        decode(media_urls, [])
+        decode(status, {})
+    return time.perf_counter() - started
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, 'bench.db'))
+        build(conn)
+
+        before = timed(conn, lambda text, default: eval(text) if text else default)
+        started = time.perf_counter()
+        migrated = codec.migrate_legacy_rows(conn)
+        migration = time.perf_counter() - started
+        after = timed(conn, codec.decode)
+        conn.close()
+
+    print(f'rows:               {ROWS}')
+    print(f'encoder:            {"orjson" if codec.orjson else "json"}')
+    print(f'migration:          {migrated} values in {migration:.2f}s')
+    print(f'eval() decode:      {before / ROWS * 1e6:8.2f} us/row  ({before:.2f}s total)')
+    print(f'codec.decode():     {after / ROWS * 1e6:8.2f} us/row  ({after:.2f}s total)')
+    print(f'speedup:            {before / after:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
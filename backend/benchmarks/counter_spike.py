@@ -0,0 +1,74 @@
+"""Like/upvote throughput during a spike: write-through vs the counter buffer.
+
+Concurrent clients hammer POST /api/posts/1/like and /api/feedback/1/vote,
+first with every click committed on its own (COUNTER_FLUSH_INTERVAL=0
+behaviour) and then through the write-coalescing buffer, and the final
+counts are checked against the number of clicks.
+
+    python benchmarks/counter_spike.py [clients] [clicks_per_client]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'counter_spike.db')
+os.environ['OUTBOX_WORKERS'] = '0'
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app as backend  # noqa: E402
+import counters  # noqa: E402
+
+CLIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+CLICKS = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+
+def spike():
+    def clicker():
+        client = backend.app.test_client()
+        for i in range(CLICKS):
+            if i % 2:
+                client.post('/api/posts/1/like')
+            else:
+                client.post('/api/feedback/1/vote', json={'vote_type': 'upvote'})
+
+    threads = [threading.Thread(target=clicker) for _ in range(CLIENTS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counters.buffer.flush()
+    return time.perf_counter() - started
+
+
+def totals():
+    with backend.get_db() as conn:
+        likes = conn.execute('SELECT likes_count FROM posts WHERE id = 1').fetchone()[0]
+        upvotes = conn.execute('SELECT upvotes FROM feedback WHERE id = 1').fetchone()[0]
+    return likes + upvotes
+
+
+def main():
+    backend.init_db()
+    client = backend.app.test_client()
+    client.post('/api/users/register', json={'wallet_address': '0xspike', 'username': 'spike'})
+    client.post('/api/posts/create', json={'content': 'Going viral', 'user_wallet': '0xspike', 'cross_post': False})
+    client.post('/api/feedback/submit', json={'content': 'Popular idea', 'category': 'general'})
+
+    clicks = CLIENTS * CLICKS
+    print(f'{CLIENTS} clients x {CLICKS} clicks')
+    print(f'{"mode":14s} {"clicks/s":>10s} {"commits":>8s}  counts')
+    for mode, interval in (('write-through', 0), ('buffered', counters.FLUSH_INTERVAL)):
+        counters.buffer = counters.CounterBuffer(interval=interval)
+        before = totals()
+        elapsed = spike()
+        stats = counters.buffer.stats()
+        commits = stats['increments'] if interval <= 0 else stats['flushes']
+        counted = totals() - before
+        print(f'{mode:14s} {clicks / elapsed:10,.0f} {commits:8d}  {counted}/{clicks}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Bandwidth and server time for clients polling unchanged list endpoints.
+
+Seeds a scratch database, then polls each list endpoint repeatedly twice:
+once as a plain client that always downloads the body, once as a client that
+sends the last ETag back in If-None-Match and gets 304s.
+
+    python benchmarks/etag_polling.py [polls_per_endpoint]
+"""
+import os
+import sys
+import tempfile
+import time
+
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'etag_polling.db')
+os.environ['OUTBOX_WORKERS'] = '0'
+os.environ['FEED_CACHE_ENTRIES'] = '0'  # measure the endpoints themselves, not the feed cache
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app as backend  # noqa: E402
+
+POLLS = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+ENDPOINTS = [
+    '/api/posts/feed?limit=20',
+    '/api/feedback/list',
+    '/api/nft-tickets/list',
+    '/api/savings-pools/list',
+    '/api/voting/list',
+]
+
+
+def seed(client):
+    client.post('/api/users/register', json={'wallet_address': '0xseed', 'username': 'seed'})
+    for i in range(50):
+        client.post('/api/posts/create', json={
+            'content': f'Seed post {i} #Web3 #Blockchain ' + 'lorem ipsum ' * 10,
+            'user_wallet': '0xseed', 'platforms': ['twitter', 'facebook']
+        })
+        client.post('/api/feedback/submit', json={'content': f'Feedback {i} ' + 'text ' * 20, 'category': 'general'})
+    for i in range(20):
+        client.post('/api/nft-tickets/create', json={'event_name': f'Event {i}', 'event_date': '2026-12-01',
+                                                     'price': 0.1, 'total_supply': 100})
+        client.post('/api/savings-pools/create', json={'pool_name': f'Pool {i}', 'target_amount': 5,
+                                                      'creator_wallet': '0xseed'})
+        client.post('/api/voting/create', json={'title': f'Poll {i}', 'options': ['a', 'b', 'c'],
+                                                'creator_wallet': '0xseed'})
+
+
+def poll(client, path, conditional):
+    etag = None
+    body_bytes = 0
+    statuses = set()
+    started = time.perf_counter()
+    for _ in range(POLLS):
+        headers = {'If-None-Match': etag} if conditional and etag else {}
+        response = client.get(path, headers=headers)
+        statuses.add(response.status_code)
+        body_bytes += len(response.data)
+        etag = response.headers.get('ETag', etag)
+    return time.perf_counter() - started, body_bytes, statuses
+
+
+def main():
+    backend.init_db()
+    client = backend.app.test_client()
+    seed(client)
+
+    print(f'{"endpoint":28s} {"plain ms/req":>12s} {"304 ms/req":>11s} {"plain KB":>10s} {"304 KB":>8s}  statuses')
+    for path in ENDPOINTS:
+        plain_time, plain_bytes, _ = poll(client, path, conditional=False)
+        cond_time, cond_bytes, statuses = poll(client, path, conditional=True)
+        print(f'{path:28s} {plain_time / POLLS * 1000:12.3f} {cond_time / POLLS * 1000:11.3f} '
+              f'{plain_bytes / 1024:10.1f} {cond_bytes / 1024:8.1f}  {sorted(statuses)}')
+
+
+if __name__ == '__main__':
+    main()
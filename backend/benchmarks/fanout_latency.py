@@ -0,0 +1,75 @@
+"""Cross-post latency with concurrent fan-out vs calling platforms in turn.
+
+Registers local stub adapters that sleep for a fixed latency (one of them
+hangs past its timeout, one raises) and times cross_platform_post against a
+sequential loop over the same adapters. Concurrent latency should track the
+slowest platform (or its timeout), not the sum.
+
+    python benchmarks/fanout_latency.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import platforms  # noqa: E402
+
+# name -> simulated API latency in seconds
+STUB_LATENCIES = {
+    'stub_twitter': 0.20,
+    'stub_instagram': 0.35,
+    'stub_facebook': 0.25,
+    'stub_youtube': 0.40,
+}
+HANGING_TIMEOUT = 0.5
+ROUNDS = 5
+
+
+def make_stub(name, latency):
+    def post(content, media_urls=None):
+        time.sleep(latency)
+        return {'status': 'success', 'platform': name, 'post_id': f'{name}_stub'}
+    return post
+
+
+def failing_stub(content, media_urls=None):
+    raise RuntimeError('simulated API outage')
+
+
+def main():
+    for name, latency in STUB_LATENCIES.items():
+        platforms.register_platform(name, make_stub(name, latency))
+    names = list(STUB_LATENCIES)
+
+    sequential = []
+    concurrent = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        for name in names:
+            platforms.PLATFORM_ADAPTERS[name]['post']('hello', [])
+        sequential.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        results = platforms.cross_platform_post('hello', [], names)
+        concurrent.append(time.perf_counter() - started)
+        assert all(r['status'] == 'success' for r in results.values()), results
+
+    # Partial results: one platform hangs past its timeout, one fails outright
+    platforms.register_platform('stub_hanging', make_stub('stub_hanging', 3.0), timeout=HANGING_TIMEOUT)
+    platforms.register_platform('stub_failing', failing_stub)
+    started = time.perf_counter()
+    partial = platforms.cross_platform_post('hello', [], names + ['stub_hanging', 'stub_failing', 'myspace'])
+    partial_elapsed = time.perf_counter() - started
+
+    print(f'platforms:            {len(names)} (stub latencies {sorted(STUB_LATENCIES.values())})')
+    print(f'sum of latencies:     {sum(STUB_LATENCIES.values()) * 1000:7.1f} ms')
+    print(f'slowest platform:     {max(STUB_LATENCIES.values()) * 1000:7.1f} ms')
+    print(f'sequential (best):    {min(sequential) * 1000:7.1f} ms')
+    print(f'concurrent (best):    {min(concurrent) * 1000:7.1f} ms')
+    print(f'partial-result run:   {partial_elapsed * 1000:7.1f} ms (timeout {HANGING_TIMEOUT * 1000:.0f} ms)')
+    for name, result in partial.items():
+        print(f'  {name:16s} {result["status"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Post search latency: FTS5 MATCH (search.search_posts) vs LIKE '%term%'.
+
+Builds a throwaway posts table of synthetic text (one million rows by
+default), installs the FTS index through search.install and times the first
+page of results for a common, a rare and a prefix term with both approaches.
+
+    python benchmarks/fts_search.py [rows] [repeats]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import search  # noqa: E402
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+REPEATS = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+PAGE = 20
+
+WORDS = ('web3 blockchain wallet token community vote pool savings ticket event nft launch '
+         'crypto defi dao stake yield bridge layer rollup gas fee mint drop airdrop builder '
+         'hackathon demo ship update release roadmap governance proposal treasury').split()
+RARE = 'zkverifier'
+TERMS = [('common', 'blockchain'), ('rare', RARE), ('prefix', 'gov')]
+
+
+def build(conn):
+    conn.execute('CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, avatar_url TEXT, wallet_address TEXT)')
+    conn.execute('''
+        CREATE TABLE posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            content TEXT NOT NULL,
+            post_type TEXT DEFAULT 'text',
+            likes_count INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('CREATE TABLE feedback (id INTEGER PRIMARY KEY AUTOINCREMENT, content TEXT NOT NULL)')
+    conn.execute("INSERT INTO users (id, username, wallet_address) VALUES (1, 'bench', '0xbench')")
+
+    rng = random.Random(42)
+
+    def rows():
+        for i in range(ROWS):
+            words = rng.choices(WORDS, k=rng.randint(8, 30))
+            if i % 10_000 == 0:
+                words.append(RARE)
+            yield (1, ' '.join(words))
+
+    started = time.perf_counter()
+    conn.executemany('INSERT INTO posts (user_id, content) VALUES (?, ?)', rows())
+    loaded = time.perf_counter() - started
+
+    # First install backfills the index from the existing rows
+    started = time.perf_counter()
+    search.install(conn.cursor())
+    conn.commit()
+    return loaded, time.perf_counter() - started
+
+
+def like_page(conn, term):
+    return conn.execute('''
+        SELECT p.id, p.content, p.post_type, p.likes_count, p.created_at, u.username
+        FROM posts p
+        LEFT JOIN users u ON u.id = p.user_id
+        WHERE p.content LIKE ?
+        ORDER BY p.created_at DESC, p.id DESC
+        LIMIT ?
+    ''', (f'%{term}%', PAGE)).fetchall()
+
+
+def fts_page(conn, term):
+    return search.search_posts(conn.cursor(), search.build_match_query(term), PAGE)[0]
+
+
+def best_of(fn):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), 'fts_search.db')
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA cache_size = -64000')
+    loaded, indexed = build(conn)
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f'{ROWS} posts loaded in {loaded:.1f}s, FTS index built in {indexed:.1f}s, db {size_mb:.0f} MB')
+
+    print(f'{"term":18s} {"LIKE ms":>10s} {"FTS ms":>10s} {"speedup":>9s}  rows')
+    for label, term in TERMS:
+        like_time, like_rows = best_of(lambda: like_page(conn, term))
+        fts_time, fts_rows = best_of(lambda: fts_page(conn, term))
+        print(f'{label + " " + term:18s} {like_time * 1000:10.1f} {fts_time * 1000:10.1f} '
+              f'{like_time / fts_time:8.1f}x  {len(like_rows)}/{len(fts_rows)}')
+
+
+if __name__ == '__main__':
+    main()
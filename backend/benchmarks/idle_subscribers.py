@@ -0,0 +1,165 @@
+"""Cost of idle /api/posts/stream subscribers.
+
+Opens N subscribers on the ASGI route (one asyncio task each, driven
+in-process through fake ASGI receive/send callables) and, for comparison,
+N thread-served subscribers of the kind the Flask route uses. For each it
+reports the CPU used while everyone sits idle, the memory added, and how
+long one published post takes to reach every subscriber. Finally a client
+that never reads is shown to be evicted without holding the others back.
+
+    python benchmarks/idle_subscribers.py [subscribers,...] [idle_seconds]
+
+Heartbeats are sent every STREAM_HEARTBEAT seconds (15 by default), so an
+idle window longer than that includes one heartbeat per subscriber.
+"""
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'idle_subscribers.db')
+os.environ['OUTBOX_WORKERS'] = '0'
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asgi  # noqa: E402
+import streams  # noqa: E402
+
+COUNTS = [int(n) for n in sys.argv[1].split(',')] if len(sys.argv) > 1 else [1000, 5000, 10000]
+IDLE_SECONDS = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+SCOPE = {'type': 'http', 'method': 'GET', 'path': '/api/posts/stream', 'query_string': b'', 'headers': []}
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def publish(post_id):
+    streams.posts.publish(post_id, 'post', {'id': post_id, 'content': 'fan-out probe'})
+
+
+async def async_subscribers(count):
+    loop = asyncio.get_running_loop()
+    leave = loop.create_future()
+    received = {'frames': 0}
+    everyone = asyncio.Event()
+
+    async def receive():
+        await leave
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if b'fan-out probe' in message.get('body', b''):
+            received['frames'] += 1
+            if received['frames'] == count:
+                everyone.set()
+
+    before = rss_mb()
+    tasks = [asyncio.ensure_future(asgi.app(SCOPE, receive, send)) for _ in range(count)]
+    while streams.posts.stats()['subscribers'] < count:
+        await asyncio.sleep(0.05)
+    memory = rss_mb() - before
+
+    cpu = time.process_time()
+    await asyncio.sleep(IDLE_SECONDS)
+    idle_cpu = time.process_time() - cpu
+
+    started = time.perf_counter()
+    await loop.run_in_executor(None, publish, 10 ** 9)
+    await everyone.wait()
+    fan_out = time.perf_counter() - started
+
+    leave.set_result(None)
+    await asyncio.gather(*tasks)
+    return idle_cpu, memory, fan_out
+
+
+def thread_subscribers(count):
+    received = threading.Semaphore(0)
+    stop = threading.Event()
+
+    def client():
+        for chunk in streams.posts.stream(None, lambda after, limit: []):
+            if stop.is_set():
+                break
+            if b'fan-out probe' in chunk:
+                received.release()
+
+    before = rss_mb()
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    while streams.posts.stats()['subscribers'] < count:
+        time.sleep(0.05)
+    memory = rss_mb() - before
+
+    cpu = time.process_time()
+    time.sleep(IDLE_SECONDS)
+    idle_cpu = time.process_time() - cpu
+
+    started = time.perf_counter()
+    publish(10 ** 9 + 1)
+    for _ in range(count):
+        received.acquire()
+    fan_out = time.perf_counter() - started
+
+    stop.set()
+    publish(10 ** 9 + 2)
+    for thread in threads:
+        thread.join()
+    return idle_cpu, memory, fan_out
+
+
+async def slow_consumer():
+    """One client whose socket never drains next to one that keeps up"""
+    loop = asyncio.get_running_loop()
+    leave = loop.create_future()
+    stuck = loop.create_future()
+    frames = {'fast': 0}
+
+    async def receive():
+        await leave
+        return {'type': 'http.disconnect'}
+
+    async def send_stuck(message):
+        if message.get('body', b'').startswith(b'id:'):
+            await stuck  # a client that stopped reading
+
+    async def send_fast(message):
+        frames['fast'] += message.get('body', b'').count(b'id: ')
+
+    evictions = streams.posts.stats()['evictions']
+    tasks = [asyncio.ensure_future(asgi.app(SCOPE, receive, send)) for send in (send_stuck, send_fast)]
+    await asyncio.sleep(0.1)
+    total = streams.BUFFER_SIZE * 2
+    for i in range(total):
+        publish(2 * 10 ** 9 + i)
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.1)
+    evicted = streams.posts.stats()['evictions'] - evictions
+    leave.set_result(None)
+    stuck.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return evicted, frames['fast'], total
+
+
+def main():
+    asgi.backend.init_db()
+    print(f'idle window {IDLE_SECONDS:.0f}s, heartbeat every {streams.HEARTBEAT_SECONDS:.0f}s')
+    print(f'{"mode":8s} {"subscribers":>11s} {"idle CPU %":>10s} {"peak RSS +MB":>13s} {"fan-out ms":>10s}')
+    for count in COUNTS:
+        for mode, run in (('asyncio', lambda: asyncio.run(async_subscribers(count))),
+                          ('threads', lambda: thread_subscribers(count))):
+            idle_cpu, memory, fan_out = run()
+            print(f'{mode:8s} {count:11d} {idle_cpu / IDLE_SECONDS * 100:10.2f} {memory:13.1f} '
+                  f'{fan_out * 1000:10.1f}', flush=True)
+
+    evicted, delivered, total = asyncio.run(slow_consumer())
+    print(f'slow consumer: {evicted} evicted; the other subscriber received {delivered}/{total} posts')
+
+
+if __name__ == '__main__':
+    main()
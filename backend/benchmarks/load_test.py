@@ -0,0 +1,429 @@
+"""Load test for every API route.
+
+Seeds a scratch database at a chosen scale, then drives each route in turn
+with concurrent workers and records per-request latency. Results (p50, p95,
+p99, mean and max latency, throughput and status codes per route) are
+printed and written to a JSON file, so runs can be compared:
+
+    python benchmarks/load_test.py --scale small
+    python benchmarks/load_test.py --scale medium --workers 16 --requests 500 --mode wsgi
+    python benchmarks/load_test.py --routes feed,search --compare results/before.json
+
+``--mode client`` (default) calls the app through Flask's test client in
+this process; ``--mode wsgi`` serves it from a local threaded WSGI server
+and goes over HTTP, which adds real sockets and header parsing.
+
+The seeded users follow each other, skewed towards a few popular accounts,
+and their home timelines are materialized, so the timeline and follow routes
+run against a realistic fan-out. Event stream routes are timed to their first
+event (a resumed post or a poll snapshot), after which the client disconnects.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'load_test.db'))
+os.environ.setdefault('OUTBOX_WORKERS', '0')  # measure the API, not the publishers
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app as backend  # noqa: E402
+import codec  # noqa: E402
+import hashtags  # noqa: E402
+import timeline  # noqa: E402
+from db import get_db  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+SCALES = {
+    'small': {'users': 200, 'follows': 4_000, 'posts': 2_000, 'transactions': 5_000, 'polls': 50},
+    'medium': {'users': 2_000, 'follows': 40_000, 'posts': 50_000, 'transactions': 100_000, 'polls': 500},
+    'large': {'users': 20_000, 'follows': 400_000, 'posts': 500_000, 'transactions': 1_000_000, 'polls': 5_000},
+}
+
+WORDS = ('web3 blockchain wallet token community vote pool savings ticket event nft launch crypto defi dao '
+         'stake yield bridge rollup gas mint drop builder hackathon demo ship release roadmap governance').split()
+TAGS = ['Web3', 'Blockchain', 'Shardeum', 'DeFi', 'NFT', 'DAO', 'Crypto', 'BuildInPublic', 'Hackathon', 'Airdrop']
+TX_TYPES = ['tip', 'payment', 'nft_purchase', 'pool_contribution', 'social_posting_payment']
+PLATFORMS = ['twitter', 'facebook', 'instagram', 'linkedin', 'youtube']
+
+
+def wallet(i):
+    return f'0x{i:040x}'
+
+
+def sentence(rng, words=(8, 30)):
+    text = ' '.join(rng.choices(WORDS, k=rng.randint(*words)))
+    return text + ''.join(f' #{tag}' for tag in rng.sample(TAGS, rng.randint(0, 3)))
+
+
+def seed(scale, rng):
+    """Bulk-load synthetic rows; returns the counts used to build requests"""
+    now = datetime.now(timezone.utc)
+    users, posts, transactions, polls = scale['users'], scale['posts'], scale['transactions'], scale['polls']
+    items = max(10, polls)
+
+    def stamp(i, total):
+        return (now - timedelta(seconds=(total - i) * 30)).strftime('%Y-%m-%d %H:%M:%S')
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT INTO users (wallet_address, username, email, avatar_url, bio)
+            VALUES (?, ?, ?, ?, ?)
+        ''', ((wallet(i), f'user{i}', f'user{i}@example.com', None, 'Load test user') for i in range(users)))
+        # Followees skewed towards low ids: a few accounts have most of the followers
+        follows = {(rng.randrange(users) + 1, int(users * rng.random() ** 3) + 1) for _ in range(scale['follows'])}
+        cursor.executemany('INSERT INTO follows (follower_id, followee_id) VALUES (?, ?)',
+                           [pair for pair in follows if pair[0] != pair[1]])
+
+        post_rows = [(rng.randrange(users) + 1, sentence(rng), codec.encode([]), 'text', codec.encode({}),
+                      rng.randrange(200), stamp(i, posts)) for i in range(posts)]
+        cursor.executemany('''
+            INSERT INTO posts (user_id, content, media_urls, post_type, cross_platform_status, likes_count, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', post_rows)
+        for post_id, row in enumerate(post_rows, start=1):
+            created = datetime.strptime(row[6], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+            hashtags.record(cursor, post_id, row[1], created.timestamp(), prune=False)
+        timeline.rebuild(cursor)
+
+        cursor.executemany('''
+            INSERT INTO transactions (from_wallet, to_wallet, amount, transaction_hash, transaction_type, gas_fee, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, 'confirmed', ?)
+        ''', ((wallet(rng.randrange(users)), wallet(rng.randrange(users)), round(rng.random(), 6), f'0xseed{i}',
+               rng.choice(TX_TYPES), 0.0001, stamp(i, transactions)) for i in range(transactions)))
+
+        cursor.executemany('''
+            INSERT INTO voting_polls (title, description, options, creator_wallet, eligible_voters)
+            VALUES (?, ?, ?, ?, ?)
+        ''', ((f'Poll {i}', sentence(rng, (5, 12)), codec.encode(['a', 'b', 'c']), wallet(i % users),
+               codec.encode([])) for i in range(polls)))
+        cursor.executemany('''
+            INSERT INTO feedback (content, category, verification_hash) VALUES (?, 'general', ?)
+        ''', ((sentence(rng, (5, 20)), f'seed{i}') for i in range(items)))
+        cursor.executemany('''
+            INSERT INTO nft_tickets (event_name, event_date, price, total_supply, remaining_supply, creator_wallet)
+            VALUES (?, ?, 0.01, 1000000, 1000000, ?)
+        ''', ((f'Event {i}', (now + timedelta(days=i)).strftime('%Y-%m-%d'), wallet(i % users)) for i in range(items)))
+        cursor.executemany('''
+            INSERT INTO savings_pools (pool_name, description, target_amount, current_amount, creator_wallet)
+            VALUES (?, ?, 100, 0, ?)
+        ''', ((f'Pool {i}', sentence(rng, (5, 12)), wallet(i % users)) for i in range(items)))
+        conn.commit()
+        cursor.execute('PRAGMA optimize')
+
+    return {'users': users, 'posts': posts, 'transactions': transactions, 'polls': polls, 'items': items}
+
+
+def build_routes(counts):
+    """(name, request factory) per route; factories take an rng and return (method, path, json).
+
+    Method ``SSE`` opens an event stream, reads until its first event and disconnects.
+    """
+    unique = itertools.count()
+    user = lambda rng: wallet(rng.randrange(counts['users']))  # noqa: E731
+    post = lambda rng: rng.randrange(counts['posts']) + 1  # noqa: E731
+    poll = lambda rng: rng.randrange(counts['polls']) + 1  # noqa: E731
+    item = lambda rng: rng.randrange(counts['items']) + 1  # noqa: E731
+
+    def follow(rng):
+        follower, followee = rng.sample(range(counts['users']), 2)
+        return {'follower_wallet': wallet(follower), 'followee_wallet': wallet(followee)}
+
+    def transaction(rng):
+        return {'from_wallet': user(rng), 'to_wallet': user(rng), 'amount': round(rng.random(), 6),
+                'transaction_hash': f'0xload{next(unique)}', 'transaction_type': rng.choice(TX_TYPES)}
+
+    return [
+        ('POST /api/users/register', lambda rng: ('POST', '/api/users/register', {
+            'wallet_address': f'0xnew{next(unique)}', 'username': f'new{next(unique)}'})),
+        ('POST /api/user/authenticate', lambda rng: ('POST', '/api/user/authenticate', {
+            'email': 'nobody@example.com', 'password': 'wrong', 'wallet_address': user(rng)})),
+        ('POST /api/posts/create', lambda rng: ('POST', '/api/posts/create', {
+            'content': sentence(rng), 'user_wallet': user(rng), 'cross_post': rng.random() < 0.2})),
+        ('GET /api/posts/feed', lambda rng: ('GET', f'/api/posts/feed?page={rng.randint(1, 5)}&limit=20', None)),
+        ('GET /api/posts', lambda rng: ('GET', f'/api/posts?page={rng.randint(1, 5)}&per_page=10', None)),
+        ('GET /api/posts/timeline', lambda rng: ('GET', f'/api/posts/timeline?wallet={user(rng)}&limit=20', None)),
+        ('POST /api/users/follow', lambda rng: ('POST', '/api/users/follow', follow(rng))),
+        ('POST /api/users/unfollow', lambda rng: ('POST', '/api/users/unfollow', follow(rng))),
+        # Resumes 20 posts back, past the in-memory replay buffer of a fresh process
+        ('GET /api/posts/stream', lambda rng: (
+            'SSE', f'/api/posts/stream?last_event_id={max(0, counts["posts"] - 20)}', None)),
+        ('POST /api/posts/<id>/like', lambda rng: ('POST', f'/api/posts/{post(rng)}/like', None)),
+        ('POST /api/posts/<id>/share', lambda rng: ('POST', f'/api/posts/{post(rng)}/share', None)),
+        ('GET /api/posts/<id>/publish-status', lambda rng: ('GET', f'/api/posts/{post(rng)}/publish-status', None)),
+        ('GET /api/hashtags/<tag>/posts', lambda rng: ('GET', f'/api/hashtags/{rng.choice(TAGS)}/posts', None)),
+        ('GET /api/hashtags/trending', lambda rng: ('GET', '/api/hashtags/trending', None)),
+        ('GET /api/search', lambda rng: ('GET', f'/api/search?q={rng.choice(WORDS)}', None)),
+        ('POST /api/social/post', lambda rng: ('POST', '/api/social/post', {
+            'platform': rng.choice(PLATFORMS), 'content': sentence(rng), 'wallet_address': user(rng)})),
+        ('POST /api/transactions/record', lambda rng: ('POST', '/api/transactions/record', transaction(rng))),
+        ('POST /api/transactions/batch', lambda rng: ('POST', '/api/transactions/batch', {
+            'transactions': [transaction(rng) for _ in range(50)]})),
+        ('POST /api/transactions/payment', lambda rng: ('POST', '/api/transactions/payment', {
+            'wallet_address': user(rng), 'transaction_hash': f'0xpay{next(unique)}', 'amount': 0.001})),
+        ('GET /api/transactions/history', lambda rng: ('GET', f'/api/transactions/history?wallet={user(rng)}', None)),
+        ('GET /api/transactions/summary', lambda rng: ('GET', f'/api/transactions/summary?wallet={user(rng)}', None)),
+        ('GET /api/export/transactions', lambda rng: ('GET', f'/api/export/transactions?wallet={user(rng)}', None)),
+        ('GET /api/export/posts', lambda rng: ('GET', f'/api/export/posts?after={max(1, counts["posts"] - 500)}', None)),
+        ('POST /api/nft-tickets/create', lambda rng: ('POST', '/api/nft-tickets/create', {
+            'event_name': f'Load {next(unique)}', 'event_date': '2030-01-01', 'price': 0.01, 'total_supply': 10,
+            'creator_wallet': user(rng)})),
+        ('GET /api/nft-tickets/list', lambda rng: ('GET', '/api/nft-tickets/list', None)),
+        ('GET /api/nft-tickets/my-tickets', lambda rng: ('GET', f'/api/nft-tickets/my-tickets?wallet={user(rng)}', None)),
+        ('POST /api/nft-tickets/reserve', lambda rng: ('POST', '/api/nft-tickets/reserve', {
+            'event_id': item(rng), 'buyer_wallet': user(rng)})),
+        # Unknown reservation ids: measures the lookup and the 404 path
+        ('POST /api/nft-tickets/reservations/<id>/release', lambda rng: (
+            'POST', f'/api/nft-tickets/reservations/missing{next(unique)}/release', {'buyer_wallet': user(rng)})),
+        ('POST /api/nft-tickets/purchase', lambda rng: ('POST', '/api/nft-tickets/purchase', {
+            'event_id': item(rng), 'buyer_wallet': user(rng), 'amount_paid': 0.01,
+            'transaction_hash': f'0xticket{next(unique)}'})),
+        ('POST /api/feedback/submit', lambda rng: ('POST', '/api/feedback/submit', {
+            'content': sentence(rng, (5, 20)), 'category': 'general'})),
+        ('GET /api/feedback/list', lambda rng: ('GET', '/api/feedback/list', None)),
+        ('POST /api/feedback/<id>/vote', lambda rng: ('POST', f'/api/feedback/{item(rng)}/vote', {
+            'vote_type': rng.choice(['upvote', 'downvote'])})),
+        ('POST /api/feedback/votes/batch', lambda rng: ('POST', '/api/feedback/votes/batch', {
+            'votes': [{'feedback_id': item(rng), 'vote_type': 'upvote'} for _ in range(50)]})),
+        ('POST /api/savings-pools/create', lambda rng: ('POST', '/api/savings-pools/create', {
+            'pool_name': f'Load {next(unique)}', 'target_amount': 10, 'creator_wallet': user(rng)})),
+        ('GET /api/savings-pools/list', lambda rng: ('GET', f'/api/savings-pools/list?wallet={user(rng)}', None)),
+        ('POST /api/savings-pools/join', lambda rng: ('POST', '/api/savings-pools/join', {
+            'pool_id': item(rng), 'participant_wallet': user(rng), 'contribution_amount': 0.1,
+            'transaction_hash': f'0xjoin{next(unique)}'})),
+        ('POST /api/voting/create', lambda rng: ('POST', '/api/voting/create', {
+            'title': f'Load {next(unique)}', 'options': ['a', 'b'], 'creator_wallet': user(rng)})),
+        ('GET /api/voting/list', lambda rng: ('GET', f'/api/voting/list?wallet={user(rng)}', None)),
+        ('POST /api/voting/<id>/vote', lambda rng: ('POST', f'/api/voting/{poll(rng)}/vote', {
+            'user_wallet': user(rng), 'vote_option': rng.choice('abc')})),
+        ('GET /api/voting/<id>/stream', lambda rng: ('SSE', f'/api/voting/{poll(rng)}/stream', None)),
+        ('POST /api/voting/votes/batch', lambda rng: ('POST', '/api/voting/votes/batch', {
+            'votes': [{'poll_id': poll(rng), 'user_wallet': user(rng), 'vote_option': rng.choice('abc')}
+                      for _ in range(50)]})),
+        ('GET /api/system/db-pool', lambda rng: ('GET', '/api/system/db-pool', None)),
+        ('GET /api/system/ticket-gate', lambda rng: ('GET', '/api/system/ticket-gate', None)),
+        ('GET /api/system/cache', lambda rng: ('GET', '/api/system/cache', None)),
+        ('GET /api/system/counters', lambda rng: ('GET', '/api/system/counters', None)),
+        ('GET /api/system/outbox', lambda rng: ('GET', '/api/system/outbox', None)),
+        ('GET /api/system/streams', lambda rng: ('GET', '/api/system/streams', None)),
+        ('GET /api/system/metrics', lambda rng: ('GET', '/api/system/metrics', None)),
+    ]
+
+
+class TestClientTransport:
+    def __init__(self):
+        self.client = backend.app.test_client()
+
+    def request(self, method, path, body):
+        if method == 'SSE':
+            response = self.client.get(path, buffered=False)
+            data = first_event(response.response)
+            response.close()
+            return response.status_code, data
+        response = self.client.open(path, method=method, json=body)
+        data = response.get_data()
+        return response.status_code, data
+
+
+class HTTPTransport:
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url
+        self.session = requests.Session()
+
+    def request(self, method, path, body):
+        if method == 'SSE':
+            with self.session.get(self.base_url + path, stream=True) as response:
+                return response.status_code, first_event(response.iter_content(chunk_size=None))
+        response = self.session.request(method, self.base_url + path, json=body)
+        return response.status_code, response.content
+
+
+def first_event(chunks):
+    """Read an event stream's chunks up to its first event (or its end, for an error body)"""
+    data = b''
+    for chunk in chunks:
+        data += chunk
+        if b'\ndata: ' in data:
+            break
+    return data
+
+
+def start_wsgi_server():
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, backend.app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def drive(route, make_request, transport_factory, workers, requests, seed_value):
+    """Run ``requests`` calls of one route across ``workers`` threads"""
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    remaining = itertools.count()
+
+    def worker(index):
+        rng = random.Random(f'{seed_value}:{route}:{index}')
+        transport = transport_factory()
+        local_latencies, local_statuses = [], {}
+        while next(remaining) < requests:
+            method, path, body = make_request(rng)
+            started = time.perf_counter()
+            status, _ = transport.request(method, path, body)
+            local_latencies.append(time.perf_counter() - started)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None  # noqa: E731
+    return {
+        'requests': len(latencies),
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': ms(percentile(latencies, 0.50)),
+        'p95_ms': ms(percentile(latencies, 0.95)),
+        'p99_ms': ms(percentile(latencies, 0.99)),
+        'mean_ms': ms(sum(latencies) / len(latencies)) if latencies else None,
+        'max_ms': ms(latencies[-1]) if latencies else None,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'errors': sum(count for status, count in statuses.items() if status >= 500),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       cwd=os.path.dirname(__file__), stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['routes']
+    print(f'\n{"route":46s} {"p95 ms":>9s} {"was":>9s} {"rps":>9s} {"was":>9s}')
+    for route, stats in results.items():
+        old = baseline.get(route)
+        if old:
+            print(f'{route:46s} {stats["p95_ms"]:9.2f} {old["p95_ms"]:9.2f} '
+                  f'{stats["throughput_rps"]:9.1f} {old["throughput_rps"]:9.1f}')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    for name in ('users', 'follows', 'posts', 'transactions', 'polls'):
+        parser.add_argument(f'--{name}', type=int, help=f'override the number of seeded {name}')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent workers per route')
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--mode', choices=['client', 'wsgi'], default='client')
+    parser.add_argument('--routes', help='comma-separated substrings; only matching routes run')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='results file (default: benchmarks/results/load-<time>.json)')
+    parser.add_argument('--compare', help='earlier results file to print p95/throughput against')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    scale = dict(SCALES[args.scale])
+    for name in scale:
+        if getattr(args, name) is not None:
+            scale[name] = getattr(args, name)
+
+    started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    backend.init_db()
+    started = time.perf_counter()
+    counts = seed(scale, random.Random(args.seed))
+    seed_seconds = time.perf_counter() - started
+    print(f'seeded {scale} in {seed_seconds:.1f}s')
+
+    if args.mode == 'wsgi':
+        server, base_url = start_wsgi_server()
+        transport_factory = lambda: HTTPTransport(base_url)  # noqa: E731
+    else:
+        server, transport_factory = None, TestClientTransport
+
+    routes = build_routes(counts)
+    if args.routes:
+        wanted = [part.strip() for part in args.routes.split(',') if part.strip()]
+        routes = [(name, factory) for name, factory in routes if any(part in name for part in wanted)]
+
+    results = {}
+    print(f'{"route":46s} {"rps":>9s} {"p50 ms":>9s} {"p95 ms":>9s} {"p99 ms":>9s}  statuses')
+    for name, factory in routes:
+        stats = drive(name, factory, transport_factory, args.workers, args.requests, args.seed)
+        results[name] = stats
+        print(f'{name:46s} {stats["throughput_rps"]:9.1f} {stats["p50_ms"]:9.2f} {stats["p95_ms"]:9.2f} '
+              f'{stats["p99_ms"]:9.2f}  {stats["statuses"]}')
+
+    if server is not None:
+        server.shutdown()
+
+    output = args.output or os.path.join(RESULTS_DIR, f'load-{datetime.now():%Y%m%d-%H%M%S}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'started_at': started_at,
+                'git_revision': git_revision(),
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'mode': args.mode,
+                'workers': args.workers,
+                'requests_per_route': args.requests,
+                'seed': args.seed,
+                'scale': scale,
+                'seed_seconds': round(seed_seconds, 2),
+            },
+            'routes': results,
+        }, f, indent=2)
+    print(f'\nresults written to {output}')
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+    failed = [name for name, stats in results.items() if stats['errors']]
+    if failed:
+        print(f'5xx responses from: {", ".join(failed)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
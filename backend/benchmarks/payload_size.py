@@ -0,0 +1,74 @@
+"""Payload bytes and server time per response shape for the list endpoints.
+
+Seeds a scratch database with generate_data.py, then requests each list
+endpoint as a full JSON response, with a mobile-sized ``fields=`` projection,
+and in ``format=compact``, each uncompressed, gzip-encoded and (with the
+brotli package installed) Brotli-encoded. Prints the bytes on the wire and
+the median time to serve the request, compression included.
+
+    python benchmarks/payload_size.py [requests_per_cell]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DATABASE = os.path.join(tempfile.mkdtemp(), 'payload_size.db')
+os.environ['DATABASE_PATH'] = DATABASE
+os.environ['OUTBOX_WORKERS'] = '0'
+os.environ['FEED_CACHE_ENTRIES'] = '0'  # time the query and encoding, not the feed cache
+sys.path.insert(0, BACKEND)
+
+import app as backend  # noqa: E402
+import compression  # noqa: E402
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+ENDPOINTS = {
+    '/api/posts/feed?limit=50': 'id,content,likes_count,created_at,username',
+    '/api/posts?per_page=50': 'id,content,likes_count,created_at,username',
+    '/api/nft-tickets/list': 'id,event_name,event_date,price,remaining_supply',
+    '/api/feedback/list': 'id,content,upvotes,downvotes',
+}
+ENCODINGS = ['identity', 'gzip'] + (['br'] if compression.brotli is not None else [])
+
+
+def shapes(path, fields):
+    joiner = '&' if '?' in path else '?'
+    return [
+        ('full', path),
+        ('fields', f'{path}{joiner}fields={fields}'),
+        ('compact', f'{path}{joiner}fields={fields}&format=compact'),
+    ]
+
+
+def measure(client, url, encoding):
+    headers = {'Accept-Encoding': encoding}
+    size = len(client.get(url, headers=headers).data)
+    samples = []
+    for _ in range(REQUESTS):
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        response.get_data()
+        samples.append(time.perf_counter() - started)
+    return size, statistics.median(samples) * 1000
+
+
+def main():
+    subprocess.run([sys.executable, 'generate_data.py', '--database', DATABASE, '--scale', 'small',
+                    '--end', '2026-01-01'], cwd=BACKEND, check=True, stdout=subprocess.DEVNULL)
+    client = backend.app.test_client()
+
+    print(f'median of {REQUESTS} requests per cell; bytes on the wire / ms to serve')
+    print(f'{"endpoint":28s} {"shape":8s}' + ''.join(f' {encoding:>17s}' for encoding in ENCODINGS))
+    for path, fields in ENDPOINTS.items():
+        for shape, url in shapes(path, fields):
+            cells = [measure(client, url, encoding) for encoding in ENCODINGS]
+            print(f'{path.split("?")[0]:28s} {shape:8s}'
+                  + ''.join(f' {size:>9,d} {ms:6.2f}ms' for size, ms in cells), flush=True)
+
+
+if __name__ == '__main__':
+    main()
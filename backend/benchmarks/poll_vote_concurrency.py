@@ -0,0 +1,80 @@
+"""Fire thousands of concurrent votes at one poll and check nothing is lost.
+
+Each simulated voter casts a ballot, and a share of them change their mind
+with a second vote. Every request goes through the Flask test client from a
+thread pool. At the end, poll_votes has to hold exactly one ballot per voter,
+and poll_tallies has to match those ballots option by option.
+
+    python benchmarks/poll_vote_concurrency.py [voters] [threads]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'poll_votes.db')
+os.environ.setdefault('DB_POOL_SIZE', '16')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app as backend  # noqa: E402
+from db import get_db  # noqa: E402
+
+VOTERS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+THREADS = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+OPTIONS = ['yes', 'no', 'abstain']
+REVOTE_SHARE = 0.2
+
+
+def main():
+    backend.init_db()
+    client = backend.app.test_client()
+    poll_id = client.post('/api/voting/create', json={
+        'title': 'Concurrency poll', 'options': OPTIONS, 'creator_wallet': '0xcreator'
+    }).get_json()['poll_id']
+
+    rng = random.Random(42)
+    ballots = [(f'0xvoter{i:06d}', rng.choice(OPTIONS)) for i in range(VOTERS)]
+    revotes = [(wallet, rng.choice(OPTIONS)) for wallet, _ in rng.sample(ballots, int(VOTERS * REVOTE_SHARE))]
+    expected = dict(ballots)
+
+    def vote(ballot):
+        wallet, option = ballot
+        response = client.post(f'/api/voting/{poll_id}/vote', json={'user_wallet': wallet, 'vote_option': option})
+        return response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        statuses = Counter(executor.map(vote, ballots))
+    # Second round: the final ballot of a re-voter is whatever they sent last
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        statuses.update(executor.map(vote, revotes))
+    elapsed = time.perf_counter() - started
+    expected.update(revotes)
+
+    with get_db() as conn:
+        stored = dict(conn.execute('SELECT voter_wallet, option FROM poll_votes WHERE poll_id = ?', (poll_id,)))
+        tallies = dict(conn.execute('SELECT option, votes FROM poll_tallies WHERE poll_id = ?', (poll_id,)))
+
+    ballot_counts = Counter(stored.values())
+    lost = len(expected) - len(stored)
+    wrong = sum(1 for wallet, option in expected.items() if stored.get(wallet) != option)
+    tally_drift = {option: tallies.get(option, 0) - ballot_counts.get(option, 0) for option in OPTIONS}
+
+    total = len(ballots) + len(revotes)
+    print(f'votes sent:        {total} ({len(revotes)} re-votes) on {THREADS} threads')
+    print(f'responses:         {dict(statuses)}')
+    print(f'throughput:        {total / elapsed:,.0f} votes/s')
+    print(f'ballots stored:    {len(stored)} (lost {lost}, wrong option {wrong})')
+    print(f'tallies:           {tallies}')
+    print(f'tally drift:       {tally_drift}')
+
+    ok = statuses.keys() == {200} and lost == 0 and wrong == 0 and not any(tally_drift.values())
+    print('OK - no lost updates' if ok else 'FAILED')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
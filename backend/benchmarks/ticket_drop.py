@@ -0,0 +1,121 @@
+"""Load test for a ticket drop: many concurrent buyers, one event.
+
+Every buyer runs on its own thread and keeps trying until it either gets a
+ticket or is told the event is sold out, backing off briefly when the
+admission gate sheds it (429). In reserve mode, buyers first take a
+reservation and then complete it, and a share of them walk away so their
+holds have to expire. The run passes when no event is oversold:
+tickets sold + tickets still held == total supply - remaining supply,
+remaining_supply >= 0, and at most one purchase transaction per sold ticket.
+
+    python benchmarks/ticket_drop.py [buyers] [supply] [direct|reserve]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'ticket_drop.db')
+os.environ.setdefault('DB_POOL_SIZE', '16')
+os.environ.setdefault('TICKET_RESERVATION_SECONDS', '0.5')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app as backend  # noqa: E402
+import tickets  # noqa: E402
+from db import get_db  # noqa: E402
+
+BUYERS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+SUPPLY = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+MODE = sys.argv[3] if len(sys.argv) > 3 else 'direct'
+ABANDON_SHARE = 0.1
+
+
+def main():
+    backend.init_db()
+    client = backend.app.test_client()
+    event_id = client.post('/api/nft-tickets/create', json={
+        'event_name': 'Drop', 'event_date': '2026-12-01', 'price': 0.05,
+        'total_supply': SUPPLY, 'creator_wallet': '0xcreator'
+    }).get_json()['ticket_id']
+
+    outcomes = Counter()
+    responses = Counter()
+    lock = threading.Lock()
+    start = threading.Barrier(BUYERS)
+
+    def post(path, body):
+        response = client.post(path, json=body)
+        with lock:
+            responses[response.status_code] += 1
+        return response
+
+    def buyer(index):
+        wallet = f'0xbuyer{index:05d}'
+        rng = random.Random(index)
+        start.wait()
+        while True:
+            if MODE == 'reserve':
+                response = post('/api/nft-tickets/reserve', {'event_id': event_id, 'buyer_wallet': wallet})
+                if response.status_code == 200:
+                    if rng.random() < ABANDON_SHARE:
+                        outcome = 'abandoned'
+                        break
+                    reservation_id = response.get_json()['reservation_id']
+                    response = post('/api/nft-tickets/purchase', {
+                        'event_id': event_id, 'buyer_wallet': wallet, 'amount_paid': 0.05,
+                        'transaction_hash': f'0xtx{index}', 'reservation_id': reservation_id
+                    })
+            else:
+                response = post('/api/nft-tickets/purchase', {
+                    'event_id': event_id, 'buyer_wallet': wallet, 'amount_paid': 0.05,
+                    'transaction_hash': f'0xtx{index}'
+                })
+            if response.status_code == 200:
+                outcome = 'bought'
+                break
+            if response.status_code == 409:
+                outcome = 'sold_out'
+                break
+            time.sleep(rng.uniform(0.005, 0.02))
+        with lock:
+            outcomes[outcome] += 1
+
+    threads = [threading.Thread(target=buyer, args=(i,)) for i in range(BUYERS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with get_db() as conn:
+        remaining = conn.execute('SELECT remaining_supply FROM nft_tickets WHERE id = ?', (event_id,)).fetchone()[0]
+        sold = conn.execute('''
+            SELECT COUNT(*) FROM transactions WHERE related_post_id = ? AND transaction_type = 'nft_purchase'
+        ''', (event_id,)).fetchone()[0]
+        held = conn.execute('''
+            SELECT COUNT(*) FROM ticket_reservations WHERE event_id = ? AND status = 'held'
+        ''', (event_id,)).fetchone()[0]
+
+    oversold = sold + held - (SUPPLY - remaining)
+    ok = remaining >= 0 and oversold == 0 and sold == outcomes['bought'] and sold <= SUPPLY
+
+    print(f'mode:               {MODE}')
+    print(f'buyers / supply:    {BUYERS} / {SUPPLY}')
+    print(f'buyer outcomes:     {dict(outcomes)}')
+    print(f'http responses:     {dict(responses)}')
+    print(f'gate:               {tickets.gate.stats()}')
+    print(f'sold / held / left: {sold} / {held} / {remaining}')
+    print(f'oversold:           {oversold}')
+    print(f'elapsed:            {elapsed:.2f}s')
+    print(f'purchases/s:        {sold / elapsed:,.0f}')
+    print(f'requests/s:         {sum(responses.values()) / elapsed:,.0f}')
+    print('OK - no oversell' if ok else 'FAILED')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
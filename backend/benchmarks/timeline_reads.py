@@ -0,0 +1,139 @@
+"""Home timeline reads: the materialized timeline vs a join over follows.
+
+Builds a scratch database of AUTHORS accounts posting POSTS posts between
+them (each post fanned out through timeline.fan_out as create_post does),
+plus one reader per level that follows that many authors. For every level
+the reader's first page and a page 500 posts deep are timed both through
+timeline.page and through the equivalent join of follows to posts. A second
+table shows what fan-out costs the writer as an author's follower count
+grows, and where TIMELINE_FANOUT_LIMIT switches it to fan-out on read.
+
+    python benchmarks/timeline_reads.py [following,...] [followers,...]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'timeline_reads.db')
+os.environ['OUTBOX_WORKERS'] = '0'
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app as backend  # noqa: E402
+import timeline  # noqa: E402
+from db import get_db  # noqa: E402
+
+FOLLOWING = [int(n) for n in sys.argv[1].split(',')] if len(sys.argv) > 1 else [10, 100, 1000, 5000]
+FOLLOWERS = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [100, 1000, 10000, 50000]
+AUTHORS = max(FOLLOWING)
+POSTS = 200000
+PAGE = 20
+DEEP = 500
+READS = 200
+
+JOIN_PAGE = '''
+    SELECT p.*, u.username, u.avatar_url, u.wallet_address
+    FROM follows f
+    JOIN posts p ON p.user_id = f.followee_id
+    JOIN users u ON p.user_id = u.id
+    WHERE f.follower_id = ? AND p.id < ?
+    ORDER BY p.id DESC
+    LIMIT ?
+'''
+
+
+def add_users(cursor, count, prefix):
+    cursor.execute('SELECT COALESCE(MAX(id), 0) FROM users')
+    first = cursor.fetchone()[0] + 1
+    cursor.executemany('INSERT INTO users (id, wallet_address, username) VALUES (?, ?, ?)',
+                       [(i, f'0x{prefix}{i:038x}', f'{prefix}{i}') for i in range(first, first + count)])
+    return list(range(first, first + count))
+
+
+def seed(rng):
+    with get_db() as conn:
+        cursor = conn.cursor()
+        authors = add_users(cursor, AUTHORS, 'a')
+        readers = {}
+        for following in FOLLOWING:
+            reader = add_users(cursor, 1, 'r')[0]
+            cursor.executemany('INSERT INTO follows (follower_id, followee_id) VALUES (?, ?)',
+                               [(reader, author) for author in rng.sample(authors, following)])
+            readers[following] = reader
+        for n in range(POSTS):
+            cursor.execute('INSERT INTO posts (user_id, content) VALUES (?, ?)', (rng.choice(authors), f'post {n}'))
+            timeline.fan_out(cursor, cursor.lastrowid)
+        conn.commit()
+        cursor.execute('ANALYZE')
+    return readers
+
+
+def timed(read, rounds=READS):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        read()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.99)] * 1000
+
+
+def deep_before(cursor, reader):
+    before = None
+    for _ in range(DEEP // PAGE):
+        rows, before = timeline.page(cursor, reader, PAGE, before)
+    return before
+
+
+def reads(readers):
+    print(f'{POSTS:,} posts by {AUTHORS:,} authors; {READS} reads of {PAGE} posts per cell, ms')
+    print(f'{"following":>9s} {"page":>5s} {"timeline p50":>12s} {"p99":>7s} {"join p50":>9s} {"p99":>7s}')
+    with get_db() as conn:
+        cursor = conn.cursor()
+        for following, reader in readers.items():
+            for label, before in (('first', None), ('deep', deep_before(cursor, reader))):
+                expected, _ = timeline.page(cursor, reader, PAGE, before)
+                joined = cursor.execute(JOIN_PAGE, (reader, before or 2 ** 62, PAGE)).fetchall()
+                assert [row[0] for row in expected] == [row[0] for row in joined], (following, label)
+                materialized = timed(lambda: timeline.page(cursor, reader, PAGE, before))
+                join = timed(lambda: cursor.execute(JOIN_PAGE, (reader, before or 2 ** 62, PAGE)).fetchall())
+                print(f'{following:9d} {label:>5s} {materialized[0]:12.3f} {materialized[1]:7.3f} '
+                      f'{join[0]:9.3f} {join[1]:7.3f}', flush=True)
+
+
+def writes(rng):
+    print(f'\nfan-out per post as followers grow (TIMELINE_FANOUT_LIMIT={timeline.FANOUT_LIMIT:,}), ms')
+    print(f'{"followers":>9s} {"mode":>5s} {"post p50":>9s} {"p99":>7s}')
+    with get_db() as conn:
+        cursor = conn.cursor()
+        for followers in FOLLOWERS:
+            author = add_users(cursor, 1, 'c')[0]
+            fans = add_users(cursor, followers, 'f')
+            cursor.executemany('INSERT INTO follows (follower_id, followee_id) VALUES (?, ?)',
+                               [(fan, author) for fan in fans])
+            conn.commit()
+            modes = set()
+
+            def post():
+                cursor.execute('INSERT INTO posts (user_id, content) VALUES (?, ?)', (author, 'hello followers'))
+                modes.add(timeline.fan_out(cursor, cursor.lastrowid))
+                conn.commit()
+
+            p50, p99 = timed(post, rounds=20)
+            print(f'{followers:9d} {"/".join(sorted(modes)):>5s} {p50:9.3f} {p99:7.3f}', flush=True)
+
+
+def main():
+    rng = random.Random(24)
+    backend.init_db()
+    started = time.perf_counter()
+    readers = seed(rng)
+    print(f'seeded in {time.perf_counter() - started:.1f}s')
+    reads(readers)
+    writes(rng)
+
+
+if __name__ == '__main__':
+    main()
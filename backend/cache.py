@@ -0,0 +1,137 @@
+"""In-process read-through cache for hot read endpoints.
+
+``Cache`` wraps a storage backend and namespaces keys with a generation
+number; ``invalidate()`` bumps the generation so every existing entry becomes
+unreachable at once and simply ages out of the backend. That keeps
+invalidation O(1) and works for any backend that offers get/set, so an
+external store (Redis, memcached) can replace ``LRUBackend`` by implementing
+the same ``CacheBackend`` methods.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+FEED_CACHE_ENTRIES = int(os.getenv('FEED_CACHE_ENTRIES', 256))
+FEED_CACHE_TTL = float(os.getenv('FEED_CACHE_TTL', 30))
+
+
+class CacheBackend:
+    """Storage interface used by Cache"""
+
+    def get(self, key):
+        """Return the stored value or None"""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {}
+
+
+class LRUBackend(CacheBackend):
+    """Bounded LRU with per-entry TTL, safe to share between request threads"""
+
+    def __init__(self, max_entries=FEED_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'lru',
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class Cache:
+    """Read-through cache with generation-based invalidation"""
+
+    def __init__(self, name, backend=None, ttl=FEED_CACHE_TTL):
+        self.name = name
+        self.backend = backend or LRUBackend()
+        self.ttl = ttl
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _key(self, key):
+        return (self.name, self._generation, key)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, computing and storing it on a miss"""
+        generation_key = self._key(key)
+        value = self.backend.get(generation_key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        value = compute()
+        # Don't store a result computed across an invalidation; it may be stale
+        if generation_key[1] == self._generation:
+            self.backend.set(generation_key, value, self.ttl)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'name': self.name,
+                'ttl_seconds': self.ttl,
+                'generation': self._generation,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0,
+                'invalidations': self.invalidations,
+            }
+        stats.update(self.backend.stats())
+        return stats
+
+
+# Pages of /api/posts/feed and /api/posts; invalidated whenever posts change
+feed_cache = Cache('feed')
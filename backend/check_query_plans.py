@@ -0,0 +1,164 @@
+"""Query-plan regression check for the API routes.
+
+Drives every route once through Flask's test client against a scratch
+database, records each statement the routes execute and runs EXPLAIN QUERY
+PLAN on it. Exits non-zero if any statement needs a full table scan, so a
+dropped index or an un-indexable rewrite fails CI.
+
+    python check_query_plans.py
+"""
+import os
+import sys
+import tempfile
+
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'query_plans.db')
+# The outbox is drained explicitly below rather than by background threads
+os.environ['OUTBOX_WORKERS'] = '0'
+# Buffered counters are flushed explicitly too
+os.environ['COUNTER_FLUSH_INTERVAL'] = '3600'
+
+import db  # noqa: E402
+import app as backend  # noqa: E402
+import counters  # noqa: E402
+import outbox  # noqa: E402
+import search  # noqa: E402
+
+WALLET = '0xabc0000000000000000000000000000000000001'
+OTHER_WALLET = '0xabc0000000000000000000000000000000000002'
+
+# (method, path, json body) - order matters, later calls rely on earlier rows
+ROUTE_CALLS = [
+    ('POST', '/api/users/register', {'wallet_address': WALLET, 'username': 'planner', 'email': 'p@example.com'}),
+    ('POST', '/api/posts/create', {'content': 'Hello #Web3', 'user_wallet': WALLET, 'cross_post': True}),
+    ('GET', '/api/posts/feed?page=1&limit=20', None),
+    ('GET', '/api/posts?page=2&per_page=10', None),
+    ('GET', '/api/posts/feed?fields=content,likes_count&format=compact', None),
+    ('POST', '/api/transactions/record', {'from_wallet': WALLET, 'to_wallet': OTHER_WALLET, 'amount': 0.1,
+                                          'transaction_hash': '0xt1', 'transaction_type': 'tip'}),
+    ('POST', '/api/nft-tickets/create', {'event_name': 'Conf', 'event_date': '2026-01-01', 'price': 0.2,
+                                         'total_supply': 100, 'creator_wallet': OTHER_WALLET}),
+    ('POST', '/api/nft-tickets/purchase', {'event_id': 1, 'buyer_wallet': WALLET, 'amount_paid': 0.2,
+                                           'transaction_hash': '0xt2'}),
+    ('POST', '/api/nft-tickets/reserve', {'event_id': 1, 'buyer_wallet': OTHER_WALLET}),
+    ('GET', '/api/nft-tickets/list', None),
+    ('GET', '/api/nft-tickets/list?fields=event_name,price&format=compact', None),
+    ('GET', f'/api/nft-tickets/my-tickets?wallet={WALLET}', None),
+    ('POST', '/api/feedback/submit', {'content': 'Great app', 'category': 'general'}),
+    ('POST', '/api/feedback/1/vote', {'vote_type': 'upvote'}),
+    ('POST', '/api/posts/1/like', None),
+    ('POST', '/api/posts/1/share', None),
+    ('GET', '/api/feedback/list', None),
+    ('GET', '/api/search?q=hello', None),
+    ('GET', '/api/hashtags/Web3/posts', None),
+    ('GET', '/api/hashtags/web3/posts?before=2', None),
+    ('GET', '/api/hashtags/trending', None),
+    ('GET', '/api/search?q=great&type=feedback', None),
+    ('POST', '/api/savings-pools/create', {'pool_name': 'Trip', 'target_amount': 1.0, 'creator_wallet': WALLET}),
+    ('POST', '/api/savings-pools/join', {'pool_id': 1, 'participant_wallet': OTHER_WALLET,
+                                         'contribution_amount': 0.1, 'transaction_hash': '0xt3'}),
+    ('GET', '/api/savings-pools/list', None),
+    ('POST', '/api/voting/create', {'title': 'Poll', 'options': ['a', 'b'], 'creator_wallet': WALLET}),
+    ('POST', '/api/voting/1/vote', {'user_wallet': WALLET, 'vote_option': 'a'}),
+    ('GET', '/api/voting/list', None),
+    ('POST', '/api/voting/votes/batch', {'votes': [{'poll_id': 1, 'user_wallet': OTHER_WALLET, 'vote_option': 'b'},
+                                                  {'poll_id': 1, 'user_wallet': WALLET, 'vote_option': 'b'}]}),
+    ('POST', '/api/feedback/votes/batch', {'votes': [{'feedback_id': 1, 'vote_type': 'downvote'}]}),
+    ('POST', '/api/transactions/batch', {'transactions': [{'from_wallet': WALLET, 'to_wallet': OTHER_WALLET,
+                                                           'amount': 0.2, 'transaction_hash': '0xb1'}]}),
+    ('POST', '/api/transactions/payment', {'wallet_address': WALLET, 'transaction_hash': '0xt4', 'amount': 0.001}),
+    ('POST', '/api/social/post', {'platform': 'twitter', 'content': 'Hi', 'wallet_address': WALLET}),
+    ('GET', f'/api/transactions/history?wallet={WALLET}', None),
+    ('GET', f'/api/transactions/summary?wallet={WALLET}', None),
+    ('GET', f'/api/export/transactions?wallet={WALLET}&since=2020-01-01', None),
+    ('GET', f'/api/export/transactions?wallet={WALLET}&direction=sent&format=csv&after=1', None),
+    ('GET', '/api/export/transactions?type=tip', None),
+    ('GET', '/api/export/posts?format=csv&since=2020-01-01', None),
+    ('GET', '/api/posts/1/publish-status', None),
+    ('POST', '/api/users/register', {'wallet_address': OTHER_WALLET, 'username': 'follower'}),
+    ('POST', '/api/users/follow', {'follower_wallet': OTHER_WALLET, 'followee_wallet': WALLET}),
+    ('POST', '/api/posts/create', {'content': 'For followers', 'user_wallet': WALLET, 'cross_post': False}),
+    ('GET', f'/api/posts/timeline?wallet={OTHER_WALLET}', None),
+    ('GET', f'/api/posts/timeline?wallet={OTHER_WALLET}&before=3&limit=1', None),
+    ('POST', '/api/users/unfollow', {'follower_wallet': OTHER_WALLET, 'followee_wallet': WALLET}),
+    ('GET', '/api/system/outbox', None),
+]
+
+CHECKED_PREFIXES = ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH')
+
+
+def is_full_scan(detail, derived=()):
+    """True for a plan step that walks a whole table without an index"""
+    if not detail.startswith('SCAN '):
+        return False
+    if 'USING' in detail or 'VIRTUAL TABLE' in detail:
+        return False
+    name = detail[len('SCAN '):].split()[0].split('.')[-1]
+    # Scans of subquery results and constant rows / VALUES lists are not table scans
+    if detail.startswith('SCAN (') or 'CONSTANT ROW' in detail or name in derived:
+        return False
+    # FTS5 reads its own tiny shadow tables (e.g. posts_fts_config) internally
+    return not any(name.startswith(f'{fts_table}_') for fts_table in search.FTS_TABLES)
+
+
+def derived_tables(plan):
+    """Names of materialized subqueries / co-routines in a query plan"""
+    return {
+        detail.split()[1] for detail in plan
+        if detail.startswith(('MATERIALIZE ', 'CO-ROUTINE '))
+    }
+
+
+def capture_statements():
+    statements = []
+    connect = db.pool._connect
+
+    def traced_connect():
+        conn = connect()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    db.pool.close_all()
+    db.pool._connect = traced_connect
+    client = backend.app.test_client()
+    for method, path, body in ROUTE_CALLS:
+        statements.append(f'-- {method} {path}')
+        response = client.open(path, method=method, json=body)
+        response.get_data()  # drain streaming responses so their queries run
+        if response.status_code >= 500:
+            raise SystemExit(f'{method} {path} failed with {response.status_code}')
+    statements.append('-- outbox worker')
+    outbox.process_batch()
+    statements.append('-- counter flush')
+    counters.buffer.flush()
+    db.pool.close_all()
+    db.pool._connect = connect
+    return statements
+
+
+def main():
+    backend.init_db()
+    statements = capture_statements()
+
+    failures = []
+    route = None
+    with db.get_db() as conn:
+        for sql in statements:
+            if sql.startswith('-- '):
+                route = sql[3:]
+                continue
+            if not sql.lstrip().upper().startswith(CHECKED_PREFIXES):
+                continue
+            plan = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}')]
+            derived = derived_tables(plan)
+            scans = [detail for detail in plan if is_full_scan(detail, derived)]
+            if scans:
+                failures.append((route, ' '.join(sql.split()), scans))
+
+    for route, sql, scans in failures:
+        print(f'FULL SCAN in {route}\n  {sql}\n  -> {"; ".join(scans)}')
+    print(f'{len(statements)} statements checked, {len(failures)} full table scans')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""JSON codec for structured columns.
+
+posts.media_urls, posts.cross_platform_status, voting_polls.options /
+eligible_voters / votes and savings_pools.participants are stored as JSON text.
+Every read and write of those columns goes through ``encode``/``decode`` here
+rather than ``str()``/``eval()``. orjson is used when installed.
+"""
+import ast
+import json
+import time
+
+import timing
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+# Columns holding structured values, as (table, column)
+JSON_COLUMNS = [
+    ('posts', 'media_urls'),
+    ('posts', 'cross_platform_status'),
+    ('voting_polls', 'options'),
+    ('voting_polls', 'eligible_voters'),
+    ('voting_polls', 'votes'),
+    ('savings_pools', 'participants'),
+]
+
+# PRAGMA user_version once legacy repr()-encoded rows have been rewritten
+SCHEMA_VERSION_JSON_COLUMNS = 1
+
+
+if orjson is not None:
+    def encode(value):
+        """Serialize a value to JSON text for storage"""
+        return orjson.dumps(value).decode()
+
+    def _loads(text):
+        return orjson.loads(text)
+else:
+    def encode(value):
+        """Serialize a value to JSON text for storage"""
+        return json.dumps(value, separators=(',', ':'))
+
+    def _loads(text):
+        return json.loads(text)
+
+
+def decode(text, default=None):
+    """Parse a stored JSON column; empty values give ``default``"""
+    if not text:
+        return default
+    clock = timing.current.get()
+    if clock is None:
+        return _decode(text, default)
+    started = time.perf_counter()
+    try:
+        return _decode(text, default)
+    finally:
+        clock.add('decode', time.perf_counter() - started)
+
+
+def _decode(text, default):
+    try:
+        return _loads(text)
+    except ValueError:
+        # Rows written before the migration ran hold Python repr() text
+        try:
+            return ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            return default
+
+
+def _is_json(text):
+    try:
+        _loads(text)
+        return True
+    except ValueError:
+        return False
+
+
+def migrate_legacy_rows(conn):
+    """Rewrite repr()-encoded values in JSON_COLUMNS as JSON, once per database.
+
+    Returns the number of values rewritten. Values that are neither JSON nor a
+    Python literal are left untouched.
+    """
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version >= SCHEMA_VERSION_JSON_COLUMNS:
+        return 0
+
+    rewritten = 0
+    for table, column in JSON_COLUMNS:
+        rows = conn.execute(
+            f"SELECT id, {column} FROM {table} WHERE {column} IS NOT NULL AND {column} != ''"
+        ).fetchall()
+        updates = []
+        for row_id, text in rows:
+            if _is_json(text):
+                continue
+            try:
+                value = ast.literal_eval(text)
+            except (ValueError, SyntaxError):
+                continue
+            updates.append((encode(value), row_id))
+        if updates:
+            conn.executemany(f'UPDATE {table} SET {column} = ? WHERE id = ?', updates)
+            rewritten += len(updates)
+
+    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION_JSON_COLUMNS}')
+    conn.commit()
+    return rewritten
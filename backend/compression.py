@@ -0,0 +1,72 @@
+"""Response compression for JSON and CSV bodies.
+
+``install(app)`` compresses a finished response when the client accepts it
+and the body is at least COMPRESS_MIN_SIZE bytes: Brotli when the brotli
+package is installed and the client lists ``br``, gzip otherwise. Smaller
+bodies are sent as they are, where the saving would not pay for the CPU.
+Streamed responses (exports, event streams) are never buffered to be
+compressed. The time spent is charged to the request's ``compress`` phase.
+Set RESPONSE_COMPRESSION=0 to turn it off, e.g. behind a proxy that
+compresses already.
+"""
+import gzip
+import os
+import time
+
+from flask import request
+
+import timing
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+ENABLED = os.getenv('RESPONSE_COMPRESSION', '1') != '0'
+MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # bytes; smaller bodies are sent uncompressed
+GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))  # 0-11; higher levels cost far more CPU
+
+COMPRESSIBLE = ('application/json', 'application/x-ndjson', 'text/csv', 'text/plain')
+
+
+def choose_encoding(accept_encodings):
+    """'br', 'gzip' or None for a request's parsed Accept-Encoding"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, GZIP_LEVEL, mtime=0)
+
+
+def _compress_response(response):
+    if (response.is_streamed or response.direct_passthrough or response.status_code != 200
+            or response.mimetype not in COMPRESSIBLE or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < MIN_SIZE:
+        return response
+
+    started = time.perf_counter()
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    clock = timing.current.get()
+    if clock is not None:
+        clock.add('compress', time.perf_counter() - started)
+    return response
+
+
+def install(app):
+    """Register the compressing after_request hook on ``app``"""
+    if ENABLED:
+        app.after_request(_compress_response)
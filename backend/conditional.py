@@ -0,0 +1,83 @@
+"""Conditional GET support (ETag / If-None-Match) for list endpoints.
+
+Every tracked table has a row in ``table_versions`` whose counter is bumped by
+triggers on insert, update and delete, so the counter moves on any write -
+from a route, a background worker or an external script. A list endpoint
+decorated with ``conditional_get`` derives its ETag from the counters of the
+tables it reads plus the request's query string, and answers 304 Not Modified
+without running the view when the client already holds that version.
+"""
+import functools
+import hashlib
+
+from flask import make_response, request
+
+import counters
+from db import get_db
+
+# Tables whose writes change what list endpoints return
+TRACKED_TABLES = [
+    'users',
+    'posts',
+    'feedback',
+    'nft_tickets',
+    'savings_pools',
+    'pool_participants',
+    'voting_polls',
+    'poll_tallies',
+]
+
+
+def install_version_triggers(cursor):
+    """Create table_versions and the triggers that maintain it"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    for table in TRACKED_TABLES:
+        cursor.execute('INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, 0)', (table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+                END
+            ''')
+
+
+def table_versions(conn, tables):
+    placeholders = ','.join('?' * len(tables))
+    return dict(conn.execute(
+        f'SELECT name, version FROM table_versions WHERE name IN ({placeholders})', tables
+    ).fetchall())
+
+
+def conditional_get(*tables):
+    """Decorate a GET view whose response depends only on ``tables`` and the query string"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with get_db() as conn:
+                versions = table_versions(conn, list(tables))
+            # Buffered counter deltas are part of the response too (see counters.overlay)
+            fingerprint = f"{request.path}?{request.query_string.decode()}|" + ','.join(
+                f'{table}:{versions.get(table, 0)}:{counters.buffer.version(table)}' for table in tables
+            )
+            etag = hashlib.sha1(fingerprint.encode()).hexdigest()[:20]
+            # Responses filtered by wallet are per-user and must not sit in shared caches
+            cache_control = 'private, no-cache' if 'wallet' in request.args else 'no-cache'
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,265 @@
+"""SQLite connection management for the Social DApp backend.
+
+All routes share one bounded pool of connections instead of opening a new
+``sqlite3.connect`` per request. Connections are configured once (WAL journal,
+tuned pragmas) and handed out through the ``get_db()`` context manager, which
+always returns them to the pool - even on early returns and exceptions.
+
+Pooled connections are TimedConnection instances: while a request clock is
+active (see timing.py) the time spent waiting for a connection, executing
+statements and fetching rows is charged to the request.
+
+Async code (the ASGI server, asgi.py) must not block its event loop on
+SQLite, so it calls ``await run_async(fn, *args)``: ``fn(conn, *args)`` runs
+with a pooled connection on a bounded executor sized to the pool.
+"""
+import asyncio
+import contextvars
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+import timing
+
+load_dotenv()
+
+
+def _resolve_db_path():
+    """Database path from DATABASE_PATH, or a sqlite:/// DATABASE_URL"""
+    path = os.getenv('DATABASE_PATH')
+    if path:
+        return path
+    url = os.getenv('DATABASE_URL', '')
+    if url.startswith('sqlite:///'):
+        return url[len('sqlite:///'):]
+    return 'social_dapp.db'
+
+
+DB_PATH = _resolve_db_path()
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 8))
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+ASYNC_WORKERS = int(os.getenv('DB_ASYNC_WORKERS', POOL_SIZE))  # threads serving run_async
+
+# Applied to every new connection
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',          # safe with WAL, avoids an fsync per commit
+    'cache_size': -16000,             # ~16MB page cache per connection
+    'mmap_size': 268435456,           # 256MB memory-mapped I/O
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,             # ms to wait on a locked database
+}
+
+
+def _timed(call, args, phase='db', query=False):
+    clock = timing.current.get()
+    if clock is None:
+        return call(*args)
+    started = time.perf_counter()
+    try:
+        return call(*args)
+    finally:
+        clock.add(phase, time.perf_counter() - started)
+        if query:
+            clock.queries += 1
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that charges statement and fetch time to the active request clock"""
+
+    def execute(self, *args):
+        return _timed(super().execute, args, query=True)
+
+    def executemany(self, *args):
+        return _timed(super().executemany, args, query=True)
+
+    def fetchone(self):
+        return _timed(super().fetchone, ())
+
+    def fetchmany(self, *args):
+        return _timed(super().fetchmany, args)
+
+    def fetchall(self):
+        return _timed(super().fetchall, ())
+
+    def __next__(self):
+        return _timed(super().__next__, ())
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors (including ``conn.execute``) are TimedCursors"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def commit(self):
+        return _timed(super().commit, ())
+
+    def rollback(self):
+        return _timed(super().rollback, ())
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the pool timeout"""
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections shared across request threads"""
+
+    def __init__(self, db_path, max_size=8, timeout=10.0, pragmas=None):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pragmas = PRAGMAS if pragmas is None else pragmas
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._acquired_total = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+        self._peak_in_use = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False, factory=TimedConnection)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def acquire(self):
+        """Take an idle connection, open a new one, or wait for one to be released"""
+        with self._lock:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+                if self._created < self.max_size:
+                    self._created += 1
+                    create = True
+                else:
+                    create = False
+                    self._waits += 1
+            else:
+                create = False
+
+        if conn is None and create:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        elif conn is None:
+            started = time.perf_counter()
+            try:
+                conn = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._timeouts += 1
+                raise PoolTimeout(f'No database connection available after {self.timeout}s')
+            finally:
+                with self._lock:
+                    self._wait_time += time.perf_counter() - started
+
+        with self._lock:
+            self._in_use += 1
+            self._acquired_total += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+        return conn
+
+    def release(self, conn):
+        """Return a connection, rolling back anything the caller left uncommitted"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken connection - drop it so the slot can be reopened
+            with self._lock:
+                self._in_use -= 1
+                self._created -= 1
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            return
+        with self._lock:
+            self._in_use -= 1
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = _timed(self.acquire, (), phase='connect')
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'db_path': self.db_path,
+                'max_size': self.max_size,
+                'open_connections': self._created,
+                'in_use': self._in_use,
+                'idle': self._idle.qsize(),
+                'peak_in_use': self._peak_in_use,
+                'acquired_total': self._acquired_total,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'total_wait_ms': round(self._wait_time * 1000, 3),
+            }
+
+    def close_all(self):
+        """Close idle connections (used on shutdown and in tests)"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+pool = ConnectionPool(DB_PATH, max_size=POOL_SIZE, timeout=POOL_TIMEOUT)
+
+
+def get_db():
+    """Context manager yielding a pooled connection: ``with get_db() as conn:``"""
+    return pool.connection()
+
+
+def pool_stats():
+    return pool.stats()
+
+
+_async_executor = ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix='db-async')
+
+
+def _call_with_connection(fn, args):
+    with get_db() as conn:
+        return fn(conn, *args)
+
+
+async def run_async(fn, *args):
+    """Await ``fn(conn, *args)`` run with a pooled connection off the event loop"""
+    loop = asyncio.get_running_loop()
+    # Carry the caller's context (request clock) into the worker thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_async_executor, context.run, _call_with_connection, fn, args)
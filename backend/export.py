@@ -0,0 +1,171 @@
+"""Streaming bulk export of transactions and posts as NDJSON or CSV.
+
+Rows are read in keyset chunks of EXPORT_CHUNK_SIZE ordered by
+(created_at, id), each chunk on a briefly borrowed pool connection, and
+yielded as encoded text straight into a streaming response. Memory stays
+constant however many rows are exported and no connection is pinned for the
+length of a slow download.
+
+Every row carries its ``id``; passing the id of the last row received as
+``?after=<id>`` resumes an interrupted export exactly where it stopped.
+"""
+import csv
+import io
+import os
+from datetime import datetime
+
+import codec
+from db import get_db
+
+CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+TRANSACTION_COLUMNS = ['id', 'from_wallet', 'to_wallet', 'amount', 'transaction_hash', 'transaction_type',
+                       'related_post_id', 'gas_fee', 'status', 'created_at']
+POST_COLUMNS = ['id', 'user_id', 'username', 'wallet_address', 'content', 'media_urls', 'post_type',
+                'blockchain_hash', 'cross_platform_status', 'likes_count', 'shares_count', 'comments_count',
+                'created_at']
+# Stored as JSON text; decoded for NDJSON, left as JSON text in CSV
+POST_JSON_COLUMNS = ('media_urls', 'cross_platform_status')
+
+
+class ExportError(ValueError):
+    """Invalid export parameters"""
+
+
+def parse_timestamp(value, name):
+    """Normalize a date or datetime parameter to the stored created_at format"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        raise ExportError(f'{name} must be an ISO date or datetime')
+
+
+def _start_position(table, after):
+    """(created_at, id) keyset position following row ``after``"""
+    if after is None:
+        return ('', 0)
+    with get_db() as conn:
+        row = conn.execute(f'SELECT created_at, id FROM {table} WHERE id = ?', (after,)).fetchone()
+    if row is None:
+        raise ExportError('after does not match an exported row')
+    return tuple(row)
+
+
+def _range_conditions(since, until, column='created_at'):
+    conditions, params = [], []
+    if since:
+        conditions.append(f'{column} >= ?')
+        params.append(since)
+    if until:
+        conditions.append(f'{column} < ?')
+        params.append(until)
+    return conditions, params
+
+
+def _transaction_chunks(wallet, direction, tx_type, since, until, position):
+    columns = ', '.join(TRANSACTION_COLUMNS)
+    filters, filter_params = _range_conditions(since, until)
+    if tx_type:
+        filters.append('transaction_type = ?')
+        filter_params.append(tx_type)
+
+    if wallet:
+        sides = {'sent': ['from_wallet'], 'received': ['to_wallet']}.get(direction, ['from_wallet', 'to_wallet'])
+    else:
+        sides = [None]
+
+    while True:
+        # One index-ordered seek per side, merged like get_transaction_history
+        selects, params = [], []
+        for side in sides:
+            conditions = ['(created_at, id) > (?, ?)'] + filters
+            side_params = list(position) + filter_params
+            if side:
+                conditions.insert(0, f'{side} = ?')
+                side_params.insert(0, wallet)
+            selects.append(f'''
+                SELECT * FROM (
+                    SELECT {columns} FROM transactions
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY created_at, id
+                    LIMIT {CHUNK_SIZE}
+                )
+            ''')
+            params += side_params
+        sql = ' UNION '.join(selects) + f' ORDER BY created_at, id LIMIT {CHUNK_SIZE}'
+
+        with get_db() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < CHUNK_SIZE:
+            return
+        position = (rows[-1][-1], rows[-1][0])
+
+
+def _post_chunks(since, until, position):
+    filters, filter_params = _range_conditions(since, until, 'p.created_at')
+    where = ' AND '.join(['(p.created_at, p.id) > (?, ?)'] + filters)
+    while True:
+        with get_db() as conn:
+            rows = conn.execute(f'''
+                SELECT p.id, p.user_id, u.username, u.wallet_address, p.content, p.media_urls, p.post_type,
+                       p.blockchain_hash, p.cross_platform_status, p.likes_count, p.shares_count,
+                       p.comments_count, p.created_at
+                FROM posts p
+                LEFT JOIN users u ON u.id = p.user_id
+                WHERE {where}
+                ORDER BY p.created_at, p.id
+                LIMIT {CHUNK_SIZE}
+            ''', list(position) + filter_params).fetchall()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < CHUNK_SIZE:
+            return
+        position = (rows[-1][-1], rows[-1][0])
+
+
+def _encode(chunks, columns, fmt, json_columns=()):
+    """Yield the encoded text of each chunk, with a header first for CSV"""
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for rows in chunks:
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+        return
+
+    json_indexes = [columns.index(name) for name in json_columns]
+    for rows in chunks:
+        lines = []
+        for row in rows:
+            record = dict(zip(columns, row))
+            for index in json_indexes:
+                record[columns[index]] = codec.decode(row[index])
+            lines.append(codec.encode(record))
+        yield '\n'.join(lines) + '\n'
+
+
+def export_transactions(fmt, wallet=None, direction='all', tx_type=None, since=None, until=None, after=None):
+    """Generator of encoded transaction rows; parameters are validated before the first yield"""
+    position = _start_position('transactions', after)
+    return _encode(_transaction_chunks(wallet, direction, tx_type, since, until, position),
+                   TRANSACTION_COLUMNS, fmt)
+
+
+def export_posts(fmt, since=None, until=None, after=None):
+    position = _start_position('posts', after)
+    return _encode(_post_chunks(since, until, position), POST_COLUMNS, fmt, POST_JSON_COLUMNS)
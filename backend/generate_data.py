@@ -0,0 +1,569 @@
+"""Deterministic synthetic data for capacity planning.
+
+Fills a database with users, follows, posts, transactions, NFT tickets,
+savings pools, polls and feedback at production-like volumes, so query plans,
+page sizes and latencies can be reproduced locally:
+
+    python generate_data.py --scale medium
+    python generate_data.py --database /tmp/big.db --users 2000000 --posts 10000000 --seed 7
+
+Every table is drawn from its own ``random.Random`` seeded with (seed, table),
+so the same arguments always produce the same rows, and changing one table's
+count does not reshuffle the others. Timestamps are laid out over the ``--days``
+before ``--end`` (default: today, UTC); pass ``--end`` as well for a
+byte-identical database.
+
+The shapes follow what the app sees in practice: a few users author most
+posts and transactions (Zipf) and the same few are the most followed, post
+length is log-normal, hashtag use is Zipf over a large tag vocabulary, likes
+are heavy-tailed and activity grows over the window.
+
+Loading goes through one dedicated connection with relaxed pragmas (in-memory
+rollback journal, no fsync, exclusive lock, large cache). Secondary indexes
+and triggers on the loaded tables are dropped first and recreated after the
+bulk inserts, and the data they would have maintained row by row (search
+index, wallet ledger, poll tallies, hashtag buckets, follow counts, home
+timelines, table versions) is rebuilt in one pass each. Rows per second are
+reported per table and phase.
+"""
+import argparse
+import bisect
+import itertools
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+
+SCALES = {
+    'small': {'users': 10_000, 'follows': 100_000, 'posts': 50_000, 'transactions': 100_000, 'tickets': 200,
+              'pools': 200, 'polls': 500, 'feedback': 2_000},
+    'medium': {'users': 200_000, 'follows': 2_000_000, 'posts': 1_000_000, 'transactions': 2_000_000,
+               'tickets': 2_000, 'pools': 2_000, 'polls': 5_000, 'feedback': 20_000},
+    'large': {'users': 2_000_000, 'follows': 20_000_000, 'posts': 10_000_000, 'transactions': 20_000_000,
+              'tickets': 20_000, 'pools': 20_000, 'polls': 50_000, 'feedback': 200_000},
+}
+TABLES = ('users', 'follows', 'posts', 'transactions', 'tickets', 'pools', 'polls', 'feedback')
+
+# Applied to the loading connection only; db.PRAGMAS is restored afterwards
+LOAD_PRAGMAS = {
+    'journal_mode': 'MEMORY',         # rollback still works, nothing written to disk
+    'synchronous': 'OFF',
+    'locking_mode': 'EXCLUSIVE',
+    'cache_size': -262144,            # ~256MB
+    'temp_store': 'MEMORY',
+}
+
+# Tables whose secondary indexes and triggers are deferred during the load
+LOADED_TABLES = (
+    'users', 'follows', 'posts', 'post_hashtags', 'transactions', 'nft_tickets', 'savings_pools',
+    'pool_participants', 'voting_polls', 'poll_votes', 'feedback',
+)
+
+USER_SKEW = 0.8      # Zipf exponent for how activity spreads over users
+TAG_SKEW = 1.0       # Zipf exponent for hashtag popularity
+TAG_VOCABULARY = 5000
+POST_WORDS_MEDIAN = 18
+POST_WORDS_MAX = 280
+# Chance of a post carrying 0, 1, 2, ... hashtags
+HASHTAG_COUNTS = (0.45, 0.25, 0.15, 0.08, 0.04, 0.02, 0.01)
+
+WORDS = ('the a to and of in is for on with this that it my we our your just new now today '
+         'web3 blockchain wallet token community vote pool savings ticket event nft launch crypto defi dao '
+         'stake yield bridge rollup gas mint drop builder hackathon demo ship release roadmap governance '
+         'shardeum contract chain fees fast cheap love great excited thanks join check out build '
+         'learning open source team project users growth market price holders airdrop').split()
+SEED_TAGS = ['Web3', 'Blockchain', 'Shardeum', 'DeFi', 'NFT', 'DAO', 'Crypto', 'BuildInPublic',
+             'Hackathon', 'Airdrop', 'Ethereum', 'Layer2', 'GameFi', 'Metaverse', 'OpenSource']
+TX_TYPES = {'tip': 45, 'payment': 25, 'nft_purchase': 15, 'social_posting_payment': 15}
+TX_STATUSES = {'confirmed': 97, 'pending': 2, 'failed': 1}
+PLATFORMS = ['twitter', 'facebook', 'instagram', 'linkedin', 'youtube']
+POOL_TYPES = ['goal_based', 'time_based', 'rotating']
+FEEDBACK_CATEGORIES = ['general', 'bug', 'feature', 'ux', 'performance']
+VENUES = ['Online', 'Berlin', 'Bengaluru', 'Lisbon', 'Singapore', 'Denver', 'Paris', 'Dubai']
+
+
+def wallet(i):
+    return f'0x{i:040x}'
+
+
+def stamp(timestamp):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(timestamp))
+
+
+class Zipf:
+    """Ranks 0..n-1 drawn with probability proportional to 1 / (rank + 1) ** s"""
+
+    def __init__(self, n, s):
+        self.cumulative = array('d', itertools.accumulate(1.0 / k ** s for k in range(1, n + 1)))
+
+    def sample(self, rng):
+        return bisect.bisect_right(self.cumulative, rng.random() * self.cumulative[-1])
+
+
+class Generator:
+    """Row factories for every table; ids continue after ``offsets``"""
+
+    def __init__(self, counts, seed, end, days, offsets):
+        self.counts = counts
+        self.seed = seed
+        self.end = end
+        self.start = end - days * 86400
+        self.offsets = offsets
+        self.user_ids = Zipf(max(counts['users'], 1), USER_SKEW)
+        self.tags = self._tag_vocabulary()
+        self.tag_ranks = Zipf(len(self.tags), TAG_SKEW)
+        self.word_weights = list(itertools.accumulate(1.0 / k for k in range(1, len(WORDS) + 1)))
+        self.ticket_sales = {}
+
+    def rng(self, table):
+        return random.Random(f'{self.seed}:{table}:{self.offsets[table]}')
+
+    def _tag_vocabulary(self):
+        rng = random.Random(f'{self.seed}:tags')
+        tags = list(SEED_TAGS)
+        while len(tags) < TAG_VOCABULARY:
+            tag = rng.choice(WORDS).capitalize() + rng.choice(WORDS).capitalize()
+            tags.append(tag if tag not in tags else f'{tag}{len(tags)}')
+        return tags
+
+    def moment(self, rng, i, total):
+        # Activity grows over the window: density rises linearly towards ``end``
+        return self.start + (self.end - self.start) * ((i + rng.random()) / max(total, 1)) ** 0.5
+
+    def user(self, rng):
+        """Id of an existing or generated user, skewed towards the most active"""
+        return self.offsets['users'] + 1 + self.user_ids.sample(rng)
+
+    def text(self, rng, median, maximum):
+        count = min(maximum, max(1, int(rng.lognormvariate(math.log(median), 0.8))))
+        return ' '.join(rng.choices(WORDS, cum_weights=self.word_weights, k=count))
+
+    def post_content(self, rng):
+        content = self.text(rng, POST_WORDS_MEDIAN, POST_WORDS_MAX)
+        count = rng.choices(range(len(HASHTAG_COUNTS)), weights=HASHTAG_COUNTS)[0]
+        tags = {self.tags[self.tag_ranks.sample(rng)] for _ in range(count)}
+        return content + ''.join(f' #{tag}' for tag in sorted(tags))
+
+    def users(self):
+        rng, first, total = self.rng('users'), self.offsets['users'], self.counts['users']
+        for i in range(total):
+            index = first + i
+            yield (
+                index + 1, wallet(index), f'user{index}', f'user{index}@example.com',
+                f'https://api.dicebear.com/7.x/avataaars/svg?seed={index}',
+                self.text(rng, 10, 40) if rng.random() < 0.6 else None,
+                stamp(self.moment(rng, i, total)),
+                rng.random() < 0.03,
+            )
+
+    def follows(self):
+        """(follower, followee, created_at); followers are uniform, followees skewed like authors"""
+        rng, total = self.rng('follows'), self.counts['follows']
+        users = self.offsets['users'] + self.counts['users']
+        for i in range(total if users > 1 else 0):
+            follower, followee = rng.randint(1, users), self.user(rng)
+            if follower != followee:
+                yield follower, followee, stamp(self.moment(rng, i, total))
+
+    def posts(self, codec, hashtags):
+        """(post row, [(tag, post_id), ...]) per post"""
+        rng, first, total = self.rng('posts'), self.offsets['posts'], self.counts['posts']
+        for i in range(total):
+            post_id = first + i + 1
+            content = self.post_content(rng)
+            media = [f'https://cdn.example.com/media/{post_id}/{n}.jpg' for n in range(rng.choice((1, 1, 2, 4)))] \
+                if rng.random() < 0.15 else []
+            platforms = rng.sample(PLATFORMS, rng.randint(1, 3)) if rng.random() < 0.2 else []
+            likes = min(int(rng.paretovariate(1.2)) - 1, 1_000_000)
+            row = (
+                post_id, self.user(rng), content, codec.encode(media),
+                ('video' if rng.random() < 0.2 else 'image') if media else 'text',
+                f'0x{rng.getrandbits(256):064x}' if rng.random() < 0.3 else None,
+                codec.encode({platform: self.published(rng, platform) for platform in platforms}),
+                likes, likes // rng.randint(4, 20), int(likes * rng.random() * 0.3),
+                stamp(self.moment(rng, i, total)),
+            )
+            yield row, [(tag, post_id) for tag in hashtags.extract(content)]
+
+    @staticmethod
+    def published(rng, platform):
+        """A post's cross_platform_status entry as outbox._finish records a successful publish"""
+        post_id = f'{platform[:2]}_{rng.getrandbits(64):016x}'
+        return {'status': 'success', 'platform': platform, 'post_id': post_id}
+
+    def tickets(self):
+        rng, first, total = self.rng('tickets'), self.offsets['tickets'], self.counts['tickets']
+        for i in range(total):
+            ticket_id, created = first + i + 1, self.moment(rng, i, total)
+            supply = min(100_000, max(10, int(rng.lognormvariate(math.log(300), 1.0))))
+            event_name = f'{rng.choice(SEED_TAGS)} {rng.choice(("Summit", "Meetup", "Hackathon", "Party", "Conf"))}'
+            yield (
+                ticket_id, f'{event_name} {ticket_id}',
+                stamp(created + rng.uniform(7, 120) * 86400), rng.choice(VENUES),
+                round(rng.lognormvariate(math.log(0.05), 0.7), 4), supply, supply,
+                wallet(self.user(rng) - 1), f'0x{rng.getrandbits(160):040x}',
+                f'ipfs://{rng.getrandbits(128):032x}', stamp(created),
+                rng.random() < 0.9,
+            )
+
+    def transactions(self):
+        rng, total = self.rng('transactions'), self.counts['transactions']
+        types, type_weights = list(TX_TYPES), list(itertools.accumulate(TX_TYPES.values()))
+        statuses, status_weights = list(TX_STATUSES), list(itertools.accumulate(TX_STATUSES.values()))
+        tickets = (self.offsets['tickets'] + 1, self.offsets['tickets'] + self.counts['tickets'])
+        posts = (1, self.offsets['posts'] + self.counts['posts'])
+        for i in range(total):
+            tx_type = rng.choices(types, cum_weights=type_weights)[0]
+            if tx_type == 'nft_purchase' and self.counts['tickets']:
+                related = rng.randint(*tickets)
+                self.ticket_sales[related] = self.ticket_sales.get(related, 0) + 1
+            elif tx_type == 'tip' and posts[1]:
+                related = rng.randint(*posts)
+            else:
+                related = None
+            yield (
+                wallet(self.user(rng) - 1),
+                'social_platform' if tx_type == 'social_posting_payment' else wallet(self.user(rng) - 1),
+                round(rng.lognormvariate(math.log(0.02), 1.2), 6), f'0x{rng.getrandbits(256):064x}',
+                tx_type, related, round(rng.uniform(0.0001, 0.002), 6),
+                rng.choices(statuses, cum_weights=status_weights)[0], stamp(self.moment(rng, i, total)),
+            )
+
+    def pools(self):
+        """(pool row, participant rows, contribution transactions) per pool"""
+        rng, first, total = self.rng('pools'), self.offsets['pools'], self.counts['pools']
+        for i in range(total):
+            pool_id, created = first + i + 1, self.moment(rng, i, total)
+            members = {self.user(rng) - 1 for _ in range(min(500, max(1, int(rng.lognormvariate(math.log(8), 1.0)))))}
+            participants, contributions, current = [], [], 0.0
+            for member in sorted(members):
+                amounts = [round(rng.lognormvariate(math.log(0.1), 0.8), 6) for _ in range(rng.randint(1, 5))]
+                joined = rng.uniform(created, self.end)
+                participants.append((pool_id, wallet(member), sum(amounts), len(amounts), stamp(joined)))
+                contributions.extend((
+                    wallet(member), 'pool_wallet', amount, f'0x{rng.getrandbits(256):064x}', 'pool_contribution',
+                    pool_id, round(rng.uniform(0.0001, 0.002), 6), 'confirmed', stamp(rng.uniform(joined, self.end)),
+                ) for amount in amounts)
+                current += sum(amounts)
+            row = (
+                pool_id, f'Pool {pool_id}', self.text(rng, 12, 60), round(current * rng.uniform(1.0, 3.0), 2),
+                current, wallet(self.user(rng) - 1), stamp(created + rng.uniform(30, 365) * 86400),
+                rng.choice(POOL_TYPES), f'0x{rng.getrandbits(160):040x}', rng.random() < 0.85, stamp(created),
+            )
+            yield row, participants, contributions
+
+    def polls(self, codec):
+        """(poll row, ballot rows) per poll"""
+        rng, first, total = self.rng('polls'), self.offsets['polls'], self.counts['polls']
+        users = self.offsets['users'] + self.counts['users']
+        for i in range(total):
+            poll_id, created = first + i + 1, self.moment(rng, i, total)
+            options = [f'Option {chr(65 + n)}' for n in range(rng.randint(2, 5))]
+            # Early options collect more votes, as they do on a real ballot
+            preference = list(itertools.accumulate(1.0 / (n + 1) for n in range(len(options))))
+            voters = rng.sample(range(users), min(users, int(rng.lognormvariate(math.log(40), 1.3))))
+            row = (
+                poll_id, f'Proposal {poll_id}', self.text(rng, 20, 80), codec.encode(options),
+                wallet(self.user(rng) - 1), codec.encode([]), stamp(created),
+                stamp(created + rng.uniform(3, 30) * 86400), rng.random() < 0.5, stamp(created),
+            )
+            ballots = [(poll_id, wallet(voter), rng.choices(options, cum_weights=preference)[0],
+                        stamp(rng.uniform(created, self.end))) for voter in voters]
+            yield row, ballots
+
+    def feedback(self):
+        rng, total = self.rng('feedback'), self.counts['feedback']
+        for i in range(total):
+            anonymous = rng.random() < 0.7
+            yield (
+                self.text(rng, 25, 150), rng.choice(FEEDBACK_CATEGORIES), anonymous,
+                None if anonymous else wallet(self.user(rng) - 1), f'{rng.getrandbits(256):064x}',
+                int(rng.paretovariate(1.5)) - 1, int(rng.paretovariate(2.5)) - 1,
+                stamp(self.moment(rng, i, total)),
+            )
+
+
+class Loader:
+    """Batched inserts on one connection, with timings per table"""
+
+    def __init__(self, conn, batch_size):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.timings = []
+
+    def insert(self, label, sql, rows):
+        started = time.perf_counter()
+        count = 0
+        self.conn.execute('BEGIN')
+        try:
+            while True:
+                batch = list(itertools.islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self.conn.executemany(sql, batch)
+                count += len(batch)
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.report(label, count, time.perf_counter() - started)
+        return count
+
+    def insert_nested(self, label, rows, statements):
+        """Insert rows that each expand into several tables (post + its hashtags, poll + ballots, ...)"""
+        started = time.perf_counter()
+        counts = [0] * len(statements)
+        self.conn.execute('BEGIN')
+        try:
+            while True:
+                batch = list(itertools.islice(rows, self.batch_size))
+                if not batch:
+                    break
+                for position, sql in enumerate(statements):
+                    params = [part for item in batch for part in self._part(item, position)]
+                    self.conn.executemany(sql, params)
+                    counts[position] += len(params)
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        elapsed = time.perf_counter() - started
+        self.report(label, sum(counts), elapsed)
+        return counts
+
+    @staticmethod
+    def _part(item, position):
+        part = item[position]
+        return [part] if position == 0 else part
+
+    def phase(self, label, sql_or_fn):
+        started = time.perf_counter()
+        if callable(sql_or_fn):
+            sql_or_fn()
+        else:
+            self.conn.execute(sql_or_fn)
+        self.report(label, None, time.perf_counter() - started)
+
+    def report(self, label, rows, elapsed):
+        self.timings.append((label, rows, elapsed))
+        if rows is None:
+            print(f'{label:28s} {"":12s} {elapsed:9.2f}s', flush=True)
+        else:
+            print(f'{label:28s} {rows:12,d} {elapsed:9.2f}s {rows / max(elapsed, 1e-9):12,.0f} rows/s', flush=True)
+
+
+def defer_schema(conn):
+    """Drop secondary indexes and triggers on the loaded tables; returns their SQL"""
+    placeholders = ','.join('?' * len(LOADED_TABLES))
+    deferred = conn.execute(f'''
+        SELECT type, name, sql FROM sqlite_master
+        WHERE type IN ('index', 'trigger') AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+    ''', LOADED_TABLES).fetchall()
+    for kind, name, _ in deferred:
+        conn.execute(f'DROP {kind.upper()} {name}')
+    return deferred
+
+
+def restore_schema(conn, deferred):
+    for _, _, sql in deferred:
+        conn.execute(sql)
+
+
+def existing_offsets(conn):
+    """Highest existing id per generated table (row count for follows), so appended rows follow them"""
+    sources = {'users': 'users', 'posts': 'posts', 'transactions': 'transactions', 'tickets': 'nft_tickets',
+               'pools': 'savings_pools', 'polls': 'voting_polls', 'feedback': 'feedback'}
+    offsets = {key: conn.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table}').fetchone()[0]
+               for key, table in sources.items()}
+    offsets['follows'] = conn.execute('SELECT COUNT(*) FROM follows').fetchone()[0]
+    return offsets
+
+
+def load(conn, generator, loader, codec, hashtags):
+    loader.insert('users', '''
+        INSERT INTO users (id, wallet_address, username, email, avatar_url, bio, created_at, is_verified)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', generator.users())
+    loader.insert('follows', 'INSERT OR IGNORE INTO follows (follower_id, followee_id, created_at) VALUES (?, ?, ?)',
+                  generator.follows())
+    loader.insert_nested('posts + post_hashtags', generator.posts(codec, hashtags), [
+        '''
+        INSERT INTO posts (id, user_id, content, media_urls, post_type, blockchain_hash, cross_platform_status,
+                           likes_count, shares_count, comments_count, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''',
+        'INSERT OR IGNORE INTO post_hashtags (tag, post_id) VALUES (?, ?)',
+    ])
+    loader.insert('nft_tickets', '''
+        INSERT INTO nft_tickets (id, event_name, event_date, venue, price, total_supply, remaining_supply,
+                                 creator_wallet, nft_contract_address, metadata_uri, created_at, is_active)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', generator.tickets())
+    insert_transaction = '''
+        INSERT INTO transactions (from_wallet, to_wallet, amount, transaction_hash, transaction_type,
+                                  related_post_id, gas_fee, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    loader.insert('transactions', insert_transaction, generator.transactions())
+    loader.insert_nested('pools + contributions', generator.pools(), [
+        '''
+        INSERT INTO savings_pools (id, pool_name, description, target_amount, current_amount, creator_wallet,
+                                   end_date, pool_type, smart_contract_address, is_active, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''',
+        '''
+        INSERT INTO pool_participants (pool_id, wallet, total_contributed, contributions, joined_at)
+        VALUES (?, ?, ?, ?, ?)
+        ''',
+        insert_transaction,
+    ])
+    loader.insert_nested('polls + poll_votes', generator.polls(codec), [
+        '''
+        INSERT INTO voting_polls (id, title, description, options, creator_wallet, eligible_voters,
+                                  start_date, end_date, is_blockchain_verified, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''',
+        'INSERT INTO poll_votes (poll_id, voter_wallet, option, created_at, updated_at) VALUES (?1, ?2, ?3, ?4, ?4)',
+    ])
+    loader.insert('feedback', '''
+        INSERT INTO feedback (content, category, is_anonymous, user_wallet, verification_hash,
+                              upvotes, downvotes, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', generator.feedback())
+
+
+def rebuild_derived(conn, generator, loader, hashtags, ledger, search, timeline):
+    """Recompute what the deferred triggers would have maintained row by row"""
+    def ticket_supply():
+        conn.executemany(
+            'UPDATE nft_tickets SET remaining_supply = MAX(total_supply - ?, 0) WHERE id = ?',
+            [(sold, ticket_id) for ticket_id, sold in generator.ticket_sales.items()]
+        )
+
+    def hashtag_buckets():
+        # Only the trending window is kept, as hashtags.record prunes older buckets. Only
+        # this run's posts are counted: with --append the earlier ones are already in
+        window_start = (hashtags.bucket_for(generator.end) - hashtags.TRENDING_WINDOW_BUCKETS) * hashtags.BUCKET_SECONDS
+        conn.execute(f'''
+            INSERT INTO hashtag_buckets (bucket, tag, uses)
+            SELECT CAST(strftime('%s', p.created_at) AS INTEGER) / {hashtags.BUCKET_SECONDS}, h.tag, COUNT(*)
+            FROM posts p
+            JOIN post_hashtags h ON h.post_id = p.id
+            WHERE p.id > ? AND p.created_at >= ?
+            GROUP BY 1, 2
+            ON CONFLICT (bucket, tag) DO UPDATE SET uses = uses + excluded.uses
+        ''', (generator.offsets['posts'], stamp(window_start)))
+
+    def poll_tallies():
+        conn.execute('DELETE FROM poll_tallies')
+        conn.execute('''
+            INSERT INTO poll_tallies (poll_id, option, votes)
+            SELECT poll_id, option, COUNT(*) FROM poll_votes GROUP BY poll_id, option
+        ''')
+
+    def follow_stats():
+        conn.execute('''
+            INSERT INTO follow_stats (user_id, followers, following)
+            SELECT user_id, SUM(followers), SUM(following) FROM (
+                SELECT followee_id AS user_id, COUNT(*) AS followers, 0 AS following FROM follows GROUP BY 1
+                UNION ALL
+                SELECT follower_id, 0, COUNT(*) FROM follows GROUP BY 1
+            )
+            GROUP BY user_id
+            ON CONFLICT (user_id) DO UPDATE SET followers = excluded.followers, following = excluded.following
+        ''')
+
+    def search_index():
+        for fts_table in search.FTS_TABLES:
+            conn.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+    conn.execute('BEGIN')
+    try:
+        loader.phase('ticket remaining_supply', ticket_supply)
+        loader.phase('hashtag_buckets', hashtag_buckets)
+        loader.phase('poll_tallies', poll_tallies)
+        loader.phase('search index', search_index)
+        loader.phase('follow_stats', follow_stats)
+        loader.phase('timelines', lambda: timeline.rebuild(conn.cursor()))
+        loader.phase('table_versions', 'UPDATE table_versions SET version = version + 1')
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    loader.phase('wallet_ledger', lambda: ledger.rebuild(conn))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--database', help='SQLite file to fill (default: DATABASE_PATH / DATABASE_URL)')
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    for table in TABLES:
+        parser.add_argument(f'--{table}', type=int, help=f'{table} to generate (overrides --scale)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--days', type=int, default=365, help='length of the activity window')
+    parser.add_argument('--end', help='end of the activity window, YYYY-MM-DD (default: today, UTC)')
+    parser.add_argument('--batch-size', type=int, default=10_000, help='rows per executemany call')
+    parser.add_argument('--append', action='store_true', help='add to a database that already has users')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.database:
+        os.environ['DATABASE_PATH'] = args.database
+    os.environ.setdefault('OUTBOX_WORKERS', '0')
+
+    import app as backend
+    import codec
+    import db
+    import hashtags
+    import ledger
+    import search
+    import timeline
+
+    backend.init_db()
+    db.pool.close_all()
+
+    counts = dict(SCALES[args.scale])
+    counts.update({table: getattr(args, table) for table in TABLES if getattr(args, table) is not None})
+    if args.end:
+        end = datetime.strptime(args.end, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    else:
+        end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    conn = sqlite3.connect(db.DB_PATH, isolation_level=None)
+    offsets = existing_offsets(conn)
+    if offsets['users'] and not args.append:
+        sys.exit(f'{db.DB_PATH} already has users; pass --append to add to it')
+    for name, value in LOAD_PRAGMAS.items():
+        conn.execute(f'PRAGMA {name} = {value}')
+
+    generator = Generator(counts, args.seed, end.timestamp(), args.days, offsets)
+    loader = Loader(conn, args.batch_size)
+    print(f'Generating into {db.DB_PATH} (seed {args.seed}, window {args.days} days to {end:%Y-%m-%d})')
+    print(f'{"phase":28s} {"rows":>12s} {"seconds":>10s} {"rate":>12s}')
+    started = time.perf_counter()
+
+    deferred = defer_schema(conn)
+    try:
+        load(conn, generator, loader, codec, hashtags)
+    finally:
+        loader.phase(f'indexes + triggers ({len(deferred)})', lambda: restore_schema(conn, deferred))
+    rebuild_derived(conn, generator, loader, hashtags, ledger, search, timeline)
+    loader.phase('analyze', 'ANALYZE')
+
+    conn.execute('PRAGMA locking_mode = NORMAL')
+    conn.execute(f"PRAGMA journal_mode = {db.PRAGMAS['journal_mode']}")
+    conn.close()
+
+    elapsed = time.perf_counter() - started
+    rows = sum(count for _, count, _ in loader.timings if count)
+    print(f'{"total":28s} {rows:12,d} {elapsed:9.2f}s {rows / elapsed:12,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Hashtag index and trending tags.
+
+Hashtags are parsed from post content at write time, inside the post's own
+transaction, into ``post_hashtags`` (tag, post_id) so the posts for a tag are
+an index seek rather than a LIKE over every post. The same write bumps a
+per-tag counter in ``hashtag_buckets`` for the current time bucket.
+
+Trending scores are read from the buckets inside the trending window only:
+each bucket's count is weighted by an exponential decay on its age, so recent
+use counts for more and a tag fades out as its buckets age. Buckets older
+than the window are pruned as new ones are written, so the table stays bounded
+however many posts there are.
+"""
+import math
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+BUCKET_SECONDS = int(os.getenv('HASHTAG_BUCKET_SECONDS', 3600))
+TRENDING_WINDOW_BUCKETS = int(os.getenv('TRENDING_WINDOW_BUCKETS', 48))
+TRENDING_HALF_LIFE = float(os.getenv('TRENDING_HALF_LIFE', 6 * 3600))  # seconds
+
+MAX_TAG_LENGTH = 64
+_HASHTAG = re.compile(r'(?<![\w#])#(\w+)', re.UNICODE)
+
+
+def extract(content):
+    """Distinct, lower-cased hashtags in ``content`` (without the '#')"""
+    tags = []
+    for match in _HASHTAG.finditer(content or ''):
+        tag = match.group(1).lower()
+        if len(tag) <= MAX_TAG_LENGTH and not tag.isdigit() and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def normalize(tag):
+    """Canonical form of a tag taken from a URL ('#Web3' -> 'web3')"""
+    return (tag or '').lstrip('#').lower()
+
+
+def bucket_for(timestamp):
+    return int(timestamp // BUCKET_SECONDS)
+
+
+def install(cursor):
+    """Create the hashtag tables, backfilling from existing posts on first install"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'post_hashtags'")
+    exists = cursor.fetchone() is not None
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS post_hashtags (
+            tag TEXT NOT NULL,
+            post_id INTEGER NOT NULL,
+            PRIMARY KEY (tag, post_id)
+        ) WITHOUT ROWID
+    ''')
+    # Keyed by bucket first so the trending window and pruning are range seeks
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS hashtag_buckets (
+            bucket INTEGER NOT NULL,
+            tag TEXT NOT NULL,
+            uses INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket, tag)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_posts_hashtags_delete AFTER DELETE ON posts
+        BEGIN
+            DELETE FROM post_hashtags WHERE post_id = old.id;
+        END
+    ''')
+
+    if not exists:
+        cursor.execute('SELECT id, content, created_at FROM posts')
+        for post_id, content, created_at in cursor.fetchall():
+            record(cursor, post_id, content, _parse_timestamp(created_at), prune=False)
+
+
+def _parse_timestamp(created_at):
+    try:
+        parsed = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S')
+        return parsed.replace(tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+def record(cursor, post_id, content, timestamp=None, prune=True):
+    """Index a new post's hashtags; runs inside the caller's transaction"""
+    tags = extract(content)
+    if not tags:
+        return tags
+    bucket = bucket_for(time.time() if timestamp is None else timestamp)
+    cursor.executemany(
+        'INSERT OR IGNORE INTO post_hashtags (tag, post_id) VALUES (?, ?)',
+        [(tag, post_id) for tag in tags]
+    )
+    cursor.executemany('''
+        INSERT INTO hashtag_buckets (bucket, tag, uses) VALUES (?, ?, 1)
+        ON CONFLICT (bucket, tag) DO UPDATE SET uses = uses + 1
+    ''', [(bucket, tag) for tag in tags])
+    if prune:
+        cursor.execute('DELETE FROM hashtag_buckets WHERE bucket < ?', (bucket - TRENDING_WINDOW_BUCKETS,))
+    return tags
+
+
+def posts_for_tag(cursor, tag, limit, before=None):
+    """Newest-first page of posts carrying ``tag``; returns (rows, next_before).
+
+    Rows have the same columns as the feed queries. Paging is by post id,
+    which the (tag, post_id) primary key serves directly.
+    """
+    cursor.execute(f'''
+        SELECT p.*, u.username, u.avatar_url, u.wallet_address
+        FROM post_hashtags h
+        JOIN posts p ON p.id = h.post_id
+        JOIN users u ON p.user_id = u.id
+        WHERE h.tag = ? {'AND h.post_id < ?' if before is not None else ''}
+        ORDER BY h.post_id DESC
+        LIMIT ?
+    ''', [tag] + ([before] if before is not None else []) + [limit + 1])
+    rows = cursor.fetchall()
+    next_before = rows[limit - 1][0] if len(rows) > limit else None
+    return rows[:limit], next_before
+
+
+def trending(cursor, limit=10, now=None):
+    """Top tags by decayed use over the trending window"""
+    now = time.time() if now is None else now
+    current = bucket_for(now)
+    cursor.execute('''
+        SELECT bucket, tag, uses FROM hashtag_buckets
+        WHERE bucket > ?
+    ''', (current - TRENDING_WINDOW_BUCKETS,))
+
+    decay = math.log(2) / TRENDING_HALF_LIFE
+    scores = {}
+    counts = {}
+    for bucket, tag, uses in cursor.fetchall():
+        age = max(0.0, now - (bucket + 1) * BUCKET_SECONDS)
+        scores[tag] = scores.get(tag, 0.0) + uses * math.exp(-decay * age)
+        counts[tag] = counts.get(tag, 0) + uses
+
+    top = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [{'tag': tag, 'score': round(score, 4), 'uses': counts[tag]} for tag, score in top]
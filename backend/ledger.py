@@ -0,0 +1,160 @@
+"""Per-wallet transaction ledger.
+
+``wallet_ledger`` holds one row per (wallet, transaction_type, direction) with
+the running count, amount and gas of every transaction a wallet sent ('out')
+or received ('in'). Triggers on ``transactions`` keep it current inside the
+writing transaction, so record_transaction, process_payment, NFT purchases,
+pool contributions and any other writer all maintain it without extra code,
+and a wallet's summary is a primary-key range read of a handful of rows
+instead of an aggregate over its whole history.
+
+Amounts are REAL and maintained by addition, so after heavy update/delete
+traffic they can drift by rounding; ``rebuild`` recomputes the table from
+``transactions``:
+
+    python ledger.py rebuild
+"""
+import sys
+
+# Named totals surfaced by the summary endpoint: label -> (transaction_type, direction)
+HIGHLIGHTS = {
+    'tips_received': ('tip', 'in'),
+    'tips_sent': ('tip', 'out'),
+    'pool_contributions': ('pool_contribution', 'out'),
+    'nft_spend': ('nft_purchase', 'out'),
+    'posting_payments': ('social_posting_payment', 'out'),
+}
+
+_SIDES = (('out', 'from_wallet'), ('in', 'to_wallet'))
+
+
+def _add(side, column, row='new'):
+    gas = f'COALESCE({row}.gas_fee, 0)' if side == 'out' else '0'
+    return f'''
+        INSERT INTO wallet_ledger (wallet, transaction_type, direction, tx_count, total_amount, total_gas, last_transaction_at)
+        VALUES ({row}.{column}, COALESCE({row}.transaction_type, 'other'), '{side}', 1, {row}.amount, {gas}, {row}.created_at)
+        ON CONFLICT (wallet, transaction_type, direction) DO UPDATE SET
+            tx_count = tx_count + 1,
+            total_amount = total_amount + excluded.total_amount,
+            total_gas = total_gas + excluded.total_gas,
+            last_transaction_at = MAX(COALESCE(last_transaction_at, ''), excluded.last_transaction_at);
+    '''
+
+
+def _subtract(side, column, row='old'):
+    gas = f'COALESCE({row}.gas_fee, 0)' if side == 'out' else '0'
+    return f'''
+        UPDATE wallet_ledger SET
+            tx_count = tx_count - 1,
+            total_amount = total_amount - {row}.amount,
+            total_gas = total_gas - {gas}
+        WHERE wallet = {row}.{column}
+          AND transaction_type = COALESCE({row}.transaction_type, 'other')
+          AND direction = '{side}';
+    '''
+
+
+def install(cursor):
+    """Create wallet_ledger and its triggers, backfilling on first install"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'wallet_ledger'")
+    exists = cursor.fetchone() is not None
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS wallet_ledger (
+            wallet TEXT NOT NULL,
+            transaction_type TEXT NOT NULL,
+            direction TEXT NOT NULL,  -- out (sent) or in (received)
+            tx_count INTEGER NOT NULL DEFAULT 0,
+            total_amount REAL NOT NULL DEFAULT 0,
+            total_gas REAL NOT NULL DEFAULT 0,
+            last_transaction_at TIMESTAMP,
+            PRIMARY KEY (wallet, transaction_type, direction)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_ledger_insert AFTER INSERT ON transactions
+        BEGIN
+            {''.join(_add(side, column) for side, column in _SIDES)}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_ledger_delete AFTER DELETE ON transactions
+        BEGIN
+            {''.join(_subtract(side, column) for side, column in _SIDES)}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_ledger_update
+        AFTER UPDATE OF from_wallet, to_wallet, amount, gas_fee, transaction_type ON transactions
+        BEGIN
+            {''.join(_subtract(side, column) for side, column in _SIDES)}
+            {''.join(_add(side, column) for side, column in _SIDES)}
+        END
+    ''')
+
+    if not exists:
+        _fill(cursor)
+
+
+def _fill(cursor):
+    for side, column in _SIDES:
+        gas = 'SUM(COALESCE(gas_fee, 0))' if side == 'out' else '0'
+        cursor.execute(f'''
+            INSERT INTO wallet_ledger (wallet, transaction_type, direction, tx_count, total_amount, total_gas, last_transaction_at)
+            SELECT {column}, COALESCE(transaction_type, 'other'), '{side}', COUNT(*), SUM(amount), {gas}, MAX(created_at)
+            FROM transactions
+            GROUP BY {column}, COALESCE(transaction_type, 'other')
+        ''')
+
+
+def rebuild(conn):
+    """Recompute wallet_ledger from transactions; returns the number of ledger rows"""
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        cursor.execute('DELETE FROM wallet_ledger')
+        _fill(cursor)
+        count = cursor.execute('SELECT COUNT(*) FROM wallet_ledger').fetchone()[0]
+        conn.commit()
+        return count
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def summary(cursor, wallet):
+    """Totals for one wallet, by transaction type and direction"""
+    cursor.execute('''
+        SELECT transaction_type, direction, tx_count, total_amount, total_gas, last_transaction_at
+        FROM wallet_ledger
+        WHERE wallet = ?
+    ''', (wallet,))
+
+    by_type = {}
+    totals = {'sent': 0.0, 'received': 0.0, 'gas_paid': 0.0, 'transactions': 0, 'last_transaction_at': None}
+    lookup = {}
+    for tx_type, direction, count, amount, gas, last_at in cursor.fetchall():
+        if not count:
+            continue
+        key = 'sent' if direction == 'out' else 'received'
+        by_type.setdefault(tx_type, {})[key] = {'count': count, 'amount': amount}
+        lookup[(tx_type, direction)] = amount
+        totals[key] += amount
+        totals['gas_paid'] += gas
+        totals['transactions'] += count
+        if last_at and (totals['last_transaction_at'] is None or last_at > totals['last_transaction_at']):
+            totals['last_transaction_at'] = last_at
+
+    totals['net'] = totals['received'] - totals['sent']
+    for label, key in HIGHLIGHTS.items():
+        totals[label] = lookup.get(key, 0.0)
+    return {'wallet': wallet, 'totals': totals, 'by_type': by_type}
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] != ['rebuild']:
+        sys.exit('usage: python ledger.py rebuild')
+    from db import get_db
+    with get_db() as conn:
+        rows = rebuild(conn)
+    print(f'wallet_ledger rebuilt: {rows} rows')
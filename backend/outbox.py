@@ -0,0 +1,214 @@
+"""Durable outbox for publishing posts to social platforms.
+
+Routes only write the post and one ``social_outbox`` row per platform inside
+the same transaction, then return. A pool of background workers claims due
+rows, publishes them through the platform adapters, and records the outcome
+in ``posts.cross_platform_status``. Failed publishes are retried with
+exponential backoff until OUTBOX_MAX_ATTEMPTS is reached.
+
+The rows of a claimed batch are published concurrently on one event loop
+through ``cross_platform_post_async``, so a batch takes about as long as its
+slowest publish rather than the sum of them.
+"""
+import asyncio
+import collections
+import os
+import threading
+import time
+
+import codec
+import platforms
+from cache import feed_cache
+from db import get_db
+
+WORKER_COUNT = int(os.getenv('OUTBOX_WORKERS', 4))
+BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 10))
+MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+BACKOFF_BASE = float(os.getenv('OUTBOX_BACKOFF_BASE', 2))      # seconds
+BACKOFF_MAX = float(os.getenv('OUTBOX_BACKOFF_MAX', 300))
+POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', 1))
+LEASE_SECONDS = float(os.getenv('OUTBOX_LEASE_SECONDS', 60))   # reclaim rows from crashed workers
+
+# Window for the drain-rate metric
+RATE_WINDOW = 60
+
+_wakeup = threading.Condition()
+_workers = []
+_workers_lock = threading.Lock()
+_metrics_lock = threading.Lock()
+_completed = collections.deque()  # (finished_at, outcome) within RATE_WINDOW
+_totals = collections.Counter()
+
+
+def enqueue(cursor, post_id, platform_names, content, media_urls=None):
+    """Queue a post for publishing; runs inside the caller's transaction"""
+    now = time.time()
+    cursor.executemany('''
+        INSERT INTO social_outbox (post_id, platform, content, media_urls, status, next_attempt_at)
+        VALUES (?, ?, ?, ?, 'pending', ?)
+    ''', [(post_id, name, content, codec.encode(media_urls or []), now) for name in platform_names])
+
+
+def queued_status(platform_names):
+    """Initial cross_platform_status for a freshly queued post"""
+    return {name: {'status': 'queued', 'platform': name} for name in platform_names}
+
+
+def notify():
+    """Start the workers if needed and wake one to pick up new rows"""
+    start_workers()
+    with _wakeup:
+        _wakeup.notify()
+
+
+def _backoff(attempts):
+    return min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (attempts - 1)))
+
+
+def _claim(limit):
+    now = time.time()
+    with get_db() as conn:
+        rows = conn.execute('''
+            UPDATE social_outbox
+            SET status = 'in_progress', attempts = attempts + 1, claimed_at = ?
+            WHERE id IN (
+                SELECT id FROM social_outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                UNION ALL
+                SELECT id FROM social_outbox
+                WHERE status = 'in_progress' AND claimed_at <= ?
+                LIMIT ?
+            )
+            RETURNING id, post_id, platform, content, media_urls, attempts
+        ''', (now, now, now - LEASE_SECONDS, limit)).fetchall()
+        conn.commit()
+    return rows
+
+
+def _finish(row_id, post_id, platform, attempts, result):
+    published = result.get('status') == 'success'
+    now = time.time()
+    if published:
+        status, next_attempt_at = 'published', None
+    elif attempts >= MAX_ATTEMPTS or result.get('status') == 'unsupported':
+        status, next_attempt_at = 'failed', None
+    else:
+        status, next_attempt_at = 'pending', now + _backoff(attempts)
+
+    post_status = dict(result)
+    if status == 'pending':
+        post_status.update({'status': 'retrying', 'attempts': attempts})
+
+    with get_db() as conn:
+        conn.execute('''
+            UPDATE social_outbox
+            SET status = ?, next_attempt_at = ?, last_error = ?, result = ?,
+                claimed_at = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (status, next_attempt_at, None if published else result.get('error'),
+              codec.encode(result), row_id))
+        # json_set touches only this platform's key, so concurrent workers
+        # publishing the same post to different platforms don't clobber each other
+        conn.execute('''
+            UPDATE posts
+            SET cross_platform_status = json_set(
+                COALESCE(cross_platform_status, '{}'), '$."' || ? || '"', json(?))
+            WHERE id = ?
+        ''', (platform, codec.encode(post_status), post_id))
+        conn.commit()
+    feed_cache.invalidate()
+
+    outcome = 'retried' if status == 'pending' else status
+    with _metrics_lock:
+        _completed.append((now, outcome))
+        _totals[outcome] += 1
+
+
+async def _publish(rows):
+    """Platform results for claimed rows, published concurrently, in row order"""
+    results = await asyncio.gather(*(
+        platforms.cross_platform_post_async(content, codec.decode(media_urls, []), [platform])
+        for _, _, platform, content, media_urls, _ in rows
+    ))
+    return [result[row[2]] for row, result in zip(rows, results)]
+
+
+def process_batch(limit=BATCH_SIZE):
+    """Claim and publish up to ``limit`` due rows; returns how many were handled"""
+    rows = _claim(limit)
+    if not rows:
+        return 0
+    for (row_id, post_id, platform, _, _, attempts), result in zip(rows, asyncio.run(_publish(rows))):
+        _finish(row_id, post_id, platform, attempts, result)
+    return len(rows)
+
+
+def _worker_loop():
+    while True:
+        try:
+            handled = process_batch()
+        except Exception:
+            handled = 0
+        if not handled:
+            with _wakeup:
+                _wakeup.wait(POLL_INTERVAL)
+
+
+def start_workers(count=WORKER_COUNT):
+    with _workers_lock:
+        while len(_workers) < count:
+            worker = threading.Thread(target=_worker_loop, name=f'outbox-worker-{len(_workers)}', daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+
+def post_status(post_id):
+    """Outbox rows for a post, one per platform"""
+    with get_db() as conn:
+        rows = conn.execute('''
+            SELECT platform, status, attempts, next_attempt_at, last_error, result, updated_at
+            FROM social_outbox
+            WHERE post_id = ?
+            ORDER BY id
+        ''', (post_id,)).fetchall()
+    return [{
+        'platform': row[0],
+        'status': row[1],
+        'attempts': row[2],
+        'next_attempt_at': row[3],
+        'last_error': row[4],
+        'result': codec.decode(row[5]),
+        'updated_at': row[6]
+    } for row in rows]
+
+
+def metrics():
+    """Queue depth by status plus drain rate over the last RATE_WINDOW seconds"""
+    with get_db() as conn:
+        depth = dict(conn.execute('''
+            SELECT status, COUNT(*) FROM social_outbox
+            WHERE status IN ('pending', 'in_progress')
+            GROUP BY status
+        ''').fetchall())
+        oldest = conn.execute('''
+            SELECT MIN(next_attempt_at) FROM social_outbox WHERE status = 'pending'
+        ''').fetchone()[0]
+
+    now = time.time()
+    with _metrics_lock:
+        while _completed and _completed[0][0] < now - RATE_WINDOW:
+            _completed.popleft()
+        window = collections.Counter(outcome for _, outcome in _completed)
+        totals = dict(_totals)
+
+    return {
+        'queue_depth': depth.get('pending', 0) + depth.get('in_progress', 0),
+        'pending': depth.get('pending', 0),
+        'in_progress': depth.get('in_progress', 0),
+        'oldest_due_age_seconds': round(max(0.0, now - oldest), 3) if oldest else 0,
+        'drain_rate_per_second': round((window['published'] + window['failed']) / RATE_WINDOW, 3),
+        'window_seconds': RATE_WINDOW,
+        'window': dict(window),
+        'totals': totals,
+        'workers': len(_workers)
+    }
@@ -0,0 +1,158 @@
+"""Social platform adapters and the concurrent cross-posting fan-out.
+
+Adapters are registered by name with ``register_platform`` and called as
+``adapter(content, media_urls)``. ``cross_platform_post`` dispatches to every
+selected platform at once on a shared thread pool, so a cross-post takes about
+as long as the slowest platform rather than the sum of all of them.
+
+Adapters may be plain functions or ``async def`` coroutines. Async callers,
+such as the outbox publishing a claimed batch, use
+``await cross_platform_post_async(...)``, which awaits coroutine adapters
+on the caller's event loop and runs blocking ones on the fan-out pool; the
+synchronous ``cross_platform_post`` runs coroutine adapters to completion in
+a pool thread.
+"""
+import asyncio
+import inspect
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+DEFAULT_PLATFORMS = ['twitter', 'instagram', 'facebook', 'youtube']
+DEFAULT_TIMEOUT = float(os.getenv('PLATFORM_POST_TIMEOUT', 5))
+FANOUT_WORKERS = int(os.getenv('PLATFORM_FANOUT_WORKERS', 16))
+
+# name -> {'post': callable, 'timeout': seconds}
+PLATFORM_ADAPTERS = {}
+
+_executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix='platform-fanout')
+
+
+def register_platform(name, adapter=None, timeout=None):
+    """Register an adapter for a platform, directly or as a decorator"""
+    def register(func):
+        PLATFORM_ADAPTERS[name] = {'post': func, 'timeout': timeout or DEFAULT_TIMEOUT}
+        return func
+    if adapter is not None:
+        return register(adapter)
+    return register
+
+
+def _call_adapter(func, content, media_urls):
+    result = func(content, media_urls)
+    if inspect.isawaitable(result):
+        return asyncio.run(result)
+    return result
+
+
+def unregister_platform(name):
+    PLATFORM_ADAPTERS.pop(name, None)
+
+
+@register_platform('twitter')
+def post_to_twitter(content, media_urls=None):
+    """Post content to Twitter (placeholder for API integration)"""
+    # Would integrate with Twitter API v2
+    post_id = f"tw_{uuid.uuid4()}"
+    return {"status": "success", "platform": "twitter", "post_id": post_id,
+            "url": f"https://twitter.com/user/status/{post_id}"}
+
+
+@register_platform('instagram')
+def post_to_instagram(content, media_urls=None):
+    """Post content to Instagram (placeholder for API integration)"""
+    # Would integrate with Instagram Basic Display API
+    post_id = f"ig_{uuid.uuid4()}"
+    return {"status": "success", "platform": "instagram", "post_id": post_id,
+            "url": f"https://instagram.com/p/{post_id}"}
+
+
+@register_platform('facebook')
+def post_to_facebook(content, media_urls=None):
+    """Post content to Facebook (placeholder for API integration)"""
+    # Would integrate with Facebook Graph API
+    post_id = f"fb_{uuid.uuid4()}"
+    return {"status": "success", "platform": "facebook", "post_id": post_id,
+            "url": f"https://facebook.com/posts/{post_id}"}
+
+
+@register_platform('youtube')
+def post_to_youtube(content, media_urls=None):
+    """Post content to YouTube (placeholder for API integration)"""
+    # Would integrate with YouTube Data API for community posts
+    post_id = f"yt_{uuid.uuid4()}"
+    return {"status": "success", "platform": "youtube", "post_id": post_id,
+            "url": f"https://youtube.com/post/{post_id}"}
+
+
+@register_platform('linkedin')
+def post_to_linkedin(content, media_urls=None):
+    """Post content to LinkedIn (placeholder for API integration)"""
+    # Would integrate with LinkedIn API
+    post_id = f"li_{uuid.uuid4()}"
+    return {"status": "success", "platform": "linkedin", "post_id": post_id,
+            "url": f"https://linkedin.com/posts/{post_id}"}
+
+
+def cross_platform_post(content, media_urls=None, platforms=None, timeout=None):
+    """Post to multiple social media platforms concurrently.
+
+    Every platform gets a result entry: the adapter's own result, or a
+    ``timeout``/``error``/``unsupported`` status, so one slow or failing
+    platform never hides the others. ``timeout`` overrides the per-platform
+    timeouts. An adapter that times out keeps running in the background; its
+    late result is discarded.
+    """
+    if platforms is None:
+        platforms = DEFAULT_PLATFORMS
+
+    started = time.monotonic()
+    futures = {}
+    results = {}
+    for name in platforms:
+        adapter = PLATFORM_ADAPTERS.get(name)
+        if adapter is None:
+            results[name] = {'status': 'unsupported', 'platform': name}
+            continue
+        futures[name] = (_executor.submit(_call_adapter, adapter['post'], content, media_urls),
+                         timeout or adapter['timeout'])
+
+    for name, (future, limit) in futures.items():
+        remaining = max(0.0, started + limit - time.monotonic())
+        try:
+            results[name] = future.result(timeout=remaining)
+        except TimeoutError:
+            future.cancel()
+            results[name] = {'status': 'timeout', 'platform': name,
+                             'error': f'No response within {limit}s'}
+        except Exception as e:
+            results[name] = {'status': 'error', 'platform': name, 'error': str(e)}
+
+    return {name: results[name] for name in platforms}
+
+
+async def cross_platform_post_async(content, media_urls=None, platforms=None, timeout=None):
+    """Awaitable ``cross_platform_post``: same results, without blocking the event loop"""
+    if platforms is None:
+        platforms = DEFAULT_PLATFORMS
+    loop = asyncio.get_running_loop()
+
+    async def post(name):
+        adapter = PLATFORM_ADAPTERS.get(name)
+        if adapter is None:
+            return {'status': 'unsupported', 'platform': name}
+        limit = timeout or adapter['timeout']
+        if inspect.iscoroutinefunction(adapter['post']):
+            pending = adapter['post'](content, media_urls)
+        else:
+            pending = loop.run_in_executor(_executor, _call_adapter, adapter['post'], content, media_urls)
+        try:
+            return await asyncio.wait_for(pending, limit)
+        except asyncio.TimeoutError:
+            return {'status': 'timeout', 'platform': name, 'error': f'No response within {limit}s'}
+        except Exception as e:
+            return {'status': 'error', 'platform': name, 'error': str(e)}
+
+    results = await asyncio.gather(*(post(name) for name in platforms))
+    return dict(zip(platforms, results))
@@ -0,0 +1,227 @@
+"""Per-request timing middleware, Prometheus metrics and sampled profiling.
+
+``install(app)`` starts a RequestClock (timing.py) for every request. The
+pooled connections, ``codec.decode`` and the app's JSON provider charge their
+time to it, so each request is broken down into:
+
+    connect    waiting for / opening a pooled connection
+    db         executing statements and fetching rows
+    decode     parsing JSON columns
+    serialize  building JSON response bodies
+    compress   gzip/brotli-encoding them (compression.py)
+    total      before_request to after_request
+
+The breakdown is sent back in a ``Server-Timing`` header and accumulated per
+route into histograms served as Prometheus text by /api/system/metrics.
+Bodies of streamed responses are produced after the request ends and are not
+counted.
+
+With PROFILE_SAMPLE_RATE > 0 that fraction of requests also runs under
+cProfile; a sampled request slower than PROFILE_THRESHOLD_MS has its stats
+written to PROFILE_DIR as a .prof file (open with ``python -m pstats`` or
+snakeviz). Set REQUEST_TIMING=0 to turn the middleware off.
+"""
+import bisect
+import collections
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+
+from flask import g, request
+from flask.json.provider import DefaultJSONProvider
+
+import timing
+
+ENABLED = os.getenv('REQUEST_TIMING', '1') != '0'
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))  # fraction of requests run under cProfile
+PROFILE_THRESHOLD_MS = float(os.getenv('PROFILE_THRESHOLD_MS', 500))  # sampled requests slower than this are dumped
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+
+# Upper bounds (seconds) of the histogram buckets
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _labels(**labels):
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+class RouteMetrics:
+    """Request counts and per-phase latency histograms keyed by route and method"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (route, method, phase) -> [per-bucket counts..., +Inf count, sum]
+        self._histograms = {}
+        self._requests = collections.Counter()  # (route, method, status)
+        self._queries = collections.Counter()  # (route, method)
+        self.profiles_dumped = 0
+
+    def observe(self, route, method, status, total, clock):
+        with self._lock:
+            self._requests[(route, method, status)] += 1
+            self._queries[(route, method)] += clock.queries
+            self._observe((route, method, 'total'), total)
+            for phase, seconds in clock.phases.items():
+                self._observe((route, method, phase), seconds)
+
+    def _observe(self, key, seconds):
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        histogram[bisect.bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+
+    def profile_dumped(self):
+        with self._lock:
+            self.profiles_dumped += 1
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+            requests = dict(self._requests)
+            queries = dict(self._queries)
+            profiles_dumped = self.profiles_dumped
+
+        lines = [
+            '# HELP http_requests_total Requests handled, by route, method and status.',
+            '# TYPE http_requests_total counter',
+        ]
+        for (route, method, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{_labels(route=route, method=method, status=status)} {count}')
+
+        lines += [
+            '# HELP http_request_db_queries_total SQL statements executed, by route and method.',
+            '# TYPE http_request_db_queries_total counter',
+        ]
+        for (route, method), count in sorted(queries.items()):
+            lines.append(f'http_request_db_queries_total{_labels(route=route, method=method)} {count}')
+
+        for metric, help_text, wanted in (
+            ('http_request_duration_seconds', 'Total request time.', lambda phase: phase == 'total'),
+            ('http_request_phase_seconds', 'Request time spent per phase (connect, db, decode, serialize, compress).',
+             lambda phase: phase != 'total'),
+        ):
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+            for (route, method, phase), histogram in sorted(histograms.items()):
+                if not wanted(phase):
+                    continue
+                labels = {'route': route, 'method': method}
+                if phase != 'total':
+                    labels['phase'] = phase
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), histogram):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{_labels(**labels, le=bound)} {cumulative}')
+                lines.append(f'{metric}_sum{_labels(**labels)} {histogram[-1]:.6f}')
+                lines.append(f'{metric}_count{_labels(**labels)} {cumulative}')
+
+        lines += [
+            '# HELP request_profiles_dumped_total Sampled requests whose cProfile stats were written.',
+            '# TYPE request_profiles_dumped_total counter',
+            f'request_profiles_dumped_total {profiles_dumped}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+metrics = RouteMetrics()
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Charges jsonify() to the request's serialize phase"""
+
+    def response(self, *args, **kwargs):
+        clock = timing.current.get()
+        if clock is None:
+            return super().response(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            clock.add('serialize', time.perf_counter() - started)
+
+
+def _route():
+    # The URL rule, not the path, so /api/posts/<int:post_id>/like is one series
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def _start():
+    g.request_clock = clock = timing.RequestClock()
+    g.request_clock_token = timing.current.set(clock)
+    g.request_total = None
+    g.request_profiler = None
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this interpreter
+            return
+        g.request_profiler = profiler
+
+
+def _finish(response):
+    clock = g.get('request_clock')
+    if clock is None:
+        return response
+    g.request_total = total = clock.elapsed()
+    g.request_status = response.status_code
+    profiler = g.get('request_profiler')
+    if profiler is not None:
+        profiler.disable()
+        if total * 1000 >= PROFILE_THRESHOLD_MS:
+            _dump(profiler, total)
+
+    response.headers['Server-Timing'] = ', '.join(
+        [f'{phase};dur={seconds * 1000:.3f}' for phase, seconds in clock.phases.items()]
+        + [f'total;dur={total * 1000:.3f}']
+    )
+    return response
+
+
+def _teardown(exc):
+    clock = g.get('request_clock')
+    if clock is None:
+        return
+    total = g.get('request_total')
+    if total is None:
+        # after_request never ran: the view raised
+        total = clock.elapsed()
+        profiler = g.get('request_profiler')
+        if profiler is not None:
+            profiler.disable()
+        status = 500
+    else:
+        status = g.get('request_status', 500)
+    metrics.observe(_route(), request.method, status, total, clock)
+    timing.current.reset(g.pop('request_clock_token'))
+    g.pop('request_clock')
+
+
+def _dump(profiler, total):
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', _route()).strip('_') or 'root'
+    name = f'{time.time() * 1000:.0f}-{request.method}-{slug}-{total * 1000:.0f}ms.prof'
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+    metrics.profile_dumped()
+
+
+def install(app):
+    """Register the timing hooks and the timed JSON provider on ``app``"""
+    if not ENABLED:
+        return
+    app.json = TimedJSONProvider(app)
+    app.before_request(_start)
+    app.after_request(_finish)
+    app.teardown_request(_teardown)
@@ -0,0 +1,169 @@
+"""Full-text search over posts and feedback using SQLite FTS5.
+
+``posts_fts`` and ``feedback_fts`` are external-content FTS5 tables indexing
+``posts.content`` and ``feedback.content``; triggers keep them in sync with
+every insert, update and delete. Results are ranked by bm25 and paged with an
+opaque (score, id) cursor.
+"""
+import base64
+import json
+import re
+
+# name -> source table indexed by the FTS table
+FTS_TABLES = {
+    'posts_fts': 'posts',
+    'feedback_fts': 'feedback',
+}
+
+SNIPPET_TOKENS = 16
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def install(cursor):
+    """Create the FTS tables and sync triggers, backfilling on first install"""
+    for fts_table, source in FTS_TABLES.items():
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,))
+        exists = cursor.fetchone() is not None
+
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+                content,
+                content='{source}',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{source}_fts_insert AFTER INSERT ON {source}
+            BEGIN
+                INSERT INTO {fts_table} (rowid, content) VALUES (new.id, new.content);
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{source}_fts_delete AFTER DELETE ON {source}
+            BEGIN
+                INSERT INTO {fts_table} ({fts_table}, rowid, content) VALUES ('delete', old.id, old.content);
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{source}_fts_update AFTER UPDATE OF content ON {source}
+            BEGIN
+                INSERT INTO {fts_table} ({fts_table}, rowid, content) VALUES ('delete', old.id, old.content);
+                INSERT INTO {fts_table} (rowid, content) VALUES (new.id, new.content);
+            END
+        ''')
+
+        if not exists:
+            cursor.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+
+def build_match_query(text):
+    """Turn free text into a safe FTS5 query: every word must match, the last as a prefix"""
+    tokens = _TOKEN.findall(text or '')
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def encode_cursor(score, row_id):
+    raw = json.dumps([score, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        score, row_id = json.loads(raw)
+        return float(score), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+
+def _ranked(fts_table, limit, after):
+    """Ranked matches as (id, score), best first, after the cursor position"""
+    where = 'WHERE (score, id) > (?, ?)' if after else ''
+    return f'''
+        SELECT id, score FROM (
+            SELECT rowid AS id, bm25({fts_table}) AS score
+            FROM {fts_table}
+            WHERE {fts_table} MATCH ?
+        )
+        {where}
+        ORDER BY score, id
+        LIMIT {int(limit) + 1}
+    '''
+
+
+def _snippets(cursor, fts_table, match_query, ids):
+    """Highlighted snippets for one page of ids.
+
+    Kept out of the ranking query so snippet() runs only for the rows on the
+    page rather than for every match.
+    """
+    if not ids:
+        return {}
+    placeholders = ','.join('?' * len(ids))
+    cursor.execute(f'''
+        SELECT rowid, snippet({fts_table}, 0, '<mark>', '</mark>', '…', {SNIPPET_TOKENS})
+        FROM {fts_table}
+        WHERE {fts_table} MATCH ? AND rowid IN ({placeholders})
+    ''', [match_query] + list(ids))
+    return dict(cursor.fetchall())
+
+
+def _page(rows, limit):
+    """Split limit+1 rows into the page and the cursor for the next one"""
+    next_cursor = encode_cursor(rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def search_posts(cursor, match_query, limit, after=None):
+    """Returns (results, next_cursor)"""
+    params = [match_query] + (list(after) if after else [])
+    cursor.execute(f'''
+        SELECT m.id, m.score, p.content, p.post_type, p.likes_count,
+               p.created_at, u.username, u.avatar_url, u.wallet_address
+        FROM ({_ranked('posts_fts', limit, after)}) m
+        JOIN posts p ON p.id = m.id
+        LEFT JOIN users u ON u.id = p.user_id
+        ORDER BY m.score, m.id
+    ''', params)
+    rows, next_cursor = _page(cursor.fetchall(), limit)
+    snippets = _snippets(cursor, 'posts_fts', match_query, [row[0] for row in rows])
+    return [{
+        'id': row[0],
+        'score': round(-row[1], 6),
+        'snippet': snippets.get(row[0]),
+        'content': row[2],
+        'post_type': row[3],
+        'likes_count': row[4],
+        'created_at': row[5],
+        'username': row[6],
+        'avatar_url': row[7],
+        'wallet_address': row[8]
+    } for row in rows], next_cursor
+
+
+def search_feedback(cursor, match_query, limit, after=None):
+    """Returns (results, next_cursor)"""
+    params = [match_query] + (list(after) if after else [])
+    cursor.execute(f'''
+        SELECT m.id, m.score, f.content, f.category, f.upvotes, f.downvotes, f.created_at
+        FROM ({_ranked('feedback_fts', limit, after)}) m
+        JOIN feedback f ON f.id = m.id
+        ORDER BY m.score, m.id
+    ''', params)
+    rows, next_cursor = _page(cursor.fetchall(), limit)
+    snippets = _snippets(cursor, 'feedback_fts', match_query, [row[0] for row in rows])
+    return [{
+        'id': row[0],
+        'score': round(-row[1], 6),
+        'snippet': snippets.get(row[0]),
+        'content': row[2],
+        'category': row[3],
+        'upvotes': row[4],
+        'downvotes': row[5],
+        'created_at': row[6]
+    } for row in rows], next_cursor
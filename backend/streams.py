@@ -0,0 +1,392 @@
+"""In-process publish/subscribe behind the Server-Sent Events endpoints.
+
+A Broadcaster fans every published event out to its subscribers. The event
+is encoded as an SSE frame once, however many clients there are, and each
+subscriber gets the same bytes appended to its own bounded buffer. A client
+that stops reading lets its buffer fill up; at BUFFER_SIZE frames it is
+evicted (its stream ends) instead of making the publisher wait or grow memory
+without bound. EventSource clients reconnect on their own and resume.
+
+Resume: every frame carries an ``id:`` and the last STREAM_REPLAY_SIZE frames
+are kept, so a reconnect sending ``Last-Event-ID`` is replayed from memory.
+When the id is older than that (or the process restarted), the stream's
+``load_since`` callback reads the missed events from the database; if more
+than RESUME_LIMIT were missed the client gets a ``reset`` event and should
+refetch the feed instead. Ids must be published in increasing order, or a
+client that saw a later id first would resume past the earlier one, so
+writers whose ids come from the database hold ``ordered()`` across their
+commit and publish.
+
+Subscribers are served either by a thread (``stream``, for the Flask route)
+or by an asyncio task (``stream_async``, for the ASGI route), where an idle
+subscriber costs one suspended task and a heartbeat every HEARTBEAT_SECONDS.
+Publishing wakes async subscribers with one loop callback per event loop,
+not one per subscriber.
+
+SnapshotChannels serves state that changes in bursts, such as live poll
+tallies: writers only mark a key as changed, and a flusher thread reloads the
+changed keys and pushes one snapshot per key at most STREAM_SNAPSHOT_RATE
+times a second, however many writes or subscribers there are. A new
+subscriber starts from a snapshot, so these streams need no resume.
+
+Each process has its own broadcasters: with several server processes, live
+events reach the subscribers of the process that created them, and the others
+pick them up on their next resume.
+"""
+import asyncio
+import collections
+import os
+import threading
+import time
+
+import codec
+import db
+
+BUFFER_SIZE = int(os.getenv('STREAM_BUFFER_SIZE', 256))  # unsent frames per subscriber before eviction
+REPLAY_SIZE = int(os.getenv('STREAM_REPLAY_SIZE', 1024))  # recent frames kept for Last-Event-ID resume
+RESUME_LIMIT = int(os.getenv('STREAM_RESUME_LIMIT', 200))  # missed events read back from the database
+HEARTBEAT_SECONDS = float(os.getenv('STREAM_HEARTBEAT', 15))
+SNAPSHOT_RATE = float(os.getenv('STREAM_SNAPSHOT_RATE', 4))  # pushes per second per key on snapshot channels
+RETRY_MS = 3000  # reconnect delay suggested to EventSource clients
+
+HEARTBEAT = b': keepalive\n\n'
+
+
+def encode_event(event_id, event, data):
+    prefix = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{prefix}event: {event}\ndata: {codec.encode(data)}\n\n'.encode()
+
+
+def parse_last_event_id(header, query=None):
+    """Event id to resume after, from the Last-Event-ID header or ?last_event_id=; None for a fresh stream"""
+    value = header or query
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError('Invalid Last-Event-ID')
+
+
+class Subscription:
+    """One client's pending frames, woken by a thread Event or an asyncio Event"""
+
+    def __init__(self, maxsize, loop=None):
+        self.maxsize = maxsize
+        self.loop = loop
+        self.frames = collections.deque()
+        self.evicted = False
+        self._ready = asyncio.Event() if loop is not None else threading.Event()
+
+    def push(self, event_id, frame):
+        """Queue a frame; returns False when this pushes the subscriber over its limit"""
+        if len(self.frames) >= self.maxsize:
+            self.evicted = True
+            self.frames.clear()
+            return False
+        self.frames.append((event_id, frame))
+        return True
+
+    def drain(self):
+        frames = []
+        while self.frames:
+            frames.append(self.frames.popleft())
+        return frames
+
+    def wake(self):
+        self._ready.set()
+
+    def wait(self, timeout):
+        self._ready.wait(timeout)
+        self._ready.clear()
+        return self.drain()
+
+    async def wait_async(self, timeout):
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._ready.clear()
+        return self.drain()
+
+
+def _wake_all(subscriptions):
+    for subscription in subscriptions:
+        subscription.wake()
+
+
+class Broadcaster:
+    """One event channel: publish from any thread, stream to threads or asyncio tasks"""
+
+    def __init__(self, buffer_size=BUFFER_SIZE, replay_size=REPLAY_SIZE):
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._order = threading.Lock()
+        self._subscribers = set()
+        self._recent = collections.deque(maxlen=replay_size)
+        self.published = 0
+        self.evictions = 0
+
+    def subscribe(self, loop=None):
+        subscription = Subscription(self.buffer_size, loop)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def ordered(self):
+        """Lock to hold from before a writer's commit until its publish returns.
+
+        SQLite allocates ids in commit order, since one writer holds the
+        write lock from its insert to its commit. Holding this across the
+        commit means the next writer can only publish after this one has.
+        """
+        return self._order
+
+    def publish(self, event_id, event, data):
+        frame = encode_event(event_id, event, data)
+        loops = collections.defaultdict(list)
+        with self._lock:
+            self.published += 1
+            self._recent.append((event_id, frame))
+            for subscription in list(self._subscribers):
+                if not subscription.push(event_id, frame):
+                    self._subscribers.discard(subscription)
+                    self.evictions += 1
+                if subscription.loop is None:
+                    subscription.wake()
+                else:
+                    loops[subscription.loop].append(subscription)
+        for loop, subscriptions in loops.items():
+            try:
+                loop.call_soon_threadsafe(_wake_all, subscriptions)
+            except RuntimeError:
+                # Loop already closed; its subscribers are gone with it
+                with self._lock:
+                    self._subscribers.difference_update(subscriptions)
+
+    def _replay(self, after_id):
+        """Recent frames after ``after_id``, or None when they no longer reach back that far"""
+        with self._lock:
+            recent = list(self._recent)
+        if not recent or after_id < recent[0][0]:
+            return None
+        return [(event_id, frame) for event_id, frame in recent if event_id > after_id]
+
+    def _resume_frames(self, after_id, loaded):
+        if len(loaded) > RESUME_LIMIT:
+            return [(None, encode_event(None, 'reset', {'reason': 'too many missed events, refetch'}))]
+        return self._snapshot_frames(loaded)
+
+    def _snapshot_frames(self, events):
+        return [(event_id, encode_event(event_id, event, data)) for event_id, event, data in events]
+
+    def stream(self, last_event_id, load_since, snapshot=None):
+        """SSE byte chunks for a thread-served client.
+
+        ``load_since(after_id, limit)`` returns [(event_id, event, data), ...]
+        for events missed beyond the replay buffer; ``snapshot()``, if given,
+        returns the events a fresh client starts from.
+        """
+        subscription = self.subscribe()
+        try:
+            yield f'retry: {RETRY_MS}\n\n'.encode()
+            sent = set()
+            if last_event_id is not None:
+                missed = self._replay(last_event_id)
+                if missed is None:
+                    missed = self._resume_frames(last_event_id, load_since(last_event_id, RESUME_LIMIT + 1))
+            elif snapshot is not None:
+                missed = self._snapshot_frames(snapshot())
+            else:
+                missed = []
+            for event_id, frame in missed:
+                if event_id is not None:
+                    sent.add(event_id)
+                yield frame
+            while True:
+                frames = subscription.wait(HEARTBEAT_SECONDS)
+                if subscription.evicted:
+                    break
+                chunk = b''.join(frame for event_id, frame in frames if event_id not in sent)
+                sent.clear()
+                yield chunk or HEARTBEAT
+        finally:
+            self.unsubscribe(subscription)
+
+    async def stream_async(self, last_event_id, load_since, snapshot=None):
+        """SSE byte chunks for an asyncio-served client; ``load_since`` and ``snapshot`` are awaited"""
+        subscription = self.subscribe(asyncio.get_running_loop())
+        try:
+            yield f'retry: {RETRY_MS}\n\n'.encode()
+            sent = set()
+            if last_event_id is not None:
+                missed = self._replay(last_event_id)
+                if missed is None:
+                    missed = self._resume_frames(last_event_id, await load_since(last_event_id, RESUME_LIMIT + 1))
+            elif snapshot is not None:
+                missed = self._snapshot_frames(await snapshot())
+            else:
+                missed = []
+            for event_id, frame in missed:
+                if event_id is not None:
+                    sent.add(event_id)
+                yield frame
+            while True:
+                frames = await subscription.wait_async(HEARTBEAT_SECONDS)
+                if subscription.evicted:
+                    break
+                chunk = b''.join(frame for event_id, frame in frames if event_id not in sent)
+                sent.clear()
+                yield chunk or HEARTBEAT
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self.published,
+                'evictions': self.evictions,
+                'replay_buffered': len(self._recent),
+                'buffer_size': self.buffer_size,
+            }
+
+
+class SnapshotChannels:
+    """One broadcaster per watched key, pushing coalesced snapshots of its state.
+
+    ``load(conn, keys)`` returns {key: data} for the given keys. ``changed``
+    is cheap enough to call on every write: keys nobody watches are ignored,
+    and watched ones are only marked dirty. The flusher publishes a dirty key
+    at once if it was last pushed over 1/rate seconds ago, else when that
+    interval is up, with one ``load`` call for all keys due together.
+    """
+
+    def __init__(self, event, load, rate=SNAPSHOT_RATE, buffer_size=BUFFER_SIZE):
+        self.event = event
+        self.load = load
+        self.interval = 1.0 / rate
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._channels = {}  # key -> [Broadcaster, streams open on it]
+        self._dirty = set()
+        self._last = {}  # key -> monotonic time of its last push
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.changes = 0
+        self.pushes = 0
+
+    def changed(self, *keys):
+        with self._lock:
+            watched = [key for key in keys if key in self._channels]
+            if not watched:
+                return
+            self._dirty.update(watched)
+            self.changes += len(watched)
+        self._start()
+        self._wakeup.set()
+
+    def _acquire(self, key):
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = self._channels[key] = [Broadcaster(self.buffer_size, replay_size=0), 0]
+            channel[1] += 1
+            return channel[0]
+
+    def _release(self, key):
+        with self._lock:
+            channel = self._channels[key]
+            channel[1] -= 1
+            if channel[1] == 0:
+                del self._channels[key]
+                self._dirty.discard(key)
+                self._last.pop(key, None)
+
+    def _snapshot(self, conn, key):
+        return [(None, self.event, self.load(conn, [key])[key])]
+
+    def stream(self, key):
+        """SSE byte chunks for a thread-served client, starting from the current snapshot"""
+        broadcaster = self._acquire(key)
+        try:
+            def snapshot():
+                with db.get_db() as conn:
+                    return self._snapshot(conn, key)
+            yield from broadcaster.stream(None, None, snapshot)
+        finally:
+            self._release(key)
+
+    async def stream_async(self, key):
+        """SSE byte chunks for an asyncio-served client, starting from the current snapshot"""
+        broadcaster = self._acquire(key)
+        chunks = broadcaster.stream_async(None, None, lambda: db.run_async(self._snapshot, key))
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+            self._release(key)
+
+    def flush(self):
+        """Push every dirty key that is due; returns seconds until the next one is, or None"""
+        now = time.monotonic()
+        with self._lock:
+            due = [key for key in self._dirty if now - self._last.get(key, -self.interval) >= self.interval]
+            self._dirty.difference_update(due)
+            wait = min((self._last[key] + self.interval - now for key in self._dirty), default=None)
+            for key in due:
+                self._last[key] = now
+        if not due:
+            return wait
+        try:
+            with db.get_db() as conn:
+                snapshots = self.load(conn, due)
+        except Exception:
+            # Keep the keys queued; the flusher retries them after one interval
+            with self._lock:
+                self._dirty.update(key for key in due if key in self._channels)
+            raise
+        with self._lock:
+            broadcasters = {key: self._channels[key][0] for key in due if key in self._channels}
+            self.pushes += len(broadcasters)
+        for key, broadcaster in broadcasters.items():
+            broadcaster.publish(None, self.event, snapshots[key])
+        return wait
+
+    def _run(self):
+        wait = None
+        while True:
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+            try:
+                wait = self.flush()
+            except Exception:
+                wait = self.interval
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=f'{self.event}-snapshots', daemon=True)
+            self._thread.start()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'watched_keys': len(self._channels),
+                'subscribers': sum(refs for _, refs in self._channels.values()),
+                'dirty_keys': len(self._dirty),
+                'changes': self.changes,
+                'pushes': self.pushes,
+                'max_pushes_per_second': round(1.0 / self.interval, 3),
+            }
+
+
+posts = Broadcaster()
@@ -0,0 +1,236 @@
+"""NFT ticket purchase engine.
+
+Every purchase runs in a ``BEGIN IMMEDIATE`` transaction and only records a
+transaction when the supply decrement actually matched a row, so a drop can
+never oversell. Buyers may first take a short-lived reservation that holds one
+ticket; reservations that are not completed in time are expired and their
+tickets returned to supply, by the next purchase or reservation for the event
+and by ``expire_lapsed`` before availability is read.
+
+In front of SQLite sits a per-event admission gate: it caps concurrent
+purchase attempts per event and remembers sold-out events for a moment, so
+excess load during a drop is shed in memory instead of queueing on the
+database write lock. An event whose last tickets are only held is not sold
+out: buyers get a retryable 429 until the holds complete or lapse, and
+nothing is memoized.
+"""
+import collections
+import os
+import threading
+import time
+import uuid
+
+RESERVATION_SECONDS = float(os.getenv('TICKET_RESERVATION_SECONDS', 120))
+ADMISSION_LIMIT = int(os.getenv('TICKET_ADMISSION_LIMIT', 64))
+SOLD_OUT_TTL = float(os.getenv('TICKET_SOLD_OUT_TTL', 1))
+
+
+class PurchaseError(Exception):
+    """A purchase that was refused; ``status`` is the HTTP status to return"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class AdmissionGate:
+    """Per-event cap on in-flight purchase attempts plus a sold-out memo"""
+
+    def __init__(self, limit=ADMISSION_LIMIT, sold_out_ttl=SOLD_OUT_TTL):
+        self.limit = limit
+        self.sold_out_ttl = sold_out_ttl
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._sold_out_until = {}
+        self.admitted = 0
+        self.shed_busy = 0
+        self.shed_sold_out = 0
+
+    def enter(self, event_id):
+        with self._lock:
+            if self._sold_out_until.get(event_id, 0) > time.monotonic():
+                self.shed_sold_out += 1
+                raise PurchaseError('Sold out', 409)
+            if self._in_flight.get(event_id, 0) >= self.limit:
+                self.shed_busy += 1
+                raise PurchaseError('Too many concurrent purchases for this event, retry shortly', 429)
+            self._in_flight[event_id] = self._in_flight.get(event_id, 0) + 1
+            self.admitted += 1
+
+    def leave(self, event_id):
+        with self._lock:
+            remaining = self._in_flight.get(event_id, 1) - 1
+            if remaining:
+                self._in_flight[event_id] = remaining
+            else:
+                self._in_flight.pop(event_id, None)
+
+    def mark_sold_out(self, event_id):
+        with self._lock:
+            self._sold_out_until[event_id] = time.monotonic() + self.sold_out_ttl
+
+    def mark_available(self, event_id):
+        with self._lock:
+            self._sold_out_until.pop(event_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'admission_limit': self.limit,
+                'in_flight': dict(self._in_flight),
+                'admitted': self.admitted,
+                'shed_busy': self.shed_busy,
+                'shed_sold_out': self.shed_sold_out,
+            }
+
+
+gate = AdmissionGate()
+
+
+def _expire_reservations(cursor, event_id, now):
+    """Return tickets held by lapsed reservations to supply"""
+    cursor.execute('''
+        UPDATE ticket_reservations SET status = 'expired'
+        WHERE event_id = ? AND status = 'held' AND expires_at <= ?
+    ''', (event_id, now))
+    if cursor.rowcount:
+        cursor.execute('''
+            UPDATE nft_tickets SET remaining_supply = remaining_supply + ?
+            WHERE id = ?
+        ''', (cursor.rowcount, event_id))
+        gate.mark_available(event_id)
+
+
+def expire_lapsed(conn):
+    """Return the tickets of every lapsed hold to supply; returns how many were returned"""
+    now = time.time()
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM ticket_reservations WHERE status = 'held' AND expires_at <= ? LIMIT 1", (now,))
+    if cursor.fetchone() is None:
+        return 0
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        cursor.execute('''
+            UPDATE ticket_reservations SET status = 'expired'
+            WHERE status = 'held' AND expires_at <= ?
+            RETURNING event_id
+        ''', (now,))
+        lapsed = collections.Counter(row[0] for row in cursor.fetchall())
+        cursor.executemany('UPDATE nft_tickets SET remaining_supply = remaining_supply + ? WHERE id = ?',
+                           [(count, event_id) for event_id, count in lapsed.items()])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    for event_id in lapsed:
+        gate.mark_available(event_id)
+    return sum(lapsed.values())
+
+
+def _take_ticket(cursor, event_id):
+    cursor.execute('''
+        UPDATE nft_tickets
+        SET remaining_supply = remaining_supply - 1
+        WHERE id = ? AND remaining_supply > 0
+    ''', (event_id,))
+    if cursor.rowcount == 1:
+        return
+    cursor.execute('SELECT 1 FROM nft_tickets WHERE id = ?', (event_id,))
+    if cursor.fetchone() is None:
+        raise PurchaseError('Event not found', 404)
+    cursor.execute("SELECT 1 FROM ticket_reservations WHERE event_id = ? AND status = 'held' LIMIT 1", (event_id,))
+    if cursor.fetchone() is not None:
+        # Held tickets come back if their reservations lapse, so this is not sold out yet
+        raise PurchaseError('Remaining tickets are reserved, retry shortly', 429)
+    gate.mark_sold_out(event_id)
+    raise PurchaseError('Sold out', 409)
+
+
+def _record_purchase(cursor, buyer_wallet, event_id, amount_paid, transaction_hash):
+    cursor.execute('''
+        INSERT INTO transactions (from_wallet, to_wallet, amount, transaction_hash, transaction_type, related_post_id, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        buyer_wallet,
+        'platform_wallet',  # Platform or event creator wallet
+        amount_paid,
+        transaction_hash,
+        'nft_purchase',
+        event_id,
+        'confirmed'
+    ))
+    return cursor.lastrowid
+
+
+def reserve(conn, event_id, buyer_wallet, hold_seconds=RESERVATION_SECONDS):
+    """Hold one ticket for ``hold_seconds``; returns (reservation_id, expires_at)"""
+    gate.enter(event_id)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        now = time.time()
+        _expire_reservations(cursor, event_id, now)
+        _take_ticket(cursor, event_id)
+        reservation_id = uuid.uuid4().hex
+        expires_at = now + hold_seconds
+        cursor.execute('''
+            INSERT INTO ticket_reservations (id, event_id, buyer_wallet, status, expires_at)
+            VALUES (?, ?, ?, 'held', ?)
+        ''', (reservation_id, event_id, buyer_wallet, expires_at))
+        conn.commit()
+        return reservation_id, expires_at
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        gate.leave(event_id)
+
+
+def purchase(conn, event_id, buyer_wallet, amount_paid, transaction_hash, reservation_id=None):
+    """Buy one ticket, completing a reservation if one is given; returns the transaction id"""
+    gate_event = None if reservation_id else event_id
+    if gate_event is not None:
+        # Reserved tickets are already held, so completing one bypasses the gate
+        gate.enter(gate_event)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        now = time.time()
+        if reservation_id:
+            cursor.execute('''
+                UPDATE ticket_reservations SET status = 'completed'
+                WHERE id = ? AND event_id = ? AND buyer_wallet = ? AND status = 'held' AND expires_at > ?
+            ''', (reservation_id, event_id, buyer_wallet, now))
+            if cursor.rowcount != 1:
+                raise PurchaseError('Reservation not found or expired', 410)
+        else:
+            _expire_reservations(cursor, event_id, now)
+            _take_ticket(cursor, event_id)
+        transaction_id = _record_purchase(cursor, buyer_wallet, event_id, amount_paid, transaction_hash)
+        conn.commit()
+        return transaction_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if gate_event is not None:
+            gate.leave(gate_event)
+
+
+def release_reservation(conn, reservation_id, buyer_wallet):
+    """Give a held ticket back before its reservation expires"""
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    cursor.execute('''
+        UPDATE ticket_reservations SET status = 'released'
+        WHERE id = ? AND buyer_wallet = ? AND status = 'held'
+        RETURNING event_id
+    ''', (reservation_id, buyer_wallet))
+    row = cursor.fetchone()
+    if row is None:
+        conn.rollback()
+        raise PurchaseError('Reservation not found', 404)
+    cursor.execute('UPDATE nft_tickets SET remaining_supply = remaining_supply + 1 WHERE id = ?', (row[0],))
+    conn.commit()
+    gate.mark_available(row[0])
+    return row[0]
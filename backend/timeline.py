@@ -0,0 +1,202 @@
+"""Follower graph and per-user home timelines.
+
+``follows`` holds one (follower_id, followee_id) row per follow, and
+``follow_stats`` per-user follower / following counts kept current by
+triggers on it. ``timelines`` is the materialized home timeline: one
+(user_id, post_id) row per post a user should see, written when the post is
+created (fan-out on write), so reading a page is a primary-key range seek
+however many accounts the user follows.
+
+Accounts with more than TIMELINE_FANOUT_LIMIT followers are not fanned out:
+one post would write that many rows inside the post's transaction. Their
+``follow_stats.fanout_on_read`` flag is set instead, and readers merge those
+authors' recent posts in at read time (fan-out on read) from the
+(user_id, id) posts index. The flag is sticky, so an account that later
+drops under the limit keeps being read rather than leaving a gap in its
+followers' timelines.
+
+Following an account copies its last TIMELINE_BACKFILL posts into the
+follower's timeline; unfollowing removes them. Pages are keyed by post id,
+newest first, and a deleted post simply drops out of the join on read.
+
+On first install ``rebuild`` builds the timelines from the existing posts
+and follows the same way; generate_data.py calls it after a bulk load.
+"""
+import os
+
+FANOUT_LIMIT = int(os.getenv('TIMELINE_FANOUT_LIMIT', 10000))  # followers above which posts are merged on read
+BACKFILL = int(os.getenv('TIMELINE_BACKFILL', 100))  # posts copied into a timeline on follow
+
+
+def install(cursor):
+    """Create the follow graph, its counters and the timelines table, backfilling on first install"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'timelines'")
+    exists = cursor.fetchone() is not None
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS follows (
+            follower_id INTEGER NOT NULL,
+            followee_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (follower_id, followee_id),
+            FOREIGN KEY (follower_id) REFERENCES users (id),
+            FOREIGN KEY (followee_id) REFERENCES users (id)
+        ) WITHOUT ROWID
+    ''')
+    # Fan-out reads an author's followers
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_follows_followee ON follows (followee_id, follower_id)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS follow_stats (
+            user_id INTEGER PRIMARY KEY,
+            followers INTEGER NOT NULL DEFAULT 0,
+            following INTEGER NOT NULL DEFAULT 0,
+            fanout_on_read BOOLEAN NOT NULL DEFAULT FALSE
+        )
+    ''')
+    # The few fan-out-on-read accounts, so readers find them without walking all their follows
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_follow_stats_on_read ON follow_stats (user_id) WHERE fanout_on_read')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_follows_insert_stats AFTER INSERT ON follows
+        BEGIN
+            INSERT INTO follow_stats (user_id, followers) VALUES (new.followee_id, 1)
+            ON CONFLICT (user_id) DO UPDATE SET followers = followers + 1;
+            INSERT INTO follow_stats (user_id, following) VALUES (new.follower_id, 1)
+            ON CONFLICT (user_id) DO UPDATE SET following = following + 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_follows_delete_stats AFTER DELETE ON follows
+        BEGIN
+            UPDATE follow_stats SET followers = followers - 1 WHERE user_id = old.followee_id;
+            UPDATE follow_stats SET following = following - 1 WHERE user_id = old.follower_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS timelines (
+            user_id INTEGER NOT NULL,
+            post_id INTEGER NOT NULL,
+            author_id INTEGER NOT NULL,
+            PRIMARY KEY (user_id, post_id)
+        ) WITHOUT ROWID
+    ''')
+
+    if not exists:
+        rebuild(cursor)
+
+
+def rebuild(cursor):
+    """Materialize timelines from the existing posts and follows; rows already there are kept.
+
+    Each author gets their own posts and each follow the followee's last
+    TIMELINE_BACKFILL posts, as follow() copies them. Followees over the
+    fan-out limit are flagged for fan-out on read instead, as fan_out would.
+    """
+    cursor.execute('UPDATE follow_stats SET fanout_on_read = TRUE WHERE followers > ?', (FANOUT_LIMIT,))
+    cursor.execute('INSERT OR IGNORE INTO timelines (user_id, post_id, author_id) SELECT user_id, id, user_id FROM posts')
+    cursor.execute('''
+        INSERT OR IGNORE INTO timelines (user_id, post_id, author_id)
+        SELECT f.follower_id, p.id, p.user_id
+        FROM (
+            SELECT id, user_id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY id DESC) AS recent
+            FROM posts
+        ) p
+        JOIN follows f ON f.followee_id = p.user_id
+        LEFT JOIN follow_stats s ON s.user_id = p.user_id
+        WHERE p.recent <= ? AND NOT COALESCE(s.fanout_on_read, FALSE)
+    ''', (BACKFILL,))
+
+
+def fan_out(cursor, post_id):
+    """Deliver a new post to its author's followers; runs inside the post's transaction.
+
+    Returns 'write' when timeline rows were written, 'read' when the author
+    is over the fan-out limit and followers merge the post in on read.
+    """
+    cursor.execute('''
+        SELECT p.user_id, COALESCE(s.followers, 0), COALESCE(s.fanout_on_read, FALSE)
+        FROM posts p
+        LEFT JOIN follow_stats s ON s.user_id = p.user_id
+        WHERE p.id = ?
+    ''', (post_id,))
+    author_id, followers, on_read = cursor.fetchone()
+    # Authors always see their own posts
+    cursor.execute('INSERT OR IGNORE INTO timelines (user_id, post_id, author_id) VALUES (?, ?, ?)',
+                   (author_id, post_id, author_id))
+    if on_read or followers > FANOUT_LIMIT:
+        if not on_read:
+            cursor.execute('UPDATE follow_stats SET fanout_on_read = TRUE WHERE user_id = ?', (author_id,))
+        return 'read'
+    cursor.execute('''
+        INSERT OR IGNORE INTO timelines (user_id, post_id, author_id)
+        SELECT follower_id, ?, ? FROM follows WHERE followee_id = ?
+    ''', (post_id, author_id, author_id))
+    return 'write'
+
+
+def follow(cursor, follower_id, followee_id):
+    """Add a follow and backfill the followee's recent posts; False if it already existed"""
+    cursor.execute('INSERT OR IGNORE INTO follows (follower_id, followee_id) VALUES (?, ?)',
+                   (follower_id, followee_id))
+    if cursor.rowcount == 0:
+        return False
+    cursor.execute('''
+        INSERT OR IGNORE INTO timelines (user_id, post_id, author_id)
+        SELECT ?, id, user_id FROM posts WHERE user_id = ?
+        ORDER BY id DESC
+        LIMIT ?
+    ''', (follower_id, followee_id, BACKFILL))
+    return True
+
+
+def unfollow(cursor, follower_id, followee_id):
+    """Remove a follow and the followee's posts from the follower's timeline; False if there was none"""
+    cursor.execute('DELETE FROM follows WHERE follower_id = ? AND followee_id = ?', (follower_id, followee_id))
+    if cursor.rowcount == 0:
+        return False
+    cursor.execute('DELETE FROM timelines WHERE user_id = ? AND author_id = ?', (follower_id, followee_id))
+    return True
+
+
+def page(cursor, user_id, limit, before=None):
+    """Newest-first page of a user's home timeline; returns (rows, next_before).
+
+    Rows have the same columns as the feed queries. Materialized entries and
+    the posts of followed fan-out-on-read accounts are each read newest first
+    from their indexes, limit + 1 deep, and merged by post id.
+    """
+    bound = [before] if before is not None else []
+    cursor.execute(f'''
+        SELECT post_id FROM timelines
+        WHERE user_id = ? {'AND post_id < ?' if bound else ''}
+        ORDER BY post_id DESC
+        LIMIT ?
+    ''', [user_id] + bound + [limit + 1])
+    post_ids = {row[0] for row in cursor.fetchall()}
+
+    cursor.execute('''
+        SELECT s.user_id FROM follow_stats s
+        CROSS JOIN follows f ON f.follower_id = ? AND f.followee_id = s.user_id
+        WHERE s.fanout_on_read
+    ''', (user_id,))
+    for (author_id,) in cursor.fetchall():
+        cursor.execute(f'''
+            SELECT id FROM posts
+            WHERE user_id = ? {'AND id < ?' if bound else ''}
+            ORDER BY id DESC
+            LIMIT ?
+        ''', [author_id] + bound + [limit + 1])
+        post_ids.update(row[0] for row in cursor.fetchall())
+
+    post_ids = sorted(post_ids, reverse=True)
+    page_ids = post_ids[:limit]
+    if not page_ids:
+        return [], None
+    cursor.execute(f'''
+        SELECT p.*, u.username, u.avatar_url, u.wallet_address
+        FROM posts p
+        JOIN users u ON p.user_id = u.id
+        WHERE p.id IN ({','.join('?' * len(page_ids))})
+        ORDER BY p.id DESC
+    ''', page_ids)
+    next_before = page_ids[-1] if len(post_ids) > limit else None
+    return cursor.fetchall(), next_before
@@ -0,0 +1,31 @@
+"""Per-request time accounting shared by the database layer, codec and profiler.
+
+``current`` holds the RequestClock of the request being served in this thread
+(or asyncio task), or None outside a request. Instrumented code checks it and
+skips timing entirely when no clock is active, so background workers and
+scripts pay nothing.
+"""
+import contextvars
+import time
+
+# Phases a request's time is broken down into, besides its total
+PHASES = ('connect', 'db', 'decode', 'serialize', 'compress')
+
+current = contextvars.ContextVar('request_clock', default=None)
+
+
+class RequestClock:
+    """Seconds spent per phase and SQL statements run by one request"""
+
+    __slots__ = ('started', 'phases', 'queries')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+
+    def add(self, phase, seconds):
+        self.phases[phase] += seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
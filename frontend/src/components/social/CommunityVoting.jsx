@@ -52,7 +52,8 @@ const CommunityVoting = ({ userWallet }) => {
 
   const loadPolls = async () => {
     try {
-      const response = await fetch('http://localhost:5000/api/voting/list');
+      const query = userWallet ? `?wallet=${userWallet}` : '';
+      const response = await fetch(`http://localhost:5000/api/voting/list${query}`);
       if (response.ok) {
         const data = await response.json();
         setPolls(data.polls || []);
@@ -177,18 +178,12 @@ const CommunityVoting = ({ userWallet }) => {
 
   const getVoteResults = (poll) => {
     try {
-      const votes = JSON.parse(poll.votes || '{}');
       const options = JSON.parse(poll.options || '[]');
+      const tallies = poll.tallies || {};
       const results = {};
       
       options.forEach(option => {
-        results[option] = 0;
-      });
-      
-      Object.values(votes).forEach(vote => {
-        if (results[vote] !== undefined) {
-          results[vote]++;
-        }
+        results[option] = tallies[option] || 0;
       });
       
       return results;
@@ -198,21 +193,11 @@ const CommunityVoting = ({ userWallet }) => {
   };
 
   const getTotalVotes = (poll) => {
-    try {
-      const votes = JSON.parse(poll.votes || '{}');
-      return Object.keys(votes).length;
-    } catch {
-      return 0;
-    }
+    return poll.total_votes || 0;
   };
 
   const hasUserVoted = (poll) => {
-    try {
-      const votes = JSON.parse(poll.votes || '{}');
-      return votes[userWallet] !== undefined;
-    } catch {
-      return false;
-    }
+    return poll.user_vote !== undefined && poll.user_vote !== null;
   };
 
   const isPollActive = (poll) => {
@@ -58,7 +58,8 @@ const GroupSavingsPools = ({ userWallet }) => {
 
   const loadPools = async () => {
     try {
-      const response = await fetch('http://localhost:5000/api/savings-pools/list');
+      const query = userWallet ? `?wallet=${userWallet}` : '';
+      const response = await fetch(`http://localhost:5000/api/savings-pools/list${query}`);
       if (response.ok) {
         const data = await response.json();
         setPools(data.pools || []);
@@ -205,21 +206,11 @@ const GroupSavingsPools = ({ userWallet }) => {
   };
 
   const isParticipant = (pool) => {
-    try {
-      const participants = JSON.parse(pool.participants || '[]');
-      return participants.includes(userWallet);
-    } catch {
-      return false;
-    }
+    return Boolean(pool.is_participant);
   };
 
   const getParticipantCount = (pool) => {
-    try {
-      const participants = JSON.parse(pool.participants || '[]');
-      return participants.length;
-    } catch {
-      return 0;
-    }
+    return pool.participant_count || 0;
   };
 
   return (